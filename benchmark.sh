@@ -1,2 +1,21 @@
  python benchmark/main.py | tee benchmark/result.txt
  python benchmark/plot.py
+ python benchmark/encoding.py | tee benchmark/encoding.txt
+ python benchmark/shared_memory.py | tee benchmark/shared_memory.txt
+ python benchmark/threaded.py | tee benchmark/threaded.txt
+ python benchmark/reconnect.py | tee benchmark/reconnect.txt
+ python benchmark/memory.py | tee benchmark/memory.txt
+ python benchmark/importtime.py | tee benchmark/importtime.txt
+ python benchmark/poll.py | tee benchmark/poll.txt
+ python benchmark/gateway.py | tee benchmark/gateway.txt
+ python benchmark/object_cache.py | tee benchmark/object_cache.txt
+ python benchmark/iter_objects.py | tee benchmark/iter_objects.txt
+ python benchmark/chunking.py | tee benchmark/chunking.txt
+ python benchmark/create.py | tee benchmark/create.txt
+ python benchmark/computed.py | tee benchmark/computed.txt
+ python benchmark/blob.py | tee benchmark/blob.txt
+ python benchmark/ring_buffer.py | tee benchmark/ring_buffer.txt
+ python benchmark/aggregate.py | tee benchmark/aggregate.txt
+ python benchmark/loopback.py | tee benchmark/loopback.txt
+ python benchmark/string_node_ids.py | tee benchmark/string_node_ids.txt
+ python benchmark/protocol.py | tee benchmark/protocol.txt
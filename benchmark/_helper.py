@@ -34,8 +34,8 @@ def _random_job() -> PrinterJob:
     )
 
 
-def random_printer() -> Printer:
-    return Printer(
+def random_printer(cls: type[Printer] = Printer) -> Printer:
+    return cls(
         state=random.choice(__states),
         bed=_random_temperature(),
         nozzle=_random_temperature(),
@@ -1,3 +1,5 @@
+from typing import ClassVar
+
 from opcuax import OpcuaModel
 from pydantic import BaseModel, NonNegativeFloat
 
@@ -28,3 +30,7 @@ class Printer(OpcuaModel):
 
     head: PrinterHead = PrinterHead()
     job: PrinterJob = PrinterJob()
+
+
+class StructPrinter(Printer):
+    opcua_struct: ClassVar[bool] = True
@@ -7,6 +7,10 @@ from benchmark._helper import Timer, random_printer
 from benchmark._models import Printer
 
 
+def lib_name(printer_cls: type[Printer]) -> str:
+    return "opcuax-struct" if printer_cls.opcua_struct else "opcuax"
+
+
 def build_server() -> OpcuaServer:
     return OpcuaServer.from_settings(server_settings)
 
@@ -15,13 +19,15 @@ def build_client() -> OpcuaClient:
     return OpcuaClient.from_settings(client_settings)
 
 
-async def server_read_benchmark(printers: int, n: int) -> None:
+async def server_read_benchmark(
+    printers: int, n: int, printer_cls: type[Printer] = Printer
+) -> None:
     async with build_server() as server:
         _printers = [
-            await server.create(f"Printer{i+1}", Printer()) for i in range(printers)
+            await server.create(f"Printer{i+1}", printer_cls()) for i in range(printers)
         ]
 
-        timer = Timer("opcuax", "server-read", printers, n)
+        timer = Timer(lib_name(printer_cls), "server-read", printers, n)
         timer.start()
 
         for _ in range(n):
@@ -32,35 +38,42 @@ async def server_read_benchmark(printers: int, n: int) -> None:
         timer.end()
 
 
-async def server_write_benchmark(printers: int, n: int) -> None:
+async def server_write_benchmark(
+    printers: int, n: int, printer_cls: type[Printer] = Printer
+) -> None:
     async with build_server() as server:
         _printers = [
-            await server.create(f"Printer{i+1}", Printer()) for i in range(printers)
+            await server.create(f"Printer{i+1}", printer_cls()) for i in range(printers)
         ]
 
-        timer = Timer("opcuax", "server-write", printers, n)
+        timer = Timer(lib_name(printer_cls), "server-write", printers, n)
         timer.start()
 
         for _ in range(n):
             async with asyncio.TaskGroup() as tg:
                 for i in range(printers):
-                    tg.create_task(server.update(f"Printer{i+1}", random_printer()))
+                    tg.create_task(
+                        server.update(f"Printer{i+1}", random_printer(printer_cls))
+                    )
 
         timer.end()
 
         assert server.update_tasks.empty()
 
 
-async def client_read_benchmark(printers: int, n: int) -> None:
+async def client_read_benchmark(
+    printers: int, n: int, printer_cls: type[Printer] = Printer
+) -> None:
     async with build_server() as server, build_client() as client:
         for i in range(printers):
-            await server.create(f"Printer{i+1}", Printer())
+            await server.create(f"Printer{i+1}", printer_cls())
 
         _printers = [
-            await client.get_object(Printer, f"Printer{i+1}") for i in range(printers)
+            await client.get_object(printer_cls, f"Printer{i+1}")
+            for i in range(printers)
         ]
 
-        timer = Timer("opcuax", "client-read", printers, n)
+        timer = Timer(lib_name(printer_cls), "client-read", printers, n)
         timer.start()
 
         for _ in range(n):
@@ -71,18 +84,22 @@ async def client_read_benchmark(printers: int, n: int) -> None:
         timer.end()
 
 
-async def client_write_benchmark(printers: int, n: int) -> None:
+async def client_write_benchmark(
+    printers: int, n: int, printer_cls: type[Printer] = Printer
+) -> None:
     async with build_server() as server, build_client() as client:
         for i in range(printers):
-            await server.create(f"Printer{i+1}", Printer())
+            await server.create(f"Printer{i+1}", printer_cls())
 
-        timer = Timer("opcuax", "client-write", printers, n)
+        timer = Timer(lib_name(printer_cls), "client-write", printers, n)
         timer.start()
 
         for _ in range(n):
             async with asyncio.TaskGroup() as tg:
                 for i in range(printers):
-                    tg.create_task(client.update(f"Printer{i+1}", random_printer()))
+                    tg.create_task(
+                        client.update(f"Printer{i+1}", random_printer(printer_cls))
+                    )
 
         timer.end()
 
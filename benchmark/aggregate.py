@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import statistics
+import time
+
+from opcuax import OpcuaClient, OpcuaServer
+from opcuax.node import read_ua_values
+
+from benchmark._config import client_settings, server_settings
+from benchmark._models import Printer
+
+
+async def tick(server: OpcuaServer, printers: list[Printer], rounds: int) -> float:
+    started_at = time.perf_counter()
+    for i in range(rounds):
+        for j, printer in enumerate(printers):
+            printer.nozzle.actual = 200 + (i + j) % 20
+            printer.state = ("Printing", "Idle", "Error")[(i + j) % 3]
+        await server.commit()
+    return (time.perf_counter() - started_at) / rounds
+
+
+async def read_all(client: OpcuaClient, count: int) -> dict[str, object]:
+    """What dashboards did before: read the field of every object."""
+    printers = [await client.get_object(Printer, f"Printer{i+1}") for i in range(count)]
+    nodes = []
+    for printer in printers:
+        nodes.append(printer.nozzle.field_node("actual"))  # type: ignore[attr-defined]
+        nodes.append(printer.field_node("state"))  # type: ignore[attr-defined]
+    results = await read_ua_values(nodes)
+    actual = [result.Value.Value for result in results[::2]]
+    states = [result.Value.Value for result in results[1::2]]
+    return {
+        "nozzle_mean": statistics.fmean(actual),
+        "progress_max": max(printer.job.progress for printer in printers),
+        "states": {state: states.count(state) for state in set(states)},
+    }
+
+
+async def main(count: int = 1000, rounds: int = 10, reads: int = 20) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        printers = [
+            await server.create(f"Printer{i+1}", Printer()) for i in range(count)
+        ]
+        before = await tick(server, printers, rounds)
+
+        await server.aggregate("nozzle_mean", Printer, "nozzle.actual", "mean")
+        await server.aggregate("progress_max", Printer, "job.progress", "max")
+        await server.aggregate("states", Printer, "state", "counts")
+        after = await tick(server, printers, rounds)
+        print(
+            "opcuax update %d printers %.1f ms per tick, %.1f ms with 3 aggregates"
+            % (count, before * 1000, after * 1000)
+        )
+
+        async with OpcuaClient.from_settings(client_settings) as client:
+            await read_all(client, count)
+            started_at = time.perf_counter()
+            for _ in range(reads):
+                await read_all(client, count)
+            scan = (time.perf_counter() - started_at) / reads
+
+            started_at = time.perf_counter()
+            for _ in range(reads):
+                await client.read_aggregates()
+            aggregates = (time.perf_counter() - started_at) / reads
+
+        print(
+            "opcuax fleet summary of %d printers: read all %.1f ms, "
+            "read aggregates %.1f ms" % (count, scan * 1000, aggregates * 1000)
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing.synchronize import Event
+
+from opcuax import OpcuaClient, OpcuaModel, OpcuaServer
+
+from benchmark._config import client_settings, server_settings
+
+
+class GcodeFile(OpcuaModel):
+    name: str = ""
+    data: bytes = b""
+
+
+async def serve(ready: Event) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        await server.create("Job1", GcodeFile(name="part.gcode"))
+        ready.set()
+        await server.loop()
+
+
+def run_server(ready: Event) -> None:
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(serve(ready))
+
+
+async def transfer_benchmark(
+    client: OpcuaClient, data: bytes, chunk_size: int, rounds: int
+) -> None:
+    job = await client.get_object(GcodeFile, "Job1")
+    size = len(data) / 2**20
+
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        await client.write_bytes(job, "data", data, chunk_size)
+    write_time = (time.perf_counter() - started_at) / rounds
+
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        assert len(await client.read_bytes(job, "data", chunk_size)) == len(data)
+    read_time = (time.perf_counter() - started_at) / rounds
+
+    print(
+        "opcuax %.0f MiB chunk %d KiB write %.1f MiB/s read %.1f MiB/s"
+        % (size, chunk_size // 1024, size / write_time, size / read_time)
+    )
+
+
+async def main(size: int = 20 * 2**20, rounds: int = 3) -> None:
+    ready = multiprocessing.get_context("spawn").Event()
+    server = multiprocessing.get_context("spawn").Process(
+        target=run_server, args=(ready,), daemon=True
+    )
+    server.start()
+    await asyncio.to_thread(ready.wait)
+
+    data = os.urandom(size)
+    async with OpcuaClient.from_settings(client_settings) as client:
+        # the last one sends the file in one message
+        for chunk_size in (2**16, 2**18, 2**20, 2**22, size):
+            await transfer_benchmark(client, data, chunk_size, rounds)
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
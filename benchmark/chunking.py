@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import time
+from multiprocessing.synchronize import Event
+
+from asyncua import ua
+from opcuax import OpcuaClient, OpcuaServer
+from opcuax.node import read_ua_values, write_ua_values
+
+from benchmark._config import client_settings, server_settings
+from benchmark._models import Printer
+
+
+async def serve(printers: int, ready: Event) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for i in range(printers):
+            await server.create(f"Printer{i+1}", Printer())
+        ready.set()
+        await server.loop()
+
+
+def run_server(printers: int, ready: Event) -> None:
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(serve(printers, ready))
+
+
+async def main(printers: int = 100, nodes: int = 20000, rounds: int = 5) -> None:
+    ready = multiprocessing.get_context("spawn").Event()
+    server = multiprocessing.get_context("spawn").Process(
+        target=run_server, args=(printers, ready), daemon=True
+    )
+    server.start()
+    await asyncio.to_thread(ready.wait)
+
+    async with OpcuaClient.from_settings(client_settings) as client:
+        variables = []
+        for i in range(printers):
+            printer = await client.get_object(Printer, f"Printer{i+1}")
+            variables += [node for *_, node in await printer.variable_nodes()]
+        targets = (variables * (nodes // len(variables) + 1))[:nodes]
+        values = [
+            ua.DataValue(result.Value) for result in await read_ua_values(targets)
+        ]
+        limits = client.operation_limits
+
+        for chunk_size in (0, 5000, 1000, 250, 50):
+            for concurrency in (1, 4, 16):
+                limits.chunk_size, limits.max_concurrency = chunk_size, concurrency
+                reads, writes = [], []
+                for _ in range(rounds):
+                    started_at = time.monotonic()
+                    await read_ua_values(targets)
+                    reads.append(time.monotonic() - started_at)
+                    started_at = time.monotonic()
+                    await write_ua_values(targets, values)
+                    writes.append(time.monotonic() - started_at)
+                print(
+                    "opcuax %d nodes chunk %d concurrency %d "
+                    "read %.0f ms write %.0f ms"
+                    % (
+                        nodes,
+                        chunk_size or limits.max_nodes_per_read,
+                        concurrency,
+                        statistics.median(reads) * 1000,
+                        statistics.median(writes) * 1000,
+                    )
+                )
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
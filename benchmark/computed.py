@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import time
+
+from opcuax import OpcuaClient, OpcuaModel, OpcuaServer, computed
+from opcuax.node import read_ua_values
+
+from benchmark._config import client_settings, server_settings
+
+
+class EagerJob(OpcuaModel):
+    time_left: float = 0
+    time_left_approx: float = 0
+
+
+class LazyJob(OpcuaModel):
+    time_left: float = 0
+
+    @computed(ttl=1)
+    def time_left_approx(self) -> float:
+        return round(self.time_left, -1)
+
+
+async def tick_benchmark(
+    server: OpcuaServer, cls: type[OpcuaModel], jobs: int, ticks: int
+) -> None:
+    models = [await server.create(f"{cls.__name__}{i}", cls()) for i in range(jobs)]
+
+    started_at = time.perf_counter()
+    for tick in range(ticks):
+        for job in models:
+            job.time_left = 9999 - tick  # type: ignore[attr-defined]
+            if isinstance(job, EagerJob):
+                # derived value written every tick, read or not
+                job.time_left_approx = round(job.time_left, -1)
+        await server.commit()
+    elapsed = time.perf_counter() - started_at
+
+    print(
+        "opcuax %s %d jobs %.2f ms per tick"
+        % (cls.__name__, jobs, elapsed / ticks * 1000)
+    )
+
+
+async def read_benchmark(
+    server: OpcuaServer, cls: type[OpcuaModel], jobs: int, reads: int
+) -> None:
+    async with OpcuaClient.from_settings(client_settings) as client:
+        nodes = [
+            await client.ua_objects_node.get_child(
+                f"{client.namespace}:{cls.__name__}{i}/"
+                f"{client.namespace}:time_left_approx"
+            )
+            for i in range(jobs)
+        ]
+        started_at = time.perf_counter()
+        for _ in range(reads):
+            await read_ua_values(nodes)
+        elapsed = time.perf_counter() - started_at
+
+    computations = sum(v.computations for v in server.computed_variables.values())
+    print(
+        "opcuax %s read %d values %.2f ms per read %d computations"
+        % (cls.__name__, jobs, elapsed / reads * 1000, computations)
+    )
+
+
+async def main(jobs: int = 500, ticks: int = 20, reads: int = 100) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for cls in (EagerJob, LazyJob):
+            await tick_benchmark(server, cls, jobs, ticks)
+        # clients read a few derived values
+        for cls in (EagerJob, LazyJob):
+            await read_benchmark(server, cls, 10, reads)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+import time
+
+from opcuax import OpcuaServer, trace_requests
+
+from benchmark._config import server_settings
+from benchmark._models import Printer, StructPrinter
+
+
+async def create_then_update(server: OpcuaServer, name: str, printer: Printer) -> None:
+    # how create worked before: instantiate the type, then read and write back
+    await server.create_ua_object(type(printer), name)
+    await server.update(name, printer)
+
+
+async def create_benchmark(
+    server: OpcuaServer, label: str, cls: type[Printer], objects: int, old: bool
+) -> None:
+    printers = [cls(state=f"Printing {i}") for i in range(objects)]
+    await server.create_ua_object_type(cls)
+
+    with trace_requests(server) as trace:
+        started_at = time.perf_counter()
+        for i, printer in enumerate(printers):
+            name = f"{label}{i+1}"
+            if old:
+                await create_then_update(server, name, printer)
+            else:
+                await server.create(name, printer)
+        elapsed = time.perf_counter() - started_at
+
+    print(
+        "opcuax %s %d objects %.0f objects/s %.1f service calls per object"
+        % (label, objects, objects / elapsed, trace.count() / objects)
+    )
+
+
+async def main(objects: int = 500) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        await create_benchmark(server, "create_then_update", Printer, objects, True)
+        await create_benchmark(server, "create", Printer, objects, False)
+        await create_benchmark(
+            server, "struct_create_then_update", StructPrinter, objects, True
+        )
+        await create_benchmark(server, "struct_create", StructPrinter, objects, False)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
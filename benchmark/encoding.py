@@ -0,0 +1,40 @@
+import timeit
+
+from asyncua import ua
+from asyncua.common.utils import Buffer
+from asyncua.ua.ua_binary import variant_from_binary, variant_to_binary
+from opcuax.values import Double, Float, Int16, UInt8, UInt32, ua_variant_type
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+
+class Fields(BaseModel):
+    uint8: UInt8 = 200
+    int16: Int16 = -300
+    uint32: UInt32 = 70000
+    int64: int = 2**40
+    single: Float = 0.5
+    double: Double = 0.1
+
+
+def field_benchmark(name: str, field: FieldInfo, n: int) -> None:
+    variant_type = ua_variant_type(field)
+    variant = ua.Variant(field.default, variant_type)
+    data = variant_to_binary(variant)
+
+    encode = timeit.timeit(lambda: variant_to_binary(variant), number=n)
+    decode = timeit.timeit(lambda: variant_from_binary(Buffer(data)), number=n)
+
+    print(
+        "%s %s %d bytes encode %2.3f us decode %2.3f us"
+        % (name, variant_type.name, len(data), encode / n * 1e6, decode / n * 1e6)
+    )
+
+
+def main(n: int = 100000) -> None:
+    for name, field in Fields.model_fields.items():
+        field_benchmark(name, field, n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from multiprocessing.queues import Queue
+
+from opcuax import OpcuaClient, OpcuaGateway, OpcuaServer
+
+from benchmark._config import client_settings, server_settings
+from benchmark._models import Printer
+
+gateway_endpoint = "opc.tcp://localhost:4841"
+
+
+async def serve(
+    printers: int, requests: "Queue[float]", results: "Queue[float]"
+) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for i in range(printers):
+            await server.create(f"Printer{i+1}", Printer())
+        results.put(0)
+
+        while True:
+            # measure cpu of the upstream server for the requested seconds
+            duration = await asyncio.to_thread(requests.get)
+            started_at = time.process_time()
+            await asyncio.sleep(duration)
+            results.put((time.process_time() - started_at) / duration)
+
+
+def run_server(
+    printers: int, requests: "Queue[float]", results: "Queue[float]"
+) -> None:
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(serve(printers, requests, results))
+
+
+async def connect(endpoint: str, printers: int) -> tuple[OpcuaClient, list[Printer]]:
+    namespace = str(client_settings.opcua_server_namespace)
+    client = await OpcuaClient(endpoint, namespace).__aenter__()
+    objects = [
+        await client.get_object(Printer, f"Printer{i+1}") for i in range(printers)
+    ]
+    return client, objects
+
+
+async def read(
+    client: OpcuaClient, objects: list[Printer], interval: float, end: float
+) -> None:
+    while time.monotonic() < end:
+        await asyncio.gather(*[client.refresh(obj) for obj in objects])
+        await asyncio.sleep(interval)
+    await client.__aexit__(None, None, None)
+
+
+async def main(printers: int = 10, interval: float = 1, duration: float = 10) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    requests: Queue[float] = ctx.Queue()
+    results: Queue[float] = ctx.Queue()
+    server = ctx.Process(
+        target=run_server, args=(printers, requests, results), daemon=True
+    )
+    server.start()
+    await asyncio.to_thread(results.get)
+
+    names = [f"Printer{i+1}" for i in range(printers)]
+    namespace = str(client_settings.opcua_server_namespace)
+    async with (
+        OpcuaServer(gateway_endpoint, "gateway", namespace) as gateway_server,
+        OpcuaGateway(gateway_server) as gateway,
+    ):
+        await gateway.follow(
+            str(client_settings.opcua_server_url), namespace, Printer, names
+        )
+
+        for readers in (1, 5, 20):
+            for mode in ("direct", "gateway"):
+                endpoint = (
+                    str(client_settings.opcua_server_url)
+                    if mode == "direct"
+                    else gateway_endpoint
+                )
+                sessions = [await connect(endpoint, printers) for _ in range(readers)]
+                end = time.monotonic() + duration
+                requests.put(duration)
+                await asyncio.gather(
+                    *[read(*session, interval, end) for session in sessions]
+                )
+                cpu = await asyncio.to_thread(results.get)
+                print(
+                    "opcuax %s %d readers upstream server cpu %.0f%%"
+                    % (mode, readers, cpu * 100)
+                )
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
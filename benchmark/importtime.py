@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+statements = [
+    "import opcuax",
+    "from opcuax import OpcuaModel",
+    "from opcuax.values import ua_variant",
+    "from opcuax import OpcuaClient",
+    "from opcuax import OpcuaServer",
+]
+
+
+def import_time(statement: str) -> float:
+    """Cumulative microseconds of all imports reported by ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        # nested imports are indented
+        if not name.startswith("  ") and cumulative.strip().isdigit():
+            total += int(cumulative)
+    return total
+
+
+def main(n: int = 5) -> None:
+    for statement in statements:
+        best = min(import_time(statement) for _ in range(n))
+        print(f"opcuax import '{statement}' {best / 1000:2.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from multiprocessing.synchronize import Event
+
+from opcuax import OpcuaClient, OpcuaServer
+
+from benchmark._config import client_settings, server_settings
+from benchmark._models import Printer
+
+
+async def serve(printers: int, ready: Event) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for i in range(printers):
+            await server.create(f"Printer{i+1}", Printer())
+        ready.set()
+        await server.loop()
+
+
+def run_server(printers: int, ready: Event) -> None:
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(serve(printers, ready))
+
+
+async def by_names(client: OpcuaClient, printers: int) -> float:
+    """Names kept in configuration, attached one by one."""
+    first_at = 0.0
+    for i in range(printers):
+        await client.get_object(Printer, f"Printer{i+1}")
+        first_at = first_at or time.monotonic()
+    return first_at
+
+
+async def by_iter_objects(client: OpcuaClient, printers: int) -> float:
+    first_at = 0.0
+    async for _ in client.iter_objects(Printer):
+        first_at = first_at or time.monotonic()
+    return first_at
+
+
+async def main(printers: int = 1000) -> None:
+    ready = multiprocessing.get_context("spawn").Event()
+    server = multiprocessing.get_context("spawn").Process(
+        target=run_server, args=(printers, ready), daemon=True
+    )
+    server.start()
+    await asyncio.to_thread(ready.wait)
+
+    for mode, discover in (("names", by_names), ("iter_objects", by_iter_objects)):
+        async with OpcuaClient.from_settings(client_settings) as client:
+            # load types and warm up caches before measuring
+            await client.get_object(Printer, "Printer1")
+            client.objects.clear()
+
+            started_at = time.monotonic()
+            first_at = await discover(client, printers)
+            elapsed = time.monotonic() - started_at
+            print(
+                "opcuax %s %d objects first after %.3fs all after %.2fs"
+                % (mode, len(client.objects), first_at - started_at, elapsed)
+            )
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import time
+
+from opcuax import OpcuaClient, OpcuaServer
+from opcuax.loopback import LoopbackTransport
+
+from benchmark._models import Printer
+
+__ns = "https://github.com/monash-automation/opcuax"
+
+
+async def workload(endpoint: str, count: int, rounds: int) -> tuple[float, int]:
+    """Time per round refreshing ``count`` printers one by one and bytes sent."""
+    async with OpcuaServer(endpoint, "Opcua Lab Server", __ns) as server:
+        for i in range(count):
+            await server.create(f"Printer{i+1}", Printer())
+
+        async with OpcuaClient(endpoint, __ns) as client:
+            printers = [
+                await client.get_object(Printer, f"Printer{i+1}") for i in range(count)
+            ]
+            transport = client.client.uaclient.protocol.transport
+            before = sent(transport)
+            started_at = time.perf_counter()
+            for _ in range(rounds):
+                for printer in printers:
+                    await client.refresh(printer)
+            elapsed = (time.perf_counter() - started_at) / rounds
+            return elapsed, (sent(transport) - before) // rounds
+
+
+def sent(transport: asyncio.BaseTransport) -> int:
+    """Bytes sent both ways through a loopback connection."""
+    if not isinstance(transport, LoopbackTransport) or transport.peer is None:
+        return 0
+    return transport.bytes_written + transport.peer.bytes_written
+
+
+async def main(count: int = 100, rounds: int = 50) -> None:
+    tcp, _ = await workload("opc.tcp://localhost:4840", count, rounds)
+    loopback, size = await workload("opc.loopback://localhost", count, rounds)
+    print(
+        "opcuax refresh %d printers tcp %.2f ms, loopback %.2f ms per round"
+        % (count, tcp * 1000, loopback * 1000)
+    )
+    print(
+        "opcuax library overhead %.2f ms, transport cost %.2f ms per round, "
+        "%d KiB per round" % (loopback * 1000, (tcp - loopback) * 1000, size / 1024)
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+import asyncio
+import gc
+import logging
+import multiprocessing
+import tracemalloc
+from multiprocessing.synchronize import Event
+
+from opcuax import OpcuaClient, OpcuaServer
+
+from benchmark._config import client_settings, server_settings
+from benchmark._models import Printer, StructPrinter
+
+
+async def serve(printers: int, ready: Event) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for i in range(printers):
+            await server.create(f"Printer{i+1}", Printer())
+            await server.create(f"StructPrinter{i+1}", StructPrinter())
+        ready.set()
+        await server.loop()
+
+
+def run_server(printers: int, ready: Event) -> None:
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(serve(printers, ready))
+
+
+async def memory_benchmark(
+    client: OpcuaClient, printer_cls: type[Printer], printers: int
+) -> None:
+    name = printer_cls.__name__
+    # load types and warm up caches before measuring
+    await client.get_object(printer_cls, f"{name}1")
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(1, printers):
+        await client.get_object(printer_cls, f"{name}{i+1}")
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    print("opcuax %s %d objects %d bytes/object" % (name, printers, size / printers))
+
+
+async def main(printers: int = 1000) -> None:
+    ready = multiprocessing.get_context("spawn").Event()
+    server = multiprocessing.get_context("spawn").Process(
+        target=run_server, args=(printers, ready), daemon=True
+    )
+    server.start()
+    await asyncio.to_thread(ready.wait)
+
+    async with OpcuaClient.from_settings(client_settings) as client:
+        await memory_benchmark(client, Printer, printers)
+        await memory_benchmark(client, StructPrinter, printers)
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+import asyncio
+import gc
+import logging
+import multiprocessing
+import tracemalloc
+from multiprocessing.synchronize import Event
+
+from opcuax import OpcuaClient, OpcuaServer
+
+from benchmark._config import client_settings, server_settings
+from benchmark._models import Printer
+
+
+async def serve(printers: int, ready: Event) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for i in range(printers):
+            await server.create(f"Printer{i+1}", Printer())
+        ready.set()
+        await server.loop()
+
+
+def run_server(printers: int, ready: Event) -> None:
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(serve(printers, ready))
+
+
+async def browse_benchmark(printers: int, max_objects: int | None) -> None:
+    client = OpcuaClient(
+        str(client_settings.opcua_server_url),
+        str(client_settings.opcua_server_namespace),
+        max_objects=max_objects,
+    )
+    async with client:
+        # load types and warm up caches before measuring
+        await client.get_object(Printer, "Printer1")
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        # browse every object twice, like a tool paging through a large server
+        for _ in range(2):
+            for i in range(printers):
+                await client.get_object(Printer, f"Printer{i+1}")
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        objects = client.objects
+        print(
+            "opcuax max_objects=%s %d objects retained %d KiB "
+            "hits %d misses %d evictions %d"
+            % (
+                max_objects,
+                len(objects),
+                size / 1024,
+                objects.hits,
+                objects.misses,
+                objects.evictions,
+            )
+        )
+
+
+async def main(printers: int = 1000) -> None:
+    ready = multiprocessing.get_context("spawn").Event()
+    server = multiprocessing.get_context("spawn").Process(
+        target=run_server, args=(printers, ready), daemon=True
+    )
+    server.start()
+    await asyncio.to_thread(ready.wait)
+
+    for max_objects in (None, 100):
+        await browse_benchmark(printers, max_objects)
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
@@ -5,7 +5,7 @@ import numpy as np
 from matplotlib.axes import Axes
 from pydantic import BaseModel
 
-Library = Literal["asyncua", "opcuax"]
+Library = Literal["asyncua", "opcuax", "opcuax-struct"]
 Api = Literal["server-write", "server-read", "client-write", "client-read"]
 
 
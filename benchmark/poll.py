@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from multiprocessing.synchronize import Event
+
+from opcuax import OpcuaClient, OpcuaServer
+
+from benchmark._config import client_settings, server_settings
+from benchmark._models import Printer
+
+
+async def serve(printers: int, ready: Event) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for i in range(printers):
+            await server.create(f"Printer{i+1}", Printer())
+        ready.set()
+        await server.loop()
+
+
+def run_server(printers: int, ready: Event) -> None:
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(serve(printers, ready))
+
+
+async def poll_tasks(
+    client: OpcuaClient, printers: list[Printer], interval: float, duration: float
+) -> tuple[int, int]:
+    """One polling task per object, as applications do without poll()."""
+    refreshes = 0
+
+    async def poll(printer: Printer) -> None:
+        nonlocal refreshes
+        while True:
+            await client.refresh(printer)
+            refreshes += 1
+            await asyncio.sleep(interval)
+
+    tasks = [asyncio.create_task(poll(printer)) for printer in printers]
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # refresh() sends one read per object
+    return refreshes, refreshes
+
+
+async def poll_scheduler(
+    client: OpcuaClient, printers: list[Printer], interval: float, duration: float
+) -> tuple[int, int]:
+    group = client.poll(printers, interval)
+    await asyncio.sleep(duration)
+    group.cancel()
+    return group.reads, group.polls
+
+
+async def main(
+    printers: int = 100, interval: float = 0.5, duration: float = 10
+) -> None:
+    ready = multiprocessing.get_context("spawn").Event()
+    server = multiprocessing.get_context("spawn").Process(
+        target=run_server, args=(printers, ready), daemon=True
+    )
+    server.start()
+    await asyncio.to_thread(ready.wait)
+
+    for mode, poll in (("tasks", poll_tasks), ("poll", poll_scheduler)):
+        async with OpcuaClient.from_settings(client_settings) as client:
+            objects = [
+                await client.get_object(Printer, f"Printer{i+1}")
+                for i in range(printers)
+            ]
+            started_at = time.process_time()
+            reads, requests = await poll(client, objects, interval, duration)
+            cpu = time.process_time() - started_at
+            print(
+                "opcuax %s %d objects every %.1fs: %.0f objects/s %.0f requests/s "
+                "client cpu %.0f%%"
+                % (
+                    mode,
+                    printers,
+                    interval,
+                    reads / duration,
+                    requests / duration,
+                    cpu / duration * 100,
+                )
+            )
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from opcuax import OpcuaClient, OpcuaServer
+from opcuax.node import read_ua_values
+
+from benchmark._models import Printer
+
+__url = "opc.tcp://localhost:4840"
+__ns = "https://github.com/monash-automation/opcuax"
+
+# (label, OpcuaServer arguments, OpcuaClient arguments)
+configs: list[tuple[str, dict[str, Any], dict[str, Any]]] = [
+    ("defaults", {}, {}),
+    ("security_policies=NoSecurity", {"security_policies": ["NoSecurity"]}, {}),
+    ("max_chunk_size=8KiB", {"max_chunk_size": 2**13}, {}),
+    ("max_chunk_size=1MiB", {"max_chunk_size": 2**20}, {}),
+    ("max_message_size=1MiB", {"max_message_size": 2**20}, {}),
+    ("client max_message_size=1MiB", {}, {"max_message_size": 2**20}),
+    ("request_timeout=1s", {}, {"request_timeout": 1}),
+    ("min_sampling_interval=1s", {"min_sampling_interval": 1}, {}),
+    ("min_publishing_interval=1s", {"min_publishing_interval": 1}, {}),
+]
+
+
+async def bulk_read(
+    server_args: dict[str, Any],
+    client_args: dict[str, Any],
+    count: int,
+    rounds: int,
+) -> float:
+    """Values per second read by bulk reads of all fields of ``count`` printers."""
+    async with OpcuaServer(__url, "Opcua Lab Server", __ns, **server_args) as server:
+        for i in range(count):
+            await server.create(f"Printer{i+1}", Printer())
+
+        async with OpcuaClient(__url, __ns, **client_args) as client:
+            nodes = []
+            for i in range(count):
+                printer = await client.get_object(Printer, f"Printer{i+1}")
+                targets = await printer.variable_nodes()  # type: ignore[attr-defined]
+                nodes.extend(node for _, _, node in targets)
+
+            await read_ua_values(nodes)
+            # best of 3 runs, the differences are small
+            elapsed = float("inf")
+            for _ in range(3):
+                started_at = time.perf_counter()
+                for _ in range(rounds):
+                    await read_ua_values(nodes)
+                elapsed = min(elapsed, time.perf_counter() - started_at)
+            return len(nodes) * rounds / elapsed
+
+
+async def main(count: int = 200, rounds: int = 20) -> None:
+    for label, server_args, client_args in configs:
+        throughput = await bulk_read(server_args, client_args, count, rounds)
+        print(f"opcuax bulk read {label} {throughput:.0f} values/s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
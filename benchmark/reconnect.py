@@ -0,0 +1,76 @@
+import asyncio
+import contextlib
+import logging
+import statistics
+import time
+
+from opcuax import OpcuaClient, OpcuaServer
+
+from benchmark._config import client_settings, server_settings
+from benchmark._models import Printer
+
+
+async def start_server(printers: int) -> OpcuaServer:
+    server = await OpcuaServer.from_settings(server_settings).__aenter__()
+    for i in range(printers):
+        await server.create(f"Printer{i+1}", Printer())
+    return server
+
+
+async def get_printers(client: OpcuaClient, printers: int) -> None:
+    for i in range(printers):
+        await client.get_object(Printer, f"Printer{i+1}")
+
+
+async def reconnect(client: OpcuaClient, printers: int) -> OpcuaClient:
+    await client.reconnect()
+    return client
+
+
+async def rebrowse(client: OpcuaClient, printers: int) -> OpcuaClient:
+    """What an application has to do without reconnect()."""
+    with contextlib.suppress(Exception):
+        await client.__aexit__(None, None, None)
+    client = await OpcuaClient.from_settings(client_settings).__aenter__()
+    await get_printers(client, printers)
+    return client
+
+
+async def recover_benchmark(clients: int, printers: int, mode: str) -> None:
+    server = await start_server(printers)
+    _clients = []
+    for _ in range(clients):
+        client = await OpcuaClient.from_settings(client_settings).__aenter__()
+        await get_printers(client, printers)
+        _clients.append(client)
+
+    await server.__aexit__(None, None, None)
+    server = await start_server(printers)
+    restarted_at = time.monotonic()
+    recover = reconnect if mode == "reconnect" else rebrowse
+
+    async def measure(client: OpcuaClient) -> tuple[OpcuaClient, float]:
+        client = await recover(client, printers)
+        return client, time.monotonic() - restarted_at
+
+    results = await asyncio.gather(*[measure(client) for client in _clients])
+    ms = sorted(t * 1000 for _, t in results)
+    print(
+        "opcuax %s %d clients %d printer p50 %2.3f ms max %2.3f ms"
+        % (mode, clients, printers, statistics.median(ms), ms[-1])
+    )
+
+    for client, _ in results:
+        await client.__aexit__(None, None, None)
+    await server.__aexit__(None, None, None)
+
+
+async def main(printers: int = 10) -> None:
+    for clients in [1, 10, 50]:
+        await recover_benchmark(clients, printers, "reconnect")
+        await recover_benchmark(clients, printers, "rebrowse")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+import asyncio
+import gc
+import logging
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Annotated
+
+from opcuax import OpcuaClient, OpcuaModel, OpcuaServer, RingBuffer
+from opcuax.history import History
+from pydantic import BaseModel
+
+from benchmark._config import client_settings, server_settings
+
+
+class Temperature(BaseModel):
+    actual: Annotated[float, RingBuffer(1000)] = 0
+    target: float = 0
+
+
+class Printer(OpcuaModel):
+    state: str = "N/A"
+    nozzle: Temperature = Temperature()
+    bed: Temperature = Temperature()
+
+
+def measure(label: str, samples: int, append: Callable[[float, float], None]) -> None:
+    gc.collect()
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    for i in range(samples):
+        append(i * 0.1, i)
+    elapsed = time.perf_counter() - started_at
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        "opcuax %s %d samples %.0f ns per append %d KiB"
+        % (label, samples, elapsed / samples * 1e9, size / 1024)
+    )
+
+
+def append_benchmark(samples: int = 1_000_000, size: int = 1000) -> None:
+    history = History(size)
+    measure("ring_buffer", samples, lambda v, t: history.append(v, t))
+
+    # what we did before: lists growing forever
+    values: list[tuple[float, float]] = []
+    measure("list", samples, lambda v, t: values.append((t, v)))
+
+    started_at = time.perf_counter()
+    for _ in range(100):
+        history.mean(), history.min(), history.max(), history.rate()
+    ring_time = (time.perf_counter() - started_at) / 100
+    window = [v for _, v in values[-size:]]
+    started_at = time.perf_counter()
+    for _ in range(100):
+        statistics.fmean(window), min(window), max(window)
+        (window[-1] - window[0]) / (values[-1][0] - values[-size][0])
+    list_time = (time.perf_counter() - started_at) / 100
+    print(
+        "opcuax stats over %d samples ring_buffer %.1f us list %.1f us"
+        % (size, ring_time * 1e6, list_time * 1e6)
+    )
+
+
+async def refresh_benchmark(printers: int = 100, rounds: int = 20) -> None:
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for i in range(printers):
+            await server.create(f"Printer{i+1}", Printer())
+
+        async with OpcuaClient.from_settings(client_settings) as client:
+            models = [
+                await client.get_object(Printer, f"Printer{i+1}")
+                for i in range(printers)
+            ]
+            started_at = time.perf_counter()
+            for _ in range(rounds):
+                for model in models:
+                    await client.refresh(model)
+            elapsed = time.perf_counter() - started_at
+            history = client.history(models[0].nozzle, "actual")
+            print(
+                "opcuax refresh %d printers with 2 ring buffers %.2f ms per round, "
+                "%d samples each" % (printers, elapsed / rounds * 1000, len(history))
+            )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    append_benchmark()
+    asyncio.run(refresh_benchmark())
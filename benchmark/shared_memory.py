@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import time
+from multiprocessing.context import SpawnProcess
+from typing import Any
+
+from opcuax import OpcuaServer
+from opcuax.shared import SharedTable
+
+from benchmark._config import server_settings
+from benchmark._helper import random_printer
+from benchmark._models import Printer
+
+ctx = multiprocessing.get_context("spawn")
+
+
+def shared_producer(table: SharedTable[Printer], names: list[str], n: int) -> None:
+    with table:
+        for _ in range(n):
+            for name in names:
+                table.write(name, random_printer())
+
+
+def queue_producer(q: "queue.Queue[Any]", names: list[str], n: int) -> None:
+    for _ in range(n):
+        for name in names:
+            q.put((name, random_printer()))
+
+
+def start(target: Any, args: list[tuple[Any, ...]]) -> list[SpawnProcess]:
+    processes = [ctx.Process(target=target, args=arg) for arg in args]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def report(api: str, producers: int, writes: int, commits: int, t: float) -> None:
+    print(
+        "opcuax %s %d producers %d writes %d commits %2.3f sec %.0f writes/sec"
+        % (api, producers, writes, commits, t, writes / t)
+    )
+
+
+async def shared_memory_benchmark(printers: int, producers: int, n: int) -> None:
+    names = [f"Printer{i+1}" for i in range(printers)]
+
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for name in names:
+            await server.create(name, Printer())
+
+        with SharedTable(Printer, names) as table:
+            started_at = time.time()
+            processes = start(
+                shared_producer,
+                [(table, names[i::producers], n) for i in range(producers)],
+            )
+            while any(process.is_alive() for process in processes):
+                await table.sync(server)
+                await asyncio.sleep(0.01)
+            await table.sync(server)
+
+            t = time.time() - started_at
+            report("shared-memory", producers, printers * n, table.committed, t)
+
+
+async def queue_benchmark(printers: int, producers: int, n: int) -> None:
+    names = [f"Printer{i+1}" for i in range(printers)]
+
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for name in names:
+            await server.create(name, Printer())
+
+        q = ctx.Queue()
+        commits = 0
+        started_at = time.time()
+        processes = start(
+            queue_producer, [(q, names[i::producers], n) for i in range(producers)]
+        )
+
+        received = 0
+        while received < printers * n:
+            latest = {}
+            try:
+                while received < printers * n:
+                    name, printer = q.get_nowait()
+                    latest[name] = printer
+                    received += 1
+            except queue.Empty:
+                await asyncio.sleep(0.01)
+
+            for name, printer in latest.items():
+                await server.update(name, printer)
+            commits += len(latest)
+
+        for process in processes:
+            process.join()
+
+        t = time.time() - started_at
+        report("mp-queue", producers, received, commits, t)
+
+
+async def main(printers: int = 100, n: int = 2000) -> None:
+    for producers in [1, 2, 4, 8]:
+        await shared_memory_benchmark(printers, producers, n)
+        await queue_benchmark(printers, producers, n)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+import time
+
+from opcuax import OpcuaClient, OpcuaServer, trace_requests
+
+from benchmark._models import Printer
+
+__url = "opc.tcp://localhost:4840"
+__ns = "https://github.com/monash-automation/opcuax"
+
+
+async def run(count: int, string_node_ids: bool) -> None:
+    async with OpcuaServer(
+        __url, "Opcua Lab Server", __ns, string_node_ids=string_node_ids
+    ) as server:
+        await server.create_ua_object_type(Printer)
+        started_at = time.perf_counter()
+        for i in range(count):
+            await server.create(f"Printer{i+1}", Printer())
+        create = (time.perf_counter() - started_at) / count
+
+        async with OpcuaClient(__url, __ns, string_node_ids=string_node_ids) as client:
+            started_at = time.perf_counter()
+            with trace_requests(client) as trace:
+                for i in range(count):
+                    await client.get_object(Printer, f"Printer{i+1}")
+            get_object = (time.perf_counter() - started_at) / count
+
+    kind = "string" if string_node_ids else "numeric"
+    requests = trace.count() / count
+    print(
+        f"opcuax {kind} NodeIds create {create * 1000:.2f} ms, "
+        f"get_object {get_object * 1000:.2f} ms, {requests:.1f} requests each"
+    )
+
+
+async def main(count: int = 500) -> None:
+    await run(count, False)
+    await run(count, True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import statistics
+import threading
+import time
+
+from opcuax import OpcuaClient, OpcuaServer
+
+from benchmark._config import client_settings, server_settings
+from benchmark._helper import random_printer
+from benchmark._models import Printer
+
+
+def busy(seconds: float) -> None:
+    """Simulate a CPU-heavy handler of the application."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def measure_client(
+    latencies: list[float], ready: threading.Event, stop: threading.Event
+) -> None:
+    async with OpcuaClient.from_settings(client_settings) as client:
+        ns = client.namespace
+        node = await client.ua_objects_node.get_child([f"{ns}:Printer1", f"{ns}:state"])
+        ready.set()
+        while not stop.is_set():
+            started_at = time.perf_counter()
+            await node.read_value()
+            latencies.append(time.perf_counter() - started_at)
+            await asyncio.sleep(0.001)
+
+
+async def start_client(
+    latencies: list[float], stop: threading.Event
+) -> threading.Thread:
+    """Start a client on another thread and wait until it is connected."""
+    ready = threading.Event()
+    thread = threading.Thread(
+        target=lambda: asyncio.run(measure_client(latencies, ready, stop))
+    )
+    thread.start()
+    await asyncio.to_thread(ready.wait)
+    return thread
+
+
+def report(mode: str, work: float, latencies: list[float]) -> None:
+    ms = sorted(t * 1000 for t in latencies)
+    p99 = ms[int(len(ms) * 0.99)]
+    print(
+        "opcuax %s busy %d ms %d reads p50 %2.3f ms p99 %2.3f ms max %2.3f ms"
+        % (mode, work * 1000, len(ms), statistics.median(ms), p99, ms[-1])
+    )
+
+
+async def in_loop_benchmark(printers: int, work: float, seconds: float) -> None:
+    latencies: list[float] = []
+    stop = threading.Event()
+
+    async with OpcuaServer.from_settings(server_settings) as server:
+        for i in range(printers):
+            await server.create(f"Printer{i+1}", Printer())
+        client = await start_client(latencies, stop)
+
+        end = time.time() + seconds
+        while time.time() < end:
+            busy(work)
+            for i in range(printers):
+                await server.update(f"Printer{i+1}", random_printer())
+            await asyncio.sleep(0)
+
+        stop.set()
+        await asyncio.to_thread(client.join)
+
+    report("in-loop", work, latencies)
+
+
+async def thread_benchmark(printers: int, work: float, seconds: float) -> None:
+    latencies: list[float] = []
+    stop = threading.Event()
+
+    with OpcuaServer.from_settings(server_settings).start_in_thread() as server:
+        for i in range(printers):
+            server.create(f"Printer{i+1}", Printer()).result()
+        client = await start_client(latencies, stop)
+
+        end = time.time() + seconds
+        while time.time() < end:
+            busy(work)
+            for i in range(printers):
+                server.update(f"Printer{i+1}", random_printer())
+            await asyncio.sleep(0)
+
+        stop.set()
+        await asyncio.to_thread(client.join)
+
+    report("thread", work, latencies)
+
+
+async def main(printers: int = 10, seconds: float = 5) -> None:
+    for work in [0.005, 0.02, 0.1]:
+        await in_loop_benchmark(printers, work, seconds)
+        await thread_benchmark(printers, work, seconds)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(main())
@@ -1,12 +1,49 @@
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __all__ = [
     "OpcuaModel",
     "OpcuaServer",
     "OpcuaClient",
+    "OpcuaGateway",
     "OpcuaServerSettings",
     "OpcuaClientSettings",
+    "trace_requests",
+    "computed",
+    "RingBuffer",
 ]
 
-from .client import OpcuaClient
-from .model import OpcuaModel
-from .server import OpcuaServer
-from .settings import OpcuaClientSettings, OpcuaServerSettings
+# submodules are imported on first access, so defining models does not load
+# the asyncua client/server stack and pydantic-settings
+__modules = {
+    "OpcuaModel": ".base",
+    "OpcuaServer": ".server",
+    "OpcuaClient": ".client",
+    "OpcuaGateway": ".gateway",
+    "OpcuaServerSettings": ".settings",
+    "OpcuaClientSettings": ".settings",
+    "trace_requests": ".tracing",
+    "computed": ".base",
+    "RingBuffer": ".history",
+}
+
+if TYPE_CHECKING:
+    from .base import OpcuaModel, computed
+    from .client import OpcuaClient
+    from .gateway import OpcuaGateway
+    from .history import RingBuffer
+    from .server import OpcuaServer
+    from .settings import OpcuaClientSettings, OpcuaServerSettings
+    from .tracing import trace_requests
+
+
+def __getattr__(name: str) -> Any:
+    if name not in __modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(__modules[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,170 @@
+import heapq
+import json
+from collections import Counter
+from collections.abc import Callable
+from functools import reduce
+from typing import Any, Literal
+
+from asyncua import ua
+from pydantic import BaseModel
+
+from .helper import field_class, is_model_class
+from .model import EnhancedModel
+
+AggregateKind = Literal["mean", "sum", "min", "max", "count", "counts"]
+
+variant_types = {
+    "mean": ua.VariantType.Double,
+    "sum": ua.VariantType.Double,
+    "min": ua.VariantType.Double,
+    "max": ua.VariantType.Double,
+    "count": ua.VariantType.Int64,
+    # JSON object of the number of objects per value
+    "counts": ua.VariantType.String,
+}
+
+
+def field_type(model_class: type[BaseModel], path: str) -> type[Any]:
+    """Class of the field at ``path``, e.g. ``"nozzle.actual"``."""
+    cls: type[Any] = model_class
+    for part in path.split("."):
+        info = cls.model_fields.get(part) if is_model_class(cls) else None
+        if info is None:
+            raise ValueError(f"{model_class.__name__} has no field {path}")
+        cls = field_class(info)
+    return cls
+
+
+class Aggregate:
+    """A field aggregated over all objects of a model class.
+
+    The aggregate is updated with each value written, by replacing the
+    previous value of the object: O(1) for sums and counts, O(log n) for
+    min and max which keep heaps of values with stale entries dropped lazily.
+    Sums of int fields are exact, sums of float fields are compensated so
+    rounding errors do not accumulate over the writes of a long running server.
+    """
+
+    name: str
+    model_class: type[BaseModel]
+    path: str
+    kind: AggregateKind
+    # the variable exposing the aggregate
+    nodeid: ua.NodeId
+    # current value of each object
+    values: dict[str, Any]
+    dirty: bool
+
+    def __init__(
+        self, name: str, model_class: type[BaseModel], path: str, kind: AggregateKind
+    ) -> None:
+        if kind not in variant_types:
+            raise ValueError(f"unknown aggregate {kind}")
+        cls = field_type(model_class, path)
+        if kind in ("mean", "sum", "min", "max") and not (
+            isinstance(cls, type) and issubclass(cls, (int, float))
+        ):
+            raise ValueError(f"{kind} of {model_class.__name__}.{path} is not a number")
+        self.name = name
+        self.model_class = model_class
+        self.path = path
+        self.kind = kind
+        self.nodeid = ua.NodeId()
+        self.values = {}
+        self.dirty = False
+        # int values are summed exactly, floats with a Neumaier compensation
+        self.int_total = 0
+        self.float_total = 0.0
+        self.compensation = 0.0
+        self.counts: Counter[Any] = Counter()
+        self.heap: list[tuple[Any, str]] = []
+
+    @property
+    def variant_type(self) -> ua.VariantType:
+        return variant_types[self.kind]
+
+    def set(self, key: str, value: Any) -> None:
+        """Set the value of one object."""
+        old = self.values.get(key)
+        if key in self.values and old == value:
+            return
+        if key in self.values:
+            self.__remove(old)
+        self.values[key] = value
+        self.dirty = True
+
+        if self.kind in ("mean", "sum"):
+            self.__add(value)
+        elif self.kind == "counts":
+            self.counts[value] += 1
+        elif self.kind in ("min", "max"):
+            heapq.heappush(self.heap, self.__entry(key, value))
+            # stale entries are dropped when they reach the top, rebuild the
+            # heap before they outnumber current values
+            if len(self.heap) > 2 * len(self.values) + 16:
+                self.heap = [self.__entry(k, v) for k, v in self.values.items()]
+                heapq.heapify(self.heap)
+
+    def __entry(self, key: str, value: Any) -> tuple[Any, str]:
+        return (value if self.kind == "min" else -value, key)
+
+    def __add(self, value: Any) -> None:
+        if isinstance(value, int):
+            self.int_total += value
+            return
+        total = self.float_total + value
+        if abs(self.float_total) >= abs(value):
+            self.compensation += (self.float_total - total) + value
+        else:
+            self.compensation += (value - total) + self.float_total
+        self.float_total = total
+
+    @property
+    def total(self) -> float:
+        return self.int_total + (self.float_total + self.compensation)
+
+    def __remove(self, value: Any) -> None:
+        if self.kind in ("mean", "sum"):
+            self.__add(-value)
+        elif self.kind == "counts":
+            self.counts[value] -= 1
+            if not self.counts[value]:
+                del self.counts[value]
+
+    def value(self) -> Any:
+        count = len(self.values)
+        if self.kind == "sum":
+            return self.total
+        elif self.kind == "mean":
+            return self.total / count if count else 0.0
+        elif self.kind == "count":
+            return count
+        elif self.kind == "counts":
+            return json.dumps({str(k): v for k, v in self.counts.items()})
+
+        while self.heap:
+            value, key = self.heap[0]
+            if key in self.values and self.__entry(key, self.values[key])[0] == value:
+                return float(value if self.kind == "min" else -value)
+            heapq.heappop(self.heap)
+        return 0.0
+
+
+def field_target(
+    model: EnhancedModel, path: str
+) -> tuple[ua.NodeId, Any, Callable[[Any], Any]]:
+    """NodeId written when the field at ``path`` of an object changes, its
+    current value and how to get the field value from a written value."""
+    *parents, name = path.split(".")
+    struct_root = model._state.struct_root
+    if struct_root is not None:
+        value = reduce(lambda m, part: m.__dict__[part], path.split("."), model)
+        return (
+            struct_root._node.nodeid,
+            value,
+            lambda ua_value: reduce(getattr, path.split("."), ua_value),
+        )
+
+    for part in parents:
+        model = model.__dict__[part]
+    return model.field_node(name).nodeid, model.__dict__[name], lambda value: value
@@ -0,0 +1,42 @@
+from collections.abc import Callable
+from typing import Any, ClassVar, TypeVar
+
+from pydantic import BaseModel, computed_field
+
+
+class OpcuaModel(BaseModel):
+    """Base class of object types, enhanced classes are generated on first use.
+
+    Defining models only imports pydantic, OPC UA modules are loaded by the
+    server or client.
+    """
+
+    # store the whole object in one variable of a generated structured DataType
+    opcua_struct: ClassVar[bool] = False
+
+
+TOpcuaModel = TypeVar("TOpcuaModel", bound=OpcuaModel)
+OpcuaModelType = type[TOpcuaModel]
+
+
+def computed(ttl: float = 0) -> Callable[[Callable[[Any], Any]], Any]:
+    """Declare a read-only variable which the server computes when it is read.
+
+    The value is cached for ``ttl`` seconds. Pydantic ``computed_field``
+    properties are served the same way without caching.
+
+    ```python
+    class Job(OpcuaModel):
+        time_left: float
+
+        @computed(ttl=1)
+        def time_left_approx(self) -> float:
+            return round(self.time_left, -1)
+    ```
+    """
+
+    def decorator(func: Callable[[Any], Any]) -> Any:
+        func.opcua_ttl = ttl  # type: ignore[attr-defined]
+        return computed_field(property(func))
+
+    return decorator
@@ -0,0 +1,112 @@
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterator
+from itertools import chain
+
+from pydantic import BaseModel
+
+from .model import EnhancedModel
+
+ObjectKey = tuple[type[BaseModel], str]
+
+
+def release(model: EnhancedModel) -> None:
+    """Free the NodeTable rows of a model and its nested models once they are
+    not referenced anymore, by callers or by writes and refreshes in flight."""
+    state = model._state
+    if state.table is not None:
+        weakref.finalize(model, state.table.free, state.row)
+    # nested models of a struct object have no rows
+    if state.struct_root is None:
+        for value in model.__dict__.values():
+            if isinstance(value, EnhancedModel):
+                release(value)
+
+
+class ObjectCache:
+    """Objects returned by ``get_object``, by model class and object name.
+
+    Beyond ``maxsize`` objects, the least recently used object which is not
+    pinned is evicted: ``get_object`` browses it again and returns a new model.
+    Its nodes are released when the evicted model is not referenced anymore,
+    so models kept by callers, with assignments not committed yet, still work.
+    Pins outlive ``clear()``.
+    """
+
+    maxsize: int | None
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lru: OrderedDict[ObjectKey, EnhancedModel] = OrderedDict()
+        self.pinned: dict[ObjectKey, EnhancedModel] = {}
+        self.pins: set[ObjectKey] = set()
+
+    def get(self, cls: type[BaseModel], name: str) -> EnhancedModel | None:
+        key = (cls, name)
+        model = self.pinned.get(key)
+        if model is None:
+            model = self.lru.get(key)
+            if model is not None:
+                self.lru.move_to_end(key)
+
+        if model is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return model
+
+    def put(self, cls: type[BaseModel], name: str, model: EnhancedModel) -> None:
+        key = (cls, name)
+        if key in self.pins:
+            self.pinned[key] = model
+        else:
+            self.lru[key] = model
+            self.lru.move_to_end(key)
+            self.__evict()
+
+    def pin(self, cls: type[BaseModel], name: str) -> None:
+        """Never evict this object, e.g. while it is watched."""
+        key = (cls, name)
+        self.pins.add(key)
+        model = self.lru.pop(key, None)
+        if model is not None:
+            self.pinned[key] = model
+
+    def unpin(self, cls: type[BaseModel], name: str) -> None:
+        key = (cls, name)
+        self.pins.discard(key)
+        model = self.pinned.pop(key, None)
+        if model is not None:
+            self.lru[key] = model
+            self.__evict()
+
+    def values(self) -> Iterator[EnhancedModel]:
+        return chain(self.pinned.values(), self.lru.values())
+
+    def items(self) -> Iterator[tuple[ObjectKey, EnhancedModel]]:
+        return chain(self.pinned.items(), self.lru.items())
+
+    def clear(self) -> None:
+        self.lru.clear()
+        self.pinned.clear()
+
+    def __len__(self) -> int:
+        return len(self.lru) + len(self.pinned)
+
+    def __contains__(self, key: ObjectKey) -> bool:
+        return key in self.pinned or key in self.lru
+
+    def __evict(self) -> None:
+        if self.maxsize is None:
+            return
+        # the most recent object is kept, it is being returned by get_object
+        while len(self.lru) > 1 and len(self) > self.maxsize:
+            _, model = self.lru.popitem(last=False)
+            release(model)
+            self.evictions += 1
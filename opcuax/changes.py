@@ -0,0 +1,56 @@
+import asyncio
+import time
+import weakref
+from collections.abc import AsyncGenerator
+from typing import Any, NamedTuple
+
+from .values import opcua_value
+
+
+class Change(NamedTuple):
+    timestamp: float
+    object: str
+    # dotted field path inside the object, for example "bed.actual"
+    path: str
+    value: Any
+
+
+class ChangeFeed:
+    """Fan-out of value changes to all running ``subscribe()`` generators.
+
+    Each subscriber has a bounded queue, ``publish`` waits while a queue is full
+    so slow consumers slow down writers instead of growing memory.
+    Subscribers are dropped when their generator is closed or collected.
+    """
+
+    queues: set[asyncio.Queue[Change]]
+
+    def __init__(self) -> None:
+        self.queues = set()
+
+    async def publish(self, obj: str, path: str, value: Any) -> None:
+        if not self.queues:
+            return
+
+        change = Change(time.time(), obj, path, opcua_value(value))
+        for queue in list(self.queues):
+            await queue.put(change)
+
+    def subscribe(self, maxsize: int = 10000) -> AsyncGenerator[Change, None]:
+        # register now, not on the first iteration, so no change is missed
+        queue: asyncio.Queue[Change] = asyncio.Queue(maxsize)
+        self.queues.add(queue)
+        generator = self.__consume(queue)
+        # a generator dropped without being closed, or never iterated, does not
+        # run its finally block and would block writers once its queue is full
+        weakref.finalize(generator, self.queues.discard, queue)
+        return generator
+
+    async def __consume(
+        self, queue: asyncio.Queue[Change]
+    ) -> AsyncGenerator[Change, None]:
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.queues.discard(queue)
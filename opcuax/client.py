@@ -1,24 +1,63 @@
+import asyncio
+import contextlib
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable
 from types import TracebackType
 
 from asyncua import Client
+from pydantic import BaseModel
 
 from .core import Opcuax
+from .loopback import LoopbackClient, is_loopback
+from .model import EnhancedModel
+from .poll import PollGroup, PollScheduler
 from .settings import EnvOpcuaClientSettings, OpcuaClientSettings
 
 
 class OpcuaClient(Opcuax):
     client: Client
     server_namespace: str
+    auto_reconnect: bool
+    check_interval: float
+    reconnects: int
+    # seconds the last reconnect took, until all known objects were read again
+    recovery_time: float
+    # called after each reconnect, e.g. to create subscriptions again
+    on_reconnect: list[Callable[[], Awaitable[None]]]
 
-    def __init__(self, endpoint: str, namespace: str):
-        super().__init__(endpoint, namespace)
-        self.client: Client = Client(endpoint)
+    def __init__(
+        self,
+        endpoint: str,
+        namespace: str,
+        auto_reconnect: bool = False,
+        check_interval: float = 1,
+        max_objects: int | None = None,
+        string_node_ids: bool = False,
+        request_timeout: float = 4,
+        max_message_size: int = 0,
+    ):
+        super().__init__(endpoint, namespace, max_objects, string_node_ids)
+        # clients of a server of this process without socket, see loopback.py
+        client_class = LoopbackClient if is_loopback(endpoint) else Client
+        self.client: Client = client_class(endpoint, timeout=request_timeout)
+        self.client.max_messagesize = max_message_size
+        self.auto_reconnect = auto_reconnect
+        self.check_interval = check_interval
+        self.reconnects = 0
+        self.recovery_time = 0
+        self.on_reconnect = []
+        self.watch_task: asyncio.Task[None] | None = None
+        self.poll_scheduler: PollScheduler | None = None
 
     @staticmethod
     def from_settings(settings: OpcuaClientSettings) -> "OpcuaClient":
         return OpcuaClient(
             endpoint=str(settings.opcua_server_url),
             namespace=str(settings.opcua_server_namespace),
+            string_node_ids=settings.opcua_string_node_ids,
+            request_timeout=settings.opcua_request_timeout,
+            max_message_size=settings.opcua_max_message_size,
         )
 
     @staticmethod
@@ -26,10 +65,120 @@ class OpcuaClient(Opcuax):
         settings = EnvOpcuaClientSettings(_env_file=env_file)
         return OpcuaClient.from_settings(settings)
 
+    async def reconnect(
+        self,
+        base_delay: float = 0.1,
+        max_delay: float = 10,
+        max_attempts: int | None = None,
+    ) -> None:
+        """Connect again and read all known objects in one request.
+
+        Attempts wait a random delay up to ``base_delay * 2 ** attempt`` seconds
+        (at most ``max_delay``), so many clients losing the same server do not
+        reconnect at once. Resolved nodes and enhanced models are kept, nothing
+        is browsed again unless the objects are gone from the server.
+        Subscriptions of the session are deleted by the server, ``on_reconnect``
+        callbacks are awaited after all known objects were read again.
+        """
+        started_at = time.monotonic()
+        with contextlib.suppress(Exception):
+            await self.client.disconnect()
+
+        attempt = 0
+        while True:
+            delay = min(max_delay, base_delay * 2**attempt)
+            await asyncio.sleep(random.uniform(0, delay))
+            attempt += 1
+            try:
+                await self.client.connect()
+                break
+            except Exception as e:
+                if max_attempts is not None and attempt >= max_attempts:
+                    raise
+                self.logger.info("reconnect attempt %d failed: %r", attempt, e)
+
+        namespace = await self.client.get_namespace_index(self.namespace_uri)
+        if namespace != self.namespace:
+            self.namespace = namespace
+            self.drop_objects()
+        await self.load_operation_limits()
+        await self.resync()
+        for callback in self.on_reconnect:
+            await callback()
+
+        self.reconnects += 1
+        self.recovery_time = time.monotonic() - started_at
+
+    def poll(
+        self,
+        models: Iterable[BaseModel],
+        interval: float,
+        paths: Iterable[str] | None = None,
+        max_interval: float | None = None,
+    ) -> PollGroup:
+        """Read ``models`` every ``interval`` seconds until the group is cancelled.
+
+        All polled models share one timer, models due in the same tick are read
+        in one request and first reads are spread over one interval.
+        ``paths`` (e.g. ``["bed.actual"]``) limits the fields read, they are
+        ignored for objects stored in one variable.
+        The interval grows up to ``max_interval`` (default ``8 * interval``)
+        while the server is too slow, see ``PollGroup``.
+        Polled objects are pinned in ``objects`` until the group is cancelled.
+        """
+        models = list(models)
+        group = PollGroup(interval, paths, max_interval or 8 * interval)
+        if self.poll_scheduler is None:
+            self.poll_scheduler = PollScheduler(self)
+        self.poll_scheduler.add(group, models)
+
+        keys = [
+            (type(model).origin, model._state.name)
+            for model in models
+            if isinstance(model, EnhancedModel) and not model._state.path
+        ]
+        for key in keys:
+            self.objects.pin(*key)
+
+        def unpin() -> None:
+            for key in keys:
+                self.objects.unpin(*key)
+
+        group.on_cancel = unpin
+        return group
+
+    async def __watch_connection(self) -> None:
+        # failed reconnects are retried with a growing delay, like connects
+        delay = self.check_interval
+        connected = True
+        while True:
+            await asyncio.sleep(delay)
+            if connected:
+                try:
+                    await self.client.check_connection()
+                    continue
+                except Exception:
+                    self.logger.warning(
+                        "connection to %s lost, reconnecting", self.endpoint
+                    )
+                    connected = False
+            try:
+                await self.reconnect()
+            except Exception:
+                self.logger.exception("failed to reconnect to %s", self.endpoint)
+                delay = min(2 * delay, max(self.check_interval, 10))
+            else:
+                connected = True
+                delay = self.check_interval
+
     async def __aenter__(self) -> "OpcuaClient":
         await self.client.__aenter__()
         self.namespace = await self.client.get_namespace_index(self.namespace_uri)
         self.ua_objects_node = self.client.get_objects_node()
+        self.ua_structure_type_node = self.client.nodes.base_structure_type
+        await self.load_operation_limits()
+        if self.auto_reconnect:
+            self.watch_task = asyncio.create_task(self.__watch_connection())
         return self
 
     async def __aexit__(
@@ -38,4 +187,10 @@ class OpcuaClient(Opcuax):
         exc_val: BaseException | None,
         exc_tb: TracebackType | None,
     ) -> None:
+        if self.watch_task is not None:
+            self.watch_task.cancel()
+            self.watch_task = None
+        if self.poll_scheduler is not None:
+            await self.poll_scheduler.close()
+            self.poll_scheduler = None
         await self.client.__aexit__(exc_type, exc_val, exc_tb)
@@ -0,0 +1,80 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from logging import Logger
+from typing import Any
+
+from asyncua import ua
+from asyncua.server.address_space import AddressSpace
+from pydantic import BaseModel
+
+from .model import EnhancedModel
+from .values import opcua_value, python_field_value
+
+
+def snapshot(model: EnhancedModel, aspace: AddressSpace) -> BaseModel:
+    """A plain copy of a model with the values stored in the address space,
+    including values written by clients which the server model has not seen."""
+    state = model._state
+    if state.table is None:
+        return model
+    fields: dict[str, Any] = {}
+    for name, info in type(model).model_fields.items():
+        value = model.__dict__[name]
+        if isinstance(value, EnhancedModel):
+            fields[name] = snapshot(value, aspace)
+            continue
+        nodeid = state.table.get(state.row, type(model).columns[name])
+        result = aspace.read_attribute_value(nodeid, ua.AttributeIds.Value)
+        # e.g. bytes being uploaded in chunks
+        if result.StatusCode.is_good():
+            value = python_field_value(info, result.Value.Value)
+        fields[name] = value
+    return model.origin.model_construct(**fields)
+
+
+@dataclass(slots=True)
+class ComputedVariable:
+    """Value callback of a computed field, evaluated when a client reads it.
+
+    Values are computed from the variables of the object, so writes of clients
+    are taken into account, and cached for ``ttl`` seconds. The asyncua server
+    does not sample values, subscriptions only receive the value when they are
+    created.
+    """
+
+    model: Any
+    name: str
+    variant_type: ua.VariantType
+    ttl: float
+    logger: Logger
+    aspace: AddressSpace
+    # times the field was evaluated
+    computations: int = 0
+    expires_at: float = float("-inf")
+    value: ua.DataValue | None = None
+
+    def __call__(self, nodeid: ua.NodeId, attr: ua.AttributeIds) -> ua.DataValue:
+        now = time.monotonic()
+        if self.value is not None and now < self.expires_at:
+            return self.value
+
+        self.computations += 1
+        try:
+            value = getattr(snapshot(self.model, self.aspace), self.name)
+        except Exception:
+            self.logger.exception(
+                "failed to compute %s.%s", type(self.model).__name__, self.name
+            )
+            return ua.DataValue(
+                StatusCode_=ua.StatusCode(ua.StatusCodes.BadInternalError)
+            )
+
+        timestamp = datetime.now(timezone.utc)
+        self.value = ua.DataValue(
+            ua.Variant(opcua_value(value), self.variant_type),
+            SourceTimestamp=timestamp,
+            ServerTimestamp=timestamp,
+        )
+        self.expires_at = now + self.ttl
+        return self.value
@@ -1,35 +1,129 @@
 import asyncio
+import contextlib
 import logging
+import time
 from abc import ABC
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
 from logging import Logger
-from typing import TypeVar
+from typing import Any, TypeVar
 
-from asyncua import Node
+from asyncua import Node, ua
 from pydantic import BaseModel
 
-from .helper import field_class
-from .model import EnhancedModel, TBaseModel, TOpcuaModel, UpdateTask
-from .node import read_ua_variable
+from .base import TOpcuaModel
+from .cache import ObjectCache
+from .changes import Change, ChangeFeed
+from .helper import field_class, is_model_class
+from .history import History
+from .model import (
+    EnhancedModel,
+    ModelContext,
+    ModelState,
+    TBaseModel,
+    UpdateTask,
+    enhanced_model_class,
+    mark_refreshed,
+)
+from .node import (
+    NodeTable,
+    OperationLimits,
+    blob_chunk_size,
+    operation_limits,
+    path_node_id,
+    read_ua_bytes,
+    read_ua_values,
+    read_ua_variable,
+    write_ua_bytes,
+)
+from .structure import (
+    data_type_name,
+    from_ua_struct,
+    load_ua_struct,
+    struct_classes,
+    ua_struct_classes,
+)
+from .values import python_field_value
 
 T = TypeVar("T")
+# (model, field name or None for a struct root, node)
+ReadTarget = tuple[EnhancedModel, str | None, Node]
+
+
+async def read_targets(model: EnhancedModel) -> list[ReadTarget]:
+    """Nodes to read for the latest values of a model."""
+    root = model._state.struct_root
+    if root is not None:
+        return [(root, None, root._node)]
+    return list(await model.variable_nodes())
+
+
+async def receive_ua_values(
+    targets: list[ReadTarget], results: list[ua.DataValue]
+) -> int:
+    """Set values read for ``targets``, returns the number of changed values."""
+    changed = 0
+    for (model, name, _), result in zip(targets, results):
+        if not result.StatusCode.is_good():
+            continue
+        value = result.Value.Value
+        if name is None:
+            changed += await model.receive_struct(value)
+        else:
+            info = type(model).model_fields[name]
+            changed += await model.receive(name, python_field_value(info, value))
+    return changed
+
+
+@dataclass
+class ReadCacheStats:
+    # refreshes answered from a recent read
+    hits: int = 0
+    # refreshes that sent a read request
+    misses: int = 0
+    # refreshes that waited for a read already in flight
+    shared: int = 0
 
 
 class Opcuax(ABC):
     endpoint: str
     namespace: int
     namespace_uri: str
+    # NodeIds of objects are strings derived from their names and field paths
+    string_node_ids: bool
     logger: Logger
 
     ua_objects_node: Node
-    objects: dict[str, EnhancedModel]
+    ua_structure_type_node: Node
+    objects: ObjectCache
+    node_tables: dict[type[BaseModel], NodeTable]
     update_tasks: asyncio.Queue[UpdateTask]
+    # incremented when known objects are dropped, models of older generations
+    # are browsed again by get_object
+    generation: int
+    read_cache_stats: ReadCacheStats
+    operation_limits: OperationLimits
+    change_feed: ChangeFeed
 
-    def __init__(self, endpoint: str, namespace_uri: str) -> None:
+    def __init__(
+        self,
+        endpoint: str,
+        namespace_uri: str,
+        max_objects: int | None = None,
+        string_node_ids: bool = False,
+    ) -> None:
         self.endpoint: str = endpoint
         self.namespace_uri: str = namespace_uri
+        self.string_node_ids = string_node_ids
         self.logger = logging.getLogger(type(self).__name__)
-        self.objects = {}
+        self.objects = ObjectCache(max_objects)
+        self.node_tables = {}
+        self.__model_context: ModelContext | None = None
         self.update_tasks = asyncio.Queue()
+        self.generation = 0
+        self.read_cache_stats = ReadCacheStats()
+        self.operation_limits = OperationLimits()
+        self.change_feed = ChangeFeed()
 
     async def create(self, name: str, model: TOpcuaModel) -> TOpcuaModel:
         raise NotImplementedError
@@ -37,46 +131,424 @@ class Opcuax(ABC):
     async def get_object(
         self, model_class: type[TOpcuaModel], name: str
     ) -> TOpcuaModel:
-        async def dfs(
-            parent: Node, cls: type[BaseModel], browse_name: str
-        ) -> EnhancedModel:
-            node = await parent.get_child(browse_name)
-            fields = {}
+        cls: type[BaseModel] = getattr(model_class, "origin", model_class)
+        enhanced = self.objects.get(cls, name)
+        if enhanced is None:
+            if self.string_node_ids:
+                nodeid = path_node_id(self.namespace, name)
+                node = Node(self.ua_objects_node.session, nodeid)
+            else:
+                node = await self.ua_objects_node.get_child(f"{self.namespace}:{name}")
+            enhanced = await self.__attach(model_class, name, node)
+
+        assert isinstance(enhanced, model_class)
+        return enhanced
+
+    async def iter_objects(
+        self, model_class: type[TOpcuaModel], batch_size: int = 100
+    ) -> AsyncGenerator[tuple[str, TOpcuaModel], None]:
+        """Find all objects of a model class in the Objects folder.
+
+        The folder is browsed ``batch_size`` references at a time, filtered by
+        the ObjectType (or DataType of struct objects) of ``model_class``.
+        Objects of a page are attached concurrently and yielded while the next
+        page is browsed, combine with ``max_objects`` for very large servers:
+        objects are not evicted before they are yielded.
+        """
+        if model_class.opcua_struct:
+            await self.load_ua_struct_types(model_class)
+            type_node = await self.ua_structure_type_node.get_child(
+                f"{self.namespace}:{data_type_name(model_class)}"
+            )
+            node_class = ua.NodeClass.Variable
+        else:
+            base_object_type = Node(
+                self.ua_objects_node.session, ua.NodeId(ua.ObjectIds.BaseObjectType)
+            )
+            type_node = await base_object_type.get_child(
+                f"{self.namespace}:{model_class.__name__}"
+            )
+            node_class = ua.NodeClass.Object
+
+        cls: type[BaseModel] = getattr(model_class, "origin", model_class)
+
+        async def attach(ref: ua.ReferenceDescription) -> EnhancedModel:
+            name = ref.BrowseName.Name
+            enhanced = self.objects.get(cls, name)
+            if enhanced is None:
+                node = Node(self.ua_objects_node.session, ref.NodeId)
+                enhanced = await self.__attach(model_class, name, node)
+            return enhanced
+
+        pages = self.__browse_objects(node_class, batch_size)
+        next_page = asyncio.ensure_future(anext(pages, None))
+        try:
+            while (refs := await next_page) is not None:
+                next_page = asyncio.ensure_future(anext(pages, None))
+                refs = await self.__filter_type(refs, node_class, type_node.nodeid)
+                # servers may ignore the page size
+                for i in range(0, len(refs), batch_size):
+                    batch = refs[i : i + batch_size]
+                    # objects of the batch are pinned until they are yielded,
+                    # max_objects may be smaller than batch_size
+                    pins = [
+                        (cls, ref.BrowseName.Name)
+                        for ref in batch
+                        if (cls, ref.BrowseName.Name) not in self.objects.pins
+                    ]
+                    for key in pins:
+                        self.objects.pin(*key)
+                    try:
+                        objects = await asyncio.gather(*[attach(ref) for ref in batch])
+                        for ref, enhanced in zip(batch, objects):
+                            assert isinstance(enhanced, model_class)
+                            key = (cls, ref.BrowseName.Name)
+                            if key in pins:
+                                pins.remove(key)
+                                self.objects.unpin(*key)
+                            yield ref.BrowseName.Name, enhanced
+                    finally:
+                        for key in pins:
+                            self.objects.unpin(*key)
+        finally:
+            next_page.cancel()
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await next_page
+            await pages.aclose()
+
+    async def __browse_objects(
+        self, node_class: ua.NodeClass, max_references: int
+    ) -> AsyncGenerator[list[ua.ReferenceDescription], None]:
+        """Pages of the Objects folder, following continuation points."""
+        session = self.ua_objects_node.session
+        desc = ua.BrowseDescription()
+        desc.NodeId = self.ua_objects_node.nodeid
+        desc.BrowseDirection = ua.BrowseDirection.Forward
+        desc.ReferenceTypeId = ua.NodeId(ua.ObjectIds.HierarchicalReferences)
+        desc.IncludeSubtypes = True
+        desc.NodeClassMask = node_class
+        desc.ResultMask = ua.BrowseResultMask.All
+        params = ua.BrowseParameters()
+        params.NodesToBrowse = [desc]
+        params.RequestedMaxReferencesPerNode = max_references
 
+        (result,) = await session.browse(params)
+        continuation_point = None
+        try:
+            while True:
+                result.StatusCode.check()
+                continuation_point = result.ContinuationPoint
+                yield result.References
+                if not continuation_point:
+                    return
+
+                next_params = ua.BrowseNextParameters()
+                next_params.ContinuationPoints = [continuation_point]
+                (result,) = await session.browse_next(next_params)
+        finally:
+            # stopped early, free the continuation point on the server
+            if continuation_point:
+                release = ua.BrowseNextParameters()
+                release.ReleaseContinuationPoints = True
+                release.ContinuationPoints = [continuation_point]
+                with contextlib.suppress(Exception):
+                    await session.browse_next(release)
+
+    async def __filter_type(
+        self,
+        refs: list[ua.ReferenceDescription],
+        node_class: ua.NodeClass,
+        type_id: ua.NodeId,
+    ) -> list[ua.ReferenceDescription]:
+        def same(nodeid: ua.NodeId) -> bool:
+            return (nodeid.Identifier, nodeid.NamespaceIndex) == (
+                type_id.Identifier,
+                type_id.NamespaceIndex,
+            )
+
+        if node_class == ua.NodeClass.Object:
+            return [ref for ref in refs if same(ref.TypeDefinition)]
+        if not refs:
+            return refs
+
+        # struct objects are variables of their DataType
+        session = self.ua_objects_node.session
+        results = await read_ua_values(
+            [Node(session, ref.NodeId) for ref in refs],
+            attribute=ua.AttributeIds.DataType,
+        )
+        return [
+            ref
+            for ref, result in zip(refs, results)
+            if result.StatusCode.is_good() and same(result.Value.Value)
+        ]
+
+    async def __attach(
+        self, model_class: type[BaseModel], name: str, node: Node
+    ) -> EnhancedModel:
+        """Build and cache the enhanced model of an object node."""
+        if getattr(model_class, "opcua_struct", False):
+            enhanced = await self.__get_struct_object(model_class, name, node)
+        elif self.string_node_ids:
+            enhanced = await self.__get_object_by_path(model_class, name)
+        else:
+            enhanced = await self.__get_plain_object(node, model_class, name, "")
+        mark_refreshed(enhanced, time.monotonic())
+        self.objects.put(getattr(model_class, "origin", model_class), name, enhanced)
+        return enhanced
+
+    async def __get_plain_object(
+        self, node: Node, cls: type[BaseModel], name: str, path: str
+    ) -> EnhancedModel:
+        fields = {}
+        nodeids = [node.nodeid]
+
+        for field_name, field_info in cls.model_fields.items():
+            field_cls = field_class(field_info)
+            child_node = await node.get_child(f"{self.namespace}:{field_name}")
+
+            if is_model_class(field_cls):
+                field_path = f"{path}.{field_name}" if path else field_name
+                fields[field_name] = await self.__get_plain_object(
+                    child_node, field_cls, name, field_path
+                )
+            else:
+                fields[field_name] = await read_ua_variable(child_node, field_info)
+                nodeids.append(child_node.nodeid)
+
+        model = enhanced_model_class(cls)(**fields)
+        table = self.node_table(cls)
+        model._state = ModelState(
+            self.model_context(), table, table.append(nodeids), name, path
+        )
+        assert isinstance(model, EnhancedModel)
+
+        return model
+
+    async def __get_object_by_path(
+        self, model_class: type[BaseModel], name: str
+    ) -> EnhancedModel:
+        """Build a plain object from NodeIds derived from its field paths,
+        the values are read in one request without browsing."""
+        session = self.ua_objects_node.session
+        paths: list[str] = []
+
+        def collect(cls: type[BaseModel], path: str) -> None:
             for field_name, field_info in cls.model_fields.items():
-                field_browse_name = f"{self.namespace}:{field_name}"
-                field_cls = field_class(field_info)
+                field_path = f"{path}.{field_name}" if path else field_name
+                if is_model_class(field_class(field_info)):
+                    collect(field_class(field_info), field_path)
+                else:
+                    paths.append(field_path)
 
-                child_node = await node.get_child(field_browse_name)
+        collect(model_class, "")
+        nodes = [Node(session, path_node_id(self.namespace, name, p)) for p in paths]
+        results = dict(zip(paths, await read_ua_values(nodes)))
 
-                if issubclass(field_cls, BaseModel):
-                    fields[field_name] = await dfs(node, field_cls, field_browse_name)
+        def build(cls: type[BaseModel], path: str) -> EnhancedModel:
+            fields = {}
+            row = [path_node_id(self.namespace, name, path)]
+            for field_name, field_info in cls.model_fields.items():
+                field_cls = field_class(field_info)
+                field_path = f"{path}.{field_name}" if path else field_name
+                if is_model_class(field_cls):
+                    fields[field_name] = build(field_cls, field_path)
                 else:
-                    fields[field_name] = await read_ua_variable(child_node, field_cls)
+                    result = results[field_path]
+                    result.StatusCode.check()
+                    fields[field_name] = python_field_value(
+                        field_info, result.Value.Value
+                    )
+                    row.append(path_node_id(self.namespace, name, field_path))
 
-            enhanced_cls: type[EnhancedModel] = EnhancedModel.classes[cls]
-            model = enhanced_cls(**fields)
-            model._tasks = self.update_tasks
-            model._ns = self.namespace
-            model._node = node
+            model = enhanced_model_class(cls)(**fields)
+            table = self.node_table(cls)
+            model._state = ModelState(
+                self.model_context(), table, table.append(row), name, path
+            )
             assert isinstance(model, EnhancedModel)
-
             return model
 
-        if name not in self.objects:
-            enhanced = await dfs(
-                self.ua_objects_node, model_class, f"{self.namespace}:{name}"
+        return build(model_class, "")
+
+    async def load_operation_limits(self) -> None:
+        """Read the OperationLimits of the server, bulk reads and writes
+        of this session are split into requests within them."""
+        session = self.ua_objects_node.session
+        ids = ua.ObjectIds
+        nodes = [
+            Node(session, ua.NodeId(nodeid))
+            for nodeid in (
+                ids.Server_ServerCapabilities_OperationLimits_MaxNodesPerRead,
+                ids.Server_ServerCapabilities_OperationLimits_MaxNodesPerWrite,
             )
-            self.objects[name] = enhanced
+        ]
+        # the limits themselves are read in one request
+        operation_limits.pop(session, None)
+        max_read, max_write = (
+            (result.StatusCode.is_good() and result.Value.Value) or 0
+            for result in await read_ua_values(nodes)
+        )
+        self.operation_limits.max_nodes_per_read = max_read
+        self.operation_limits.max_nodes_per_write = max_write
+        operation_limits[session] = self.operation_limits
 
-        enhanced = self.objects[name]
-        assert isinstance(enhanced, model_class)
-        return enhanced
+    def model_context(self) -> ModelContext:
+        context = self.__model_context
+        if context is None or context.ns != self.namespace:
+            context = ModelContext(
+                self.ua_objects_node.session,
+                self.namespace,
+                self.update_tasks,
+                self.change_feed,
+            )
+            self.__model_context = context
+        return context
+
+    def node_table(self, cls: type[BaseModel]) -> NodeTable:
+        if cls not in self.node_tables:
+            columns = len(enhanced_model_class(cls).columns) + 1
+            self.node_tables[cls] = NodeTable(columns)
+        return self.node_tables[cls]
+
+    async def load_ua_struct_types(self, model_class: type[BaseModel]) -> None:
+        for cls in struct_classes(model_class):
+            if cls in ua_struct_classes:
+                continue
+            node = await self.ua_structure_type_node.get_child(
+                f"{self.namespace}:{data_type_name(cls)}"
+            )
+            await load_ua_struct(cls, node)
+
+    async def __get_struct_object(
+        self, model_class: type[BaseModel], name: str, node: Node
+    ) -> EnhancedModel:
+        await self.load_ua_struct_types(model_class)
+        ua_value = await node.read_value()
+        return self.struct_object(model_class, name, node.nodeid, ua_value)
+
+    def struct_object(
+        self, model_class: type[BaseModel], name: str, nodeid: ua.NodeId, ua_value: Any
+    ) -> EnhancedModel:
+        """Build the enhanced model of a struct object from its value."""
+        models: list[EnhancedModel] = []
+
+        def build(
+            cls: type[BaseModel], fields: dict[str, Any], path: str
+        ) -> EnhancedModel:
+            for field_name, field_info in cls.model_fields.items():
+                field_cls = field_class(field_info)
+
+                if is_model_class(field_cls):
+                    field_path = f"{path}.{field_name}" if path else field_name
+                    fields[field_name] = build(
+                        field_cls, fields[field_name], field_path
+                    )
+
+            model = enhanced_model_class(cls)(**fields)
+            model._state = ModelState(self.model_context(), None, -1, name, path)
+            models.append(model)
+            return model
+
+        root = build(model_class, from_ua_struct(model_class, ua_value), "")
+        table = self.node_table(model_class)
+        root._state.table = table
+        root._state.row = table.append([nodeid])
+        for model in models:
+            model._state.struct_root = root
+
+        return root
+
+    def changes(self, maxsize: int = 10000) -> AsyncGenerator[Change, None]:
+        """Stream value changes made by commit/update or seen by refresh.
 
-    async def refresh(self, model: TBaseModel) -> None:
+        Writers wait while ``maxsize`` changes are not consumed yet.
+        """
+        return self.change_feed.subscribe(maxsize)
+
+    async def refresh(self, model: TBaseModel, max_age: float | None = None) -> None:
+        """Read the latest values of a model.
+
+        If ``max_age`` (seconds) is given, a model read within ``max_age`` is not
+        read again, concurrent refreshes of the same model share one read and
+        ``max_age`` is forwarded as the MaxAge of the read request.
+        """
         if not isinstance(model, EnhancedModel):
             raise ValueError("model must be an object returned from get_object()")
-        await model.refresh()
+
+        state = model._state
+        if max_age is None:
+            await self.__refresh(model, 0)
+        elif time.monotonic() - state.refreshed_at <= max_age:
+            self.read_cache_stats.hits += 1
+        elif state.refresh_task is not None:
+            self.read_cache_stats.shared += 1
+            await asyncio.shield(state.refresh_task)
+        else:
+            self.read_cache_stats.misses += 1
+            task = asyncio.create_task(self.__refresh(model, max_age))
+            state.refresh_task = task
+            task.add_done_callback(lambda _: setattr(state, "refresh_task", None))
+            await asyncio.shield(task)
+
+    async def __refresh(self, model: EnhancedModel, max_age: float) -> None:
+        started_at = time.monotonic()
+        await model.refresh(max_age)
+        mark_refreshed(model, started_at)
+
+    async def resync(self) -> int:
+        """Read all variables of all known objects in one request.
+
+        Returns the number of changed values. If a node is not found, for example
+        after a server restart, all objects are dropped and browsed again by
+        the next ``get_object``. Numeric NodeIds may be reused by other nodes
+        after a restart, their BrowseNames are read along with the values to
+        check that they still are the same objects and fields.
+        """
+        targets: list[ReadTarget] = []
+        for obj in self.objects.values():
+            targets += await read_targets(obj)
+        if not targets:
+            return 0
+
+        nodes = [node for *_, node in targets]
+        names = [name or model._state.name for model, name, _ in targets]
+        for obj in self.objects.values():
+            if obj._state.struct_root is None:
+                nodes.append(obj._node)
+                names.append(obj._state.name)
+
+        started_at = time.monotonic()
+        if self.string_node_ids:
+            results = await read_ua_values(nodes[: len(targets)])
+            same_nodes = True
+        else:
+            results, browse_names = await asyncio.gather(
+                read_ua_values(nodes[: len(targets)]),
+                read_ua_values(nodes, attribute=ua.AttributeIds.BrowseName),
+            )
+            same_nodes = all(
+                result.StatusCode.is_good()
+                and result.Value.Value == ua.QualifiedName(name, self.namespace)
+                for name, result in zip(names, browse_names)
+            )
+        if not same_nodes or not all(result.StatusCode.is_good() for result in results):
+            self.logger.warning(
+                "objects are missing or changed on the server, dropping them"
+            )
+            self.drop_objects()
+            return 0
+
+        changed = await receive_ua_values(targets, results)
+        for obj in self.objects.values():
+            mark_refreshed(obj, started_at)
+        return changed
+
+    def drop_objects(self) -> None:
+        """Forget known objects and their nodes, e.g. after a server restart."""
+        self.objects.clear()
+        self.node_tables.clear()
+        self.generation += 1
 
     async def update(self, name: str, model: TOpcuaModel) -> TOpcuaModel:
         enhanced = await self.get_object(type(model), name)
@@ -84,8 +556,64 @@ class Opcuax(ABC):
         await enhanced.update_self(model)
         return enhanced
 
+    async def read_bytes(
+        self, model: BaseModel, name: str, chunk_size: int = blob_chunk_size
+    ) -> Any:
+        """Read a bytes field in chunks, e.g. a file larger than one message."""
+        assert isinstance(model, EnhancedModel)
+        data = await read_ua_bytes(model.field_node(name), chunk_size)
+        value = python_field_value(type(model).model_fields[name], data)
+        await model.receive(name, value)
+        return value
+
+    async def write_bytes(
+        self,
+        model: BaseModel,
+        name: str,
+        data: bytes | bytearray | memoryview,
+        chunk_size: int = blob_chunk_size,
+    ) -> None:
+        """Write a bytes field in chunks, see ``read_bytes``."""
+        assert isinstance(model, EnhancedModel)
+        await write_ua_bytes(model.field_node(name), data, chunk_size)
+        await model.receive(name, data)
+
+    async def read_aggregates(self) -> dict[str, Any]:
+        """Aggregates maintained by an ``OpcuaServer``, see ``aggregate()``."""
+        node = await self.ua_objects_node.get_child(f"{self.namespace}:Aggregates")
+        refs = await node.get_children_descriptions()
+        nodes = [Node(node.session, ref.NodeId) for ref in refs]
+        if not nodes:
+            return {}
+        results = await read_ua_values(nodes)
+        return {
+            ref.BrowseName.Name: result.Value.Value
+            for ref, result in zip(refs, results)
+        }
+
+    def history(self, model: BaseModel, name: str) -> History:
+        """Last values of a ``RingBuffer`` field read from the server.
+
+        ```python
+        class Temperature(BaseModel):
+            actual: Annotated[float, RingBuffer(100)] = 0
+
+        nozzle = client.history(printer.nozzle, "actual")
+        nozzle.mean(), nozzle.rate()
+        ```
+        """
+        assert isinstance(model, EnhancedModel)
+        return model.history(name)
+
     async def commit(self) -> None:
-        async with asyncio.TaskGroup() as tg:
-            while not self.update_tasks.empty():
-                task = self.update_tasks.get_nowait()
-                tg.create_task(task)
+        """Write all assignments made since the last commit.
+
+        The values are sent by as few Write requests as the OperationLimits of
+        the session allow, failed writes are raised in an ``ExceptionGroup``.
+        """
+        updates = []
+        while not self.update_tasks.empty():
+            updates.append(self.update_tasks.get_nowait())
+        errors = await EnhancedModel.write_updates(updates)
+        if errors:
+            raise ExceptionGroup("failed to write values", errors)
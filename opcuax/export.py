@@ -0,0 +1,225 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import AsyncIterable
+from pathlib import Path
+from typing import Any
+
+from .changes import Change
+
+
+class BatchWriter(ABC):
+    """Write batches of changes to files of at most ``max_records`` changes."""
+
+    directory: Path
+    prefix: str
+    suffix: str
+    max_records: int
+    records: int
+    files: int
+
+    def __init__(
+        self, directory: str | Path, prefix: str = "changes", max_records: int = 10**6
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_records = max_records
+        self.records = 0
+        self.files = 0
+
+    def next_path(self) -> Path:
+        self.files += 1
+        self.records = 0
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"{self.prefix}-{timestamp}-{self.files:04d}{self.suffix}"
+        return self.directory / name
+
+    def write(self, changes: list[Change]) -> None:
+        while changes:
+            if self.files == 0 or self.records >= self.max_records:
+                self.rotate()
+            n = self.max_records - self.records
+            self.write_file(changes[:n])
+            self.records += len(changes[:n])
+            changes = changes[n:]
+
+    @abstractmethod
+    def rotate(self) -> None:
+        """Close the current file and open the next one."""
+
+    @abstractmethod
+    def write_file(self, changes: list[Change]) -> None:
+        """Append changes to the current file."""
+
+    def close(self) -> None:  # noqa: B027
+        """Flush and close the current file, no-op by default."""
+
+
+class JsonLinesWriter(BatchWriter):
+    suffix = ".jsonl"
+    path: Path | None = None
+
+    def rotate(self) -> None:
+        self.path = self.next_path()
+
+    def write_file(self, changes: list[Change]) -> None:
+        assert self.path is not None
+        lines = [json.dumps(change._asdict(), default=str) + "\n" for change in changes]
+        with self.path.open("a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+
+class ParquetWriter(BatchWriter):
+    """Parquet files with one row group per batch, requires pyarrow.
+
+    Values are stored as JSON because a field path may hold any type.
+    """
+
+    suffix = ".parquet"
+
+    def __init__(
+        self, directory: str | Path, prefix: str = "changes", max_records: int = 10**6
+    ) -> None:
+        import pyarrow as pa
+
+        super().__init__(directory, prefix, max_records)
+        self.schema = pa.schema(
+            [
+                ("timestamp", pa.float64()),
+                ("object", pa.dictionary(pa.int32(), pa.string())),
+                ("path", pa.dictionary(pa.int32(), pa.string())),
+                ("value", pa.string()),
+            ]
+        )
+        self.writer: Any = None
+
+    def rotate(self) -> None:
+        import pyarrow.parquet as pq
+
+        self.close()
+        self.writer = pq.ParquetWriter(self.next_path(), self.schema)
+
+    def write_file(self, changes: list[Change]) -> None:
+        import pyarrow as pa
+
+        table = pa.table(
+            {
+                "timestamp": [change.timestamp for change in changes],
+                "object": [change.object for change in changes],
+                "path": [change.path for change in changes],
+                "value": [json.dumps(change.value, default=str) for change in changes],
+            },
+            schema=self.schema,
+        )
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class Exporter:
+    """Buffer changes and write them in batches on a worker thread.
+
+    At most ``max_pending`` batches wait for the writer, after that ``run``
+    stops consuming changes, which in turn blocks the producers of
+    ``Opcuax.changes()``. A batch is flushed when it has ``batch_size``
+    changes, spans ``flush_interval`` seconds, or its first change was received
+    ``flush_interval`` seconds ago, even if no other change comes.
+    """
+
+    writer: BatchWriter
+    batch_size: int
+    flush_interval: float
+    written: int
+    started_at: float
+
+    def __init__(
+        self,
+        writer: BatchWriter,
+        batch_size: int = 1000,
+        flush_interval: float = 1,
+        max_pending: int = 4,
+    ) -> None:
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.started_at = time.monotonic()
+        self.buffer: list[Change] = []
+        # monotonic time the first change of the buffer was received
+        self.buffered_at = 0.0
+        self.pending: deque[list[Change]] = deque()
+        self.batches: asyncio.Queue[list[Change] | None] = asyncio.Queue(max_pending)
+
+    @property
+    def records_per_second(self) -> float:
+        return self.written / max(time.monotonic() - self.started_at, 1e-9)
+
+    @property
+    def lag(self) -> float:
+        """Seconds since the oldest change that is not written yet."""
+        oldest = self.pending[0] if self.pending else self.buffer
+        if not oldest:
+            return 0
+        return max(time.time() - oldest[0].timestamp, 0)
+
+    async def __flush(self) -> None:
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        self.pending.append(batch)
+        await self.batches.put(batch)
+
+    async def __write_batches(self) -> None:
+        try:
+            while (batch := await self.batches.get()) is not None:
+                await asyncio.to_thread(self.writer.write, batch)
+                self.written += len(batch)
+                self.pending.popleft()
+        finally:
+            self.writer.close()
+
+    async def run(self, changes: AsyncIterable[Change]) -> None:
+        self.started_at = time.monotonic()
+        iterator = aiter(changes)
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(self.__write_batches())
+
+            # the next change is awaited across flushes, cancelling it would
+            # close the generator of Opcuax.changes()
+            next_change = asyncio.ensure_future(anext(iterator, None))
+            try:
+                while True:
+                    timeout = None
+                    if self.buffer:
+                        flush_at = self.buffered_at + self.flush_interval
+                        timeout = max(flush_at - time.monotonic(), 0)
+                    done, _ = await asyncio.wait({next_change}, timeout=timeout)
+                    if not done:
+                        await self.__flush()
+                        continue
+
+                    change = next_change.result()
+                    if change is None:
+                        break
+                    next_change = asyncio.ensure_future(anext(iterator, None))
+                    if not self.buffer:
+                        self.buffered_at = time.monotonic()
+                    self.buffer.append(change)
+                    if (
+                        len(self.buffer) >= self.batch_size
+                        or change.timestamp - self.buffer[0].timestamp
+                        >= self.flush_interval
+                    ):
+                        await self.__flush()
+            finally:
+                next_change.cancel()
+
+            await self.__flush()
+            await self.batches.put(None)
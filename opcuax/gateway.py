@@ -0,0 +1,295 @@
+import asyncio
+import contextlib
+import functools
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any
+
+from asyncua import Node, ua
+from asyncua.common.callback import ServerItemCallback
+
+from .base import TOpcuaModel
+from .client import OpcuaClient
+from .core import read_targets
+from .model import EnhancedModel
+from .node import write_ua_values
+from .server import OpcuaServer
+from .values import python_field_value
+
+
+@dataclass(slots=True)
+class MirroredNode:
+    # local model and field name, None for a struct root
+    model: EnhancedModel
+    name: str | None
+    local: Node
+    upstream: Node
+    upstream_server: "Upstream"
+
+
+@dataclass
+class Upstream:
+    client: OpcuaClient
+    subscription: Any = None
+    # (model class, upstream name, local model) of the mirrored objects
+    objects: list[tuple[type[Any], str, EnhancedModel]] = field(default_factory=list)
+    # upstream NodeId -> mirrored node
+    nodes: dict[ua.NodeId, MirroredNode] = field(default_factory=dict)
+    # writes not forwarded yet, the latest value of each node
+    pending_writes: dict[ua.NodeId, ua.DataValue] = field(default_factory=dict)
+
+
+class _SubscriptionHandler:
+    def __init__(self, gateway: "OpcuaGateway", upstream: Upstream) -> None:
+        self.gateway = gateway
+        self.upstream = upstream
+
+    def datachange_notification(self, node: Node, val: Any, data: Any) -> None:
+        mirrored = self.upstream.nodes.get(node.nodeid)
+        if mirrored is not None:
+            self.gateway.receive(mirrored, data.monitored_item.Value)
+
+
+class OpcuaGateway:
+    """Serve objects of upstream servers from one local ``OpcuaServer``.
+
+    Each upstream endpoint is followed by one session with one subscription,
+    so the upstream load does not depend on how many clients read the gateway.
+    Values written to mirrored objects by clients of the gateway are forwarded
+    upstream, one Write request per upstream server every ``write_interval``.
+    Upstream connections are checked every ``check_interval`` seconds, after a
+    reconnect the objects are subscribed again.
+
+    ```python
+    async with server, OpcuaGateway(server) as gateway:
+        await gateway.follow(endpoint, namespace, Printer, ["Printer1"], "Cell1.")
+    ```
+    """
+
+    server: OpcuaServer
+    publishing_interval: float
+    write_interval: float
+    check_interval: float
+    upstreams: dict[tuple[str, str], Upstream]
+    # local NodeId -> mirrored node
+    nodes: dict[ua.NodeId, MirroredNode]
+    # data change notifications received from upstream servers
+    notifications: int
+    # writes forwarded upstream and the Write requests sent for them
+    forwarded_writes: int
+    write_batches: int
+
+    def __init__(
+        self,
+        server: OpcuaServer,
+        publishing_interval: float = 0.1,
+        write_interval: float = 0.1,
+        check_interval: float = 1,
+    ) -> None:
+        self.server = server
+        self.publishing_interval = publishing_interval
+        self.write_interval = write_interval
+        self.check_interval = check_interval
+        self.upstreams = {}
+        self.nodes = {}
+        self.notifications = 0
+        self.forwarded_writes = 0
+        self.write_batches = 0
+        self.changes: dict[ua.NodeId, tuple[MirroredNode, ua.DataValue]] = {}
+        self.changed = asyncio.Event()
+        self.tasks: list[asyncio.Task[None]] = []
+        # the same bound method is needed to unsubscribe
+        self.write_listener = self.__on_write
+
+    async def follow(
+        self,
+        endpoint: str,
+        namespace: str,
+        model_class: type[TOpcuaModel],
+        names: Iterable[str],
+        prefix: str = "",
+    ) -> None:
+        """Mirror objects of an upstream server as ``prefix + name``."""
+        upstream = await self.__upstream(endpoint, namespace)
+
+        for name in names:
+            remote = await upstream.client.get_object(model_class, name)
+            local: Any = await self.server.create(
+                prefix + name, model_class.model_validate(remote.model_dump())
+            )
+            upstream.objects.append((model_class, name, local))
+            nodes = await self.__mirror(upstream, model_class, name, local)
+            await upstream.subscription.subscribe_data_change(nodes)
+
+    async def __mirror(
+        self,
+        upstream: Upstream,
+        model_class: type[Any],
+        name: str,
+        local: EnhancedModel,
+    ) -> list[Node]:
+        """Map the nodes of an upstream object to the local ones."""
+        remote = await upstream.client.get_object(model_class, name)
+        assert isinstance(remote, EnhancedModel)
+
+        remote_targets = await read_targets(remote)
+        local_targets = await read_targets(local)
+        for (*_, upstream_node), (model, field_name, local_node) in zip(
+            remote_targets, local_targets
+        ):
+            mirrored = MirroredNode(
+                model, field_name, local_node, upstream_node, upstream
+            )
+            self.nodes[local_node.nodeid] = mirrored
+            upstream.nodes[upstream_node.nodeid] = mirrored
+        return [node for *_, node in remote_targets]
+
+    async def __resubscribe(self, upstream: Upstream) -> None:
+        """Subscribe again after a reconnect, which deleted the subscription.
+
+        Objects dropped by the client, e.g. after an upstream restart, are
+        browsed again so their NodeIds are mapped again.
+        """
+        pending = {
+            upstream.nodes[nodeid].local.nodeid: value
+            for nodeid, value in upstream.pending_writes.items()
+        }
+        upstream.nodes.clear()
+        nodes = []
+        for model_class, name, local in upstream.objects:
+            nodes += await self.__mirror(upstream, model_class, name, local)
+        upstream.pending_writes = {
+            self.nodes[nodeid].upstream.nodeid: value
+            for nodeid, value in pending.items()
+        }
+
+        upstream.subscription = await self.__subscribe(upstream)
+        if nodes:
+            await upstream.subscription.subscribe_data_change(nodes)
+
+    async def __subscribe(self, upstream: Upstream) -> Any:
+        return await upstream.client.client.create_subscription(
+            self.publishing_interval * 1000, _SubscriptionHandler(self, upstream)
+        )
+
+    def receive(self, mirrored: MirroredNode, value: ua.DataValue) -> None:
+        """Queue a value notified by an upstream server."""
+        self.notifications += 1
+        if value.StatusCode is None or value.StatusCode.is_good():
+            self.changes[mirrored.local.nodeid] = (mirrored, value)
+            self.changed.set()
+
+    async def flush(self) -> None:
+        """Forward pending writes upstream."""
+        for upstream in self.upstreams.values():
+            if not upstream.pending_writes:
+                continue
+            pending, upstream.pending_writes = upstream.pending_writes, {}
+            nodes = [upstream.nodes[nodeid].upstream for nodeid in pending]
+            try:
+                results = await write_ua_values(nodes, list(pending.values()))
+            except Exception:
+                self.server.logger.exception(
+                    "failed to forward writes to %s", upstream.client.endpoint
+                )
+                continue
+
+            self.write_batches += 1
+            self.forwarded_writes += len(results)
+            for node, result in zip(nodes, results):
+                if not result.is_good():
+                    self.server.logger.warning(
+                        "failed to forward write to %s: %s", node, result
+                    )
+
+    async def __upstream(self, endpoint: str, namespace: str) -> Upstream:
+        key = (endpoint, namespace)
+        if key not in self.upstreams:
+            client = OpcuaClient(
+                endpoint,
+                namespace,
+                auto_reconnect=True,
+                check_interval=self.check_interval,
+            )
+            await client.__aenter__()
+            upstream = Upstream(client)
+            upstream.subscription = await self.__subscribe(upstream)
+            client.on_reconnect.append(functools.partial(self.__resubscribe, upstream))
+            self.upstreams[key] = upstream
+        return self.upstreams[key]
+
+    async def __apply_changes(self) -> None:
+        while True:
+            await self.changed.wait()
+            self.changed.clear()
+            changes, self.changes = self.changes, {}
+
+            values = [
+                ua.DataValue(value.Value, SourceTimestamp=value.SourceTimestamp)
+                for _, value in changes.values()
+            ]
+            try:
+                await write_ua_values([m.local for m, _ in changes.values()], values)
+                for mirrored, value in changes.values():
+                    await self.__receive(mirrored, value.Value.Value)
+            except Exception:
+                self.server.logger.exception("failed to mirror upstream values")
+
+    async def __forward_writes(self) -> None:
+        while True:
+            await asyncio.sleep(self.write_interval)
+            await self.flush()
+
+    async def __on_write(self, event: ServerItemCallback, _: Any) -> None:
+        # writes of the gateway itself are internal
+        if not event.is_external:
+            return
+
+        for wv, result in zip(event.request_params.NodesToWrite, event.response_params):
+            mirrored = self.nodes.get(wv.NodeId)
+            if (
+                mirrored is None
+                or wv.AttributeId != ua.AttributeIds.Value
+                or not result.is_good()
+            ):
+                continue
+            pending_writes = mirrored.upstream_server.pending_writes
+            pending_writes[mirrored.upstream.nodeid] = ua.DataValue(wv.Value.Value)
+            await self.__receive(mirrored, wv.Value.Value.Value)
+
+    @staticmethod
+    async def __receive(mirrored: MirroredNode, ua_value: Any) -> None:
+        if mirrored.name is None:
+            await mirrored.model.receive_struct(ua_value)
+        else:
+            info = type(mirrored.model).model_fields[mirrored.name]
+            value = python_field_value(info, ua_value)
+            await mirrored.model.receive(mirrored.name, value)
+
+    async def __aenter__(self) -> "OpcuaGateway":
+        self.server.add_write_listener(self.write_listener)
+        self.tasks = [
+            asyncio.create_task(self.__apply_changes()),
+            asyncio.create_task(self.__forward_writes()),
+        ]
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.server.remove_write_listener(self.write_listener)
+
+        await self.flush()
+        for upstream in self.upstreams.values():
+            with contextlib.suppress(Exception):
+                await upstream.client.__aexit__(exc_type, exc_val, exc_tb)
+        self.upstreams.clear()
+        self.nodes.clear()
@@ -1,9 +1,24 @@
 from typing import Any
 
-from pydantic.fields import FieldInfo
+from pydantic import BaseModel
+from pydantic.fields import ComputedFieldInfo, FieldInfo
 
 
 def field_class(info: FieldInfo) -> type[Any]:
     cls = info.annotation
     assert cls is not None
     return cls
+
+
+def is_model_class(cls: type[Any]) -> bool:
+    # generic aliases like list[float] are not classes
+    return isinstance(cls, type) and issubclass(cls, BaseModel)
+
+
+def computed_field_info(info: ComputedFieldInfo) -> FieldInfo:
+    """A field of the return type of a computed field, to map it like fields."""
+    return FieldInfo.from_annotation(info.return_type)
+
+
+def computed_ttl(info: ComputedFieldInfo) -> float:
+    return float(getattr(info.wrapped_property.fget, "opcua_ttl", 0))
@@ -0,0 +1,97 @@
+from array import array
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class RingBuffer:
+    """Annotated marker keeping the last ``size`` values of a numeric field.
+
+    ``Annotated[float, RingBuffer(100)]`` records every value read from the
+    server, by refreshes, polls or subscriptions, see ``Opcuax.history``.
+    """
+
+    size: int
+
+    def __post_init__(self) -> None:
+        if self.size < 1:
+            raise ValueError("RingBuffer size must be positive")
+
+
+class History:
+    """Last ``size`` samples of a field and their timestamps.
+
+    Samples are stored in two preallocated ``array('d')``, appending is O(1)
+    and memory does not grow.
+    """
+
+    __slots__ = ("size", "count", "timestamps", "values")
+
+    size: int
+    # samples appended so far, the next one is stored at count % size
+    count: int
+    timestamps: "array[float]"
+    values: "array[float]"
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.count = 0
+        self.timestamps = array("d", bytes(8 * size))
+        self.values = array("d", bytes(8 * size))
+
+    def append(self, value: float, timestamp: float) -> None:
+        i = self.count % self.size
+        self.values[i] = value
+        self.timestamps[i] = timestamp
+        self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.size)
+
+    def __filled(self) -> memoryview:
+        if not self.count:
+            raise ValueError("no samples")
+        return memoryview(self.values)[: len(self)]
+
+    def __oldest(self) -> int:
+        return self.count % self.size if self.count > self.size else 0
+
+    def mean(self) -> float:
+        values = self.__filled()
+        return sum(values) / len(values)
+
+    def min(self) -> float:
+        return min(self.__filled())
+
+    def max(self) -> float:
+        return max(self.__filled())
+
+    def last(self) -> float:
+        self.__filled()
+        return self.values[(self.count - 1) % self.size]
+
+    def rate(self) -> float:
+        """Change per second from the oldest to the latest sample."""
+        if len(self) < 2:
+            return 0.0
+        first = self.__oldest()
+        last = (self.count - 1) % self.size
+        elapsed = self.timestamps[last] - self.timestamps[first]
+        if elapsed <= 0:
+            return 0.0
+        return (self.values[last] - self.values[first]) / elapsed
+
+    def samples(self) -> list[tuple[float, float]]:
+        """(timestamp, value) of the samples, oldest first."""
+        order = [(self.__oldest() + i) % self.size for i in range(len(self))]
+        return [(self.timestamps[i], self.values[i]) for i in order]
+
+    def to_numpy(self) -> tuple[Any, Any]:
+        """Timestamps and values as numpy arrays, oldest first."""
+        import numpy as np
+
+        n = len(self)
+        shift = -self.__oldest()
+        timestamps = np.roll(np.frombuffer(self.timestamps, count=n), shift)
+        values = np.roll(np.frombuffer(self.values, count=n), shift)
+        return timestamps, values
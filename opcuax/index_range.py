@@ -0,0 +1,112 @@
+import dataclasses
+
+from asyncua import ua
+from asyncua.server.address_space import AttributeService
+from asyncua.server.user_managers import User, UserRole
+
+
+def parse_index_range(index_range: str) -> slice:
+    """Byte slice of a ByteString IndexRange like ``"0:1023"`` or ``"7"``."""
+    start, _, end = index_range.partition(":")
+    first = int(start)
+    last = int(end) if end else first
+    if first < 0 or last < first:
+        raise ValueError(f"invalid IndexRange {index_range!r}")
+    return slice(first, last + 1)
+
+
+admin = User(role=UserRole.Admin)
+
+
+class IndexRangeAttributeService(AttributeService):  # type: ignore[misc]
+    """Attribute service which honours IndexRange on ByteString values.
+
+    The asyncua server ignores IndexRange, so blobs could only be transferred
+    in one message. Ranged reads return a view of the stored value. A ranged
+    write may extend the value if it starts at or before its end, so blobs
+    are uploaded by writing the first chunk and appending the next ones.
+    Other reads and writes are handled by asyncua.
+    """
+
+    def read(self, params: ua.ReadParameters) -> list[ua.DataValue]:
+        results: list[ua.DataValue] = super().read(params)
+        for i, rv in enumerate(params.NodesToRead):
+            if rv.IndexRange and rv.AttributeId == ua.AttributeIds.Value:
+                results[i] = self.__read_range(results[i], rv.IndexRange)
+        return results
+
+    async def write(
+        self, params: ua.WriteParameters, user: User = admin
+    ) -> list[ua.StatusCode]:
+        errors: dict[int, ua.StatusCode] = {}
+        nodes_to_write = []
+        for i, wv in enumerate(params.NodesToWrite):
+            if wv.IndexRange and wv.AttributeId == ua.AttributeIds.Value:
+                try:
+                    wv = self.__write_range(wv)
+                except ua.UaStatusCodeError as e:
+                    errors[i] = ua.StatusCode(e.code)
+                    continue
+            nodes_to_write.append(wv)
+
+        results: list[ua.StatusCode] = await super().write(
+            ua.WriteParameters(NodesToWrite=nodes_to_write), user
+        )
+        for i in sorted(errors):
+            results.insert(i, errors[i])
+        return results
+
+    @staticmethod
+    def __read_range(result: ua.DataValue, index_range: str) -> ua.DataValue:
+        value = result.Value
+        if value is None or value.VariantType != ua.VariantType.ByteString:
+            return result
+        try:
+            selection = parse_index_range(index_range)
+        except ValueError:
+            status = ua.StatusCode(ua.StatusCodes.BadIndexRangeInvalid)
+            return ua.DataValue(StatusCode_=status)
+        data = value.Value or b""
+        if selection.start >= len(data):
+            status = ua.StatusCode(ua.StatusCodes.BadIndexRangeNoData)
+            return ua.DataValue(StatusCode_=status)
+
+        # a view of the stored value, copied only when the response is encoded
+        chunk = memoryview(data)[selection]
+        return dataclasses.replace(
+            result, Value=ua.Variant(chunk, ua.VariantType.ByteString)
+        )
+
+    def __write_range(self, wv: ua.WriteValue) -> ua.WriteValue:
+        """The write of the whole value with ``wv`` applied to its range."""
+        current = self._aspace.read_attribute_value(wv.NodeId, wv.AttributeId)
+        value = current.Value
+        chunk = wv.Value.Value.Value if wv.Value.Value is not None else None
+        if (
+            value is None
+            or value.VariantType != ua.VariantType.ByteString
+            or not isinstance(chunk, (bytes, bytearray, memoryview))
+        ):
+            raise ua.UaStatusCodeError(ua.StatusCodes.BadIndexRangeInvalid)
+        try:
+            selection = parse_index_range(wv.IndexRange)
+        except ValueError:
+            raise ua.UaStatusCodeError(ua.StatusCodes.BadIndexRangeInvalid) from None
+
+        data = value.Value or b""
+        size = selection.stop - selection.start
+        # the range may extend the value but not leave a gap
+        if size != len(chunk) or selection.start > len(data):
+            raise ua.UaStatusCodeError(ua.StatusCodes.BadIndexRangeInvalid)
+
+        # a new buffer: the stored value must not change before the write is
+        # allowed, and data changes are found by comparing it to the new value
+        buffer = bytearray(data)
+        buffer[selection] = chunk
+        return dataclasses.replace(
+            wv,
+            IndexRange=None,
+            Value=dataclasses.replace(
+                wv.Value, Value=ua.Variant(buffer, ua.VariantType.ByteString)
+            ),
+        )
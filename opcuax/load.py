@@ -0,0 +1,333 @@
+"""Load harness for OpcuaServer capacity testing.
+
+Starts a local server with N objects and M client sessions spread over
+worker processes, each session reads, writes and subscribes at target rates.
+The number of sessions is raised step by step until the server saturates.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import queue
+import random
+import statistics
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from multiprocessing.process import BaseProcess
+from multiprocessing.queues import Queue
+from multiprocessing.synchronize import Event
+from typing import Any
+
+from .base import OpcuaModel
+from .client import OpcuaClient
+from .server import OpcuaServer
+
+ctx = multiprocessing.get_context("spawn")
+
+
+class LoadObject(OpcuaModel):
+    state: str = "Idle"
+    temperature: float = 0
+    counter: int = 0
+
+
+@dataclass
+class Workload:
+    # operations per second of each session
+    reads: float = 10
+    writes: float = 2
+    # objects each session subscribes to
+    subscriptions: int = 1
+    duration: float = 10
+    publishing_interval: float = 0.1
+
+
+@dataclass
+class SessionStats:
+    reads: list[float] = field(default_factory=list)
+    writes: list[float] = field(default_factory=list)
+    notifications: int = 0
+
+    def merge(self, other: "SessionStats") -> None:
+        self.reads += other.reads
+        self.writes += other.writes
+        self.notifications += other.notifications
+
+
+@dataclass
+class StepResult:
+    sessions: int
+    target: float
+    achieved: float
+    cpu: float
+    read_latency: tuple[float, float, float]
+    write_latency: tuple[float, float, float]
+    notifications: float
+
+    @property
+    def saturated(self) -> bool:
+        return self.achieved < 0.9 * self.target
+
+    def __str__(self) -> str:
+        read, write = self.read_latency, self.write_latency
+        return (
+            f"sessions {self.sessions} target {self.target:.0f} ops/s "
+            f"achieved {self.achieved:.0f} ops/s server cpu {self.cpu:.0%} "
+            f"read p50/p95/p99 {read[0]:.1f}/{read[1]:.1f}/{read[2]:.1f} ms "
+            f"write p50/p95/p99 {write[0]:.1f}/{write[1]:.1f}/{write[2]:.1f} ms "
+            f"notifications {self.notifications:.0f}/s"
+        )
+
+
+def percentiles(seconds: list[float]) -> tuple[float, float, float]:
+    if len(seconds) < 2:
+        ms = seconds[0] * 1000 if seconds else 0
+        return ms, ms, ms
+    q = statistics.quantiles([t * 1000 for t in seconds], n=100)
+    return q[49], q[94], q[98]
+
+
+class _Counter:
+    def __init__(self, stats: SessionStats) -> None:
+        self.stats = stats
+
+    def datachange_notification(self, node: Any, val: Any, data: Any) -> None:
+        self.stats.notifications += 1
+
+
+async def paced(rate: float, end: float, op: Any, latencies: list[float]) -> None:
+    """Run ``op`` ``rate`` times per second until ``end``, without catching up."""
+    if rate <= 0:
+        return
+    interval = 1 / rate
+    # spread sessions over the first interval
+    next_at = time.monotonic() + random.uniform(0, interval)
+    while next_at < end:
+        await asyncio.sleep(max(next_at - time.monotonic(), 0))
+        started_at = time.monotonic()
+        await op()
+        latencies.append(time.monotonic() - started_at)
+        next_at = max(next_at + interval, time.monotonic())
+
+
+async def run_session(
+    endpoint: str,
+    namespace: str,
+    names: list[str],
+    workload: Workload,
+    ready: "Queue[Any]",
+    go: Event,
+) -> SessionStats:
+    stats = SessionStats()
+
+    async with OpcuaClient(endpoint, namespace) as client:
+        objects: list[Any] = [
+            await client.get_object(LoadObject, name) for name in names
+        ]
+        if workload.subscriptions > 0:
+            subscription = await client.client.create_subscription(
+                workload.publishing_interval * 1000, _Counter(stats)
+            )
+            for obj in objects[: workload.subscriptions]:
+                nodes = [node for *_, node in await obj.variable_nodes()]
+                await subscription.subscribe_data_change(nodes)
+
+        ready.put(None)
+        await asyncio.to_thread(go.wait)
+
+        async def read() -> None:
+            await client.refresh(random.choice(objects))
+
+        async def write() -> None:
+            obj = random.choice(objects)
+            obj.counter += 1
+            obj.temperature = random.uniform(0, 100)
+            await client.commit()
+
+        end = time.monotonic() + workload.duration
+        await asyncio.gather(
+            paced(workload.reads, end, read, stats.reads),
+            paced(workload.writes, end, write, stats.writes),
+        )
+
+    return stats
+
+
+def run_sessions(
+    endpoint: str,
+    namespace: str,
+    names: list[list[str]],
+    workload: Workload,
+    ready: "Queue[Any]",
+    go: Event,
+    results: "Queue[SessionStats]",
+) -> None:
+    async def main() -> SessionStats:
+        stats = SessionStats()
+        sessions = await asyncio.gather(
+            *[
+                run_session(endpoint, namespace, session_names, workload, ready, go)
+                for session_names in names
+            ]
+        )
+        for session in sessions:
+            stats.merge(session)
+        return stats
+
+    results.put(asyncio.run(main()))
+
+
+def receive(
+    items: "Queue[Any]", workers: Sequence[BaseProcess], poll: float = 1
+) -> Any:
+    """Get an item put by the workers, raise if a worker died instead."""
+    while True:
+        try:
+            return items.get(timeout=poll)
+        except queue.Empty:
+            pass
+        failed = [worker for worker in workers if worker.exitcode not in (None, 0)]
+        if failed:
+            raise RuntimeError(f"load worker exited with code {failed[0].exitcode}")
+        if not any(worker.is_alive() for worker in workers):
+            # items are flushed before a worker exits
+            try:
+                return items.get(timeout=poll)
+            except queue.Empty:
+                raise RuntimeError("load workers exited without results") from None
+
+
+async def run_step(
+    server: OpcuaServer,
+    names: list[str],
+    sessions: int,
+    processes: int,
+    workload: Workload,
+) -> StepResult:
+    ready: Queue[Any] = ctx.Queue()
+    results: Queue[SessionStats] = ctx.Queue()
+    go = ctx.Event()
+
+    # each session works on a few objects, sessions are spread over processes
+    per_session = max(len(names) // sessions, 1)
+    session_names = [
+        [names[(i * per_session + j) % len(names)] for j in range(per_session)]
+        for i in range(sessions)
+    ]
+    workers = [
+        ctx.Process(
+            target=run_sessions,
+            args=(
+                server.endpoint,
+                server.namespace_uri,
+                session_names[i::processes],
+                workload,
+                ready,
+                go,
+                results,
+            ),
+            daemon=True,
+        )
+        for i in range(min(processes, sessions))
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for _ in range(sessions):
+            await asyncio.to_thread(receive, ready, workers)
+
+        started_at, cpu_started_at = time.monotonic(), time.process_time()
+        go.set()
+        stats = SessionStats()
+        for _ in workers:
+            stats.merge(await asyncio.to_thread(receive, results, workers))
+        # this process only runs the server while sessions are measured
+        wall = time.monotonic() - started_at
+        cpu = (time.process_time() - cpu_started_at) / wall
+    except BaseException:
+        # the other workers may wait for the go signal forever
+        for worker in workers:
+            worker.kill()
+        raise
+    finally:
+        for worker in workers:
+            worker.join()
+
+    return StepResult(
+        sessions=sessions,
+        target=sessions * (workload.reads + workload.writes),
+        achieved=(len(stats.reads) + len(stats.writes)) / workload.duration,
+        cpu=cpu,
+        read_latency=percentiles(stats.reads),
+        write_latency=percentiles(stats.writes),
+        notifications=stats.notifications / workload.duration,
+    )
+
+
+async def run_load(
+    endpoint: str,
+    namespace: str,
+    objects: int,
+    sessions: list[int],
+    processes: int,
+    workload: Workload,
+) -> list[StepResult]:
+    """Run one step per number of sessions, stop after the first saturated step."""
+    results = []
+    async with OpcuaServer(endpoint, "opcuax load server", namespace) as server:
+        names = [f"Object{i+1}" for i in range(objects)]
+        for name in names:
+            await server.create(name, LoadObject())
+
+        for n in sessions:
+            result = await run_step(server, names, n, processes, workload)
+            print(result, flush=True)
+            results.append(result)
+            if result.saturated:
+                break
+
+    saturated = [result for result in results if result.saturated]
+    if saturated:
+        print(f"server saturated at {saturated[0].sessions} sessions")
+    else:
+        print(f"server not saturated up to {sessions[-1]} sessions")
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--endpoint", default="opc.tcp://localhost:4840")
+    parser.add_argument(
+        "--namespace", default="https://github.com/monash-automation/opcuax"
+    )
+    parser.add_argument("--objects", type=int, default=100)
+    parser.add_argument(
+        "--sessions",
+        default="1,10,25,50,100",
+        help="comma separated numbers of sessions, one step each",
+    )
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--reads", type=float, default=10, help="per session/sec")
+    parser.add_argument("--writes", type=float, default=2, help="per session/sec")
+    parser.add_argument("--subscriptions", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10, help="sec per step")
+    args = parser.parse_args(argv)
+
+    workload = Workload(
+        reads=args.reads,
+        writes=args.writes,
+        subscriptions=args.subscriptions,
+        duration=args.duration,
+    )
+    sessions = [int(n) for n in args.sessions.split(",")]
+    asyncio.run(
+        run_load(
+            args.endpoint,
+            args.namespace,
+            args.objects,
+            sessions,
+            args.processes,
+            workload,
+        )
+    )
@@ -0,0 +1,134 @@
+import asyncio
+from typing import Any
+from urllib.parse import urlparse
+
+from asyncua import Client, Server
+from asyncua.server.binary_server_asyncio import BinaryServer
+
+scheme = "opc.loopback"
+
+# loopback servers of this process by endpoint
+servers: dict[str, "LoopbackServer"] = {}
+
+
+def is_loopback(endpoint: str) -> bool:
+    return urlparse(endpoint).scheme == scheme
+
+
+def endpoint_key(endpoint: str) -> str:
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+class LoopbackTransport(asyncio.Transport):
+    """One end of an in-memory connection.
+
+    Written data is passed to the protocol of the other end on the next
+    iteration of the event loop, like data received from a socket.
+    """
+
+    def __init__(self, protocol: asyncio.Protocol, peername: str) -> None:
+        super().__init__()
+        self.protocol = protocol
+        self.peername = peername
+        self.peer: LoopbackTransport | None = None
+        self.closed = False
+        self.bytes_written = 0
+        self.loop = asyncio.get_running_loop()
+
+    def write(self, data: Any) -> None:
+        if self.closed or self.peer is None:
+            return
+        self.bytes_written += len(data)
+        self.loop.call_soon(self.peer.receive, data)
+
+    def receive(self, data: Any) -> None:
+        if not self.closed:
+            self.protocol.data_received(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.loop.call_soon(self.protocol.connection_lost, None)
+        if self.peer is not None:
+            self.peer.close()
+
+    def abort(self) -> None:
+        self.close()
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        if name == "peername":
+            return self.peername
+        return default
+
+    def get_write_buffer_size(self) -> int:
+        return 0
+
+
+def connect(
+    client: asyncio.Protocol, server: asyncio.Protocol
+) -> tuple[LoopbackTransport, LoopbackTransport]:
+    client_end = LoopbackTransport(client, "loopback server")
+    server_end = LoopbackTransport(server, "loopback client")
+    client_end.peer = server_end
+    server_end.peer = client_end
+    server.connection_made(server_end)
+    client.connection_made(client_end)
+    return client_end, server_end
+
+
+class LoopbackServer(BinaryServer):  # type: ignore[misc]
+    """Accepts connections of ``LoopbackClient`` instead of listening on a socket."""
+
+    def __init__(self, server: Server, endpoint: str) -> None:
+        super().__init__(server.iserver, None, None, server.limits)
+        self.endpoint = endpoint_key(endpoint)
+        self.set_policies(server._policies)
+
+    async def start(self) -> None:
+        if self.endpoint in servers:
+            raise OSError(f"{self.endpoint} is already served")
+        servers[self.endpoint] = self
+        self.cleanup_task = asyncio.create_task(self._close_task_loop())
+
+    async def stop(self) -> None:
+        servers.pop(self.endpoint, None)
+        await super().stop()
+
+    def accept(self, client: asyncio.Protocol) -> None:
+        connect(client, self._make_protocol())
+
+
+async def start_server(server: Server, endpoint: str) -> None:
+    """``Server.start()`` serving ``endpoint`` in this process, without a socket."""
+    await server._setup_server_nodes()
+    # asyncua clients only accept opc.tcp endpoints, the messages are the same
+    for description in server.iserver.endpoints:
+        url = urlparse(description.EndpointUrl)
+        description.EndpointUrl = url._replace(scheme="opc.tcp").geturl()
+    await server.iserver.start()
+    server.bserver = LoopbackServer(server, endpoint)
+    try:
+        await server.bserver.start()
+    except Exception:
+        await server.iserver.stop()
+        raise
+
+
+class LoopbackClient(Client):  # type: ignore[misc]
+    """asyncua client connecting to a loopback server of this process.
+
+    Messages are encoded as over TCP, but passed in memory.
+    """
+
+    async def connect_socket(self) -> None:
+        endpoint = endpoint_key(self.server_url.geturl())
+        server = servers.get(endpoint)
+        if server is None:
+            raise ConnectionRefusedError(f"no loopback server at {endpoint}")
+        self.uaclient._closing = False
+        server.accept(self.uaclient._make_protocol())
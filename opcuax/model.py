@@ -1,17 +1,39 @@
 import asyncio
-from collections.abc import Generator
-from typing import Any, ClassVar, Never, TypeVar
+import time
+from dataclasses import dataclass
+from typing import Any, ClassVar, TypeVar
 
-from asyncua import Node
+from asyncua import Node, ua
 from pydantic import BaseModel, PrivateAttr
 from pydantic.fields import FieldInfo
 
-from opcuax.helper import field_class
-from opcuax.node import read_ua_variable, write_ua_variable
+from opcuax.base import OpcuaModel as OpcuaModel
+from opcuax.base import OpcuaModelType as OpcuaModelType
+from opcuax.base import TOpcuaModel as TOpcuaModel
+from opcuax.changes import ChangeFeed
+from opcuax.helper import field_class, is_model_class
+from opcuax.history import History, RingBuffer
+from opcuax.node import (
+    NodeTable,
+    read_ua_value,
+    read_ua_values,
+    write_ua_values,
+)
+from opcuax.structure import from_ua_struct, to_ua_struct
+from opcuax.values import is_changed, opcua_value, python_field_value, ua_variant_type
 
 TBaseModel = TypeVar("TBaseModel", bound=BaseModel)
 TEnhancedModel = TypeVar("TEnhancedModel", bound="EnhancedModel")
-UpdateTask = Generator[Any, None, Never]
+
+
+@dataclass(slots=True)
+class UpdateTask:
+    """A write of an assignment, sent with the other writes of the next commit."""
+
+    model: "EnhancedModel"
+    # None for the variable of a struct object, written with all its fields
+    name: str | None
+    value: Any = None
 
 
 def parse_field_class(name: str, info: FieldInfo) -> type[Any]:
@@ -23,75 +45,264 @@ def parse_field_class(name: str, info: FieldInfo) -> type[Any]:
     return cls
 
 
-class OpcuaModel(BaseModel):
-    @classmethod
-    def __pydantic_init_subclass__(cls: type["OpcuaModel"], **kwargs: Any) -> None:
-        enhanced_model_class(cls)
+@dataclass(slots=True)
+class ModelContext:
+    """State shared by all models of one Opcuax."""
 
+    session: Any
+    ns: int
+    tasks: asyncio.Queue[UpdateTask]
+    changes: ChangeFeed
 
-TOpcuaModel = TypeVar("TOpcuaModel", bound=OpcuaModel)
-OpcuaModelType = type[TOpcuaModel]
+
+@dataclass(slots=True)
+class ModelState:
+    context: ModelContext
+    # NodeIds of this model (column 0) and its variables, see EnhancedModel.columns,
+    # None for nested models of a struct object which have no nodes
+    table: NodeTable | None
+    row: int
+    # object name and field path of this model, used to publish changes
+    name: str = ""
+    path: str = ""
+    # struct mode: the model whose variable node stores the whole object
+    struct_root: "EnhancedModel | None" = None
+    dirty: bool = False
+    pending_changes: list[tuple[str, Any]] | None = None
+    # monotonic time of the last read, used by Opcuax.refresh(max_age=...)
+    refreshed_at: float = float("-inf")
+    refresh_task: "asyncio.Task[None] | None" = None
+    # samples of RingBuffer fields, created on the first value received
+    histories: dict[str, History] | None = None
 
 
 class EnhancedModel(BaseModel):
     classes: ClassVar[dict[type[BaseModel], type["EnhancedModel"]]] = {}
     origin: ClassVar[type[BaseModel]]
-    _node: Node | None = PrivateAttr(default=None)
-    _ns: int = PrivateAttr(default=0)
-    _tasks: asyncio.Queue[UpdateTask] = PrivateAttr(default=None)
+    # NodeTable column of each variable field
+    columns: ClassVar[dict[str, int]]
+    # RingBuffer size of fields keeping a history
+    ring_buffers: ClassVar[dict[str, int]]
+    # one slotted object instead of many private attributes keeps models small
+    _state: ModelState = PrivateAttr(default=None)
+
+    @property
+    def _node(self) -> Node:
+        state = self._state
+        assert state.table is not None
+        return Node(state.context.session, state.table.get(state.row, 0))
+
+    def field_node(self, name: str) -> Node:
+        """Variable node of a field, not available for struct objects."""
+        state = self._state
+        if (
+            state.struct_root is not None
+            or state.table is None
+            or name not in type(self).columns
+        ):
+            raise ValueError(f"{type(self).__name__}.{name} has no variable node")
+        nodeid = state.table.get(state.row, type(self).columns[name])
+        return Node(state.context.session, nodeid)
 
     async def __get_node(self, name: str) -> Node:
-        assert self._node is not None
-        return await self._node.get_child(f"{self._ns}:{name}")
+        return self.field_node(name)
 
-    async def refresh(self) -> None:
-        for name, info in type(self).model_fields.items():
-            cls = field_class(info)
-            node = await self.__get_node(name)
+    def __field_path(self, name: str) -> str:
+        path = self._state.path
+        return f"{path}.{name}" if path else name
 
-            if issubclass(cls, BaseModel):
-                model = self.__dict__[name]
-                assert isinstance(model, EnhancedModel)
-                await self.__dict__[name].refresh()
-            else:
-                value = await read_ua_variable(node, cls)
+    async def __publish(self, changes: list[tuple[str, Any]]) -> None:
+        state = self._state
+        for path, value in changes:
+            await state.context.changes.publish(state.name, path, value)
+
+    def __assign(self, fields: dict[str, Any]) -> list[tuple[str, Any]]:
+        """Set field values and return the (path, value) of changed fields."""
+        changes = []
+        computed_fields = type(self).model_computed_fields
+        for name, value in fields.items():
+            if name in computed_fields:
+                continue
+            if isinstance(value, dict):
+                changes += self.__dict__[name].__assign(value)
+            elif is_changed(self.__dict__[name], value):
                 self.__dict__[name] = value
+                changes.append((self.__field_path(name), value))
+        return changes
+
+    async def __refresh_struct(self, max_age: float) -> None:
+        ua_value = await read_ua_value(self._node, max_age)
+        await self.receive_struct(ua_value)
+
+    def __record(self, fields: dict[str, Any], timestamp: float) -> None:
+        """Append values received for RingBuffer fields to their histories."""
+        ring_buffers = type(self).ring_buffers
+        for name, value in fields.items():
+            if isinstance(value, dict):
+                self.__dict__[name].__record(value, timestamp)
+            elif name in ring_buffers:
+                self.history(name).append(float(value), timestamp)
+
+    def history(self, name: str) -> History:
+        """Samples of a ``RingBuffer`` field received from the server."""
+        size = type(self).ring_buffers.get(name)
+        if size is None:
+            raise ValueError(f"{type(self).__name__}.{name} has no RingBuffer")
+        state = self._state
+        if state.histories is None:
+            state.histories = {}
+        history = state.histories.get(name)
+        if history is None:
+            history = state.histories[name] = History(size)
+        return history
+
+    async def receive_struct(self, ua_value: Any) -> int:
+        """Set all fields of a struct root from a value read from the server."""
+        fields = from_ua_struct(self.origin, ua_value)
+        self.__record(fields, time.time())
+        changes = self.__assign(fields)
+        await self.__publish(changes)
+        return len(changes)
+
+    async def receive(self, name: str, value: Any) -> bool:
+        """Set a field to a value read from the server."""
+        if name in type(self).ring_buffers:
+            self.history(name).append(float(value), time.time())
+        if not is_changed(self.__dict__[name], value):
+            return False
+        self.__dict__[name] = value
+        await self.__publish([(self.__field_path(name), value)])
+        return True
+
+    async def variable_nodes(self) -> list[tuple["EnhancedModel", str, Node]]:
+        """(model, field name, node) of all variables under this model."""
+        nodes = []
+        for name, info in type(self).model_fields.items():
+            if is_model_class(field_class(info)):
+                nodes += await self.__dict__[name].variable_nodes()
+            else:
+                nodes.append((self, name, await self.__get_node(name)))
+        return nodes
+
+    def __add_changes(self, changes: list[tuple[str, Any]]) -> None:
+        state = self._state
+        if state.pending_changes is None:
+            state.pending_changes = []
+        state.pending_changes += changes
+
+    def __mark_dirty(self) -> None:
+        state = self._state
+        if not state.dirty:
+            state.dirty = True
+            state.context.tasks.put_nowait(UpdateTask(self, None))
+
+    async def refresh(self, max_age: float = 0) -> None:
+        struct_root = self._state.struct_root
+        if struct_root is not None:
+            await struct_root.__refresh_struct(max_age)
+            return
+
+        # all variables, including nested ones, in one request
+        targets = await self.variable_nodes()
+        if not targets:
+            return
+        results = await read_ua_values([node for *_, node in targets], max_age)
+        for (model, name, _), result in zip(targets, results):
+            result.StatusCode.check()
+            info = type(model).model_fields[name]
+            await model.receive(name, python_field_value(info, result.Value.Value))
 
     @staticmethod
     def classname_for(cls: type[BaseModel]) -> str:
         return "_Opcuax" + cls.__name__
 
-    async def __update_variable(self, name: str, value: Any) -> None:
-        if value is None:
-            raise ValueError(f"Cannot set None to {type(self).__name__}.{name}")
-        self.__dict__[name] = value
-        node = await self.__get_node(name)
-        await write_ua_variable(node, value)
+    @staticmethod
+    async def write_updates(updates: list[UpdateTask]) -> list[ua.UaStatusCodeError]:
+        """Write updates in as few requests as the OperationLimits allow,
+        then set and publish the values written. Returns the failed writes."""
+        if not updates:
+            return []
+        nodes, values = [], []
+        struct_changes: dict[int, list[tuple[str, Any]]] = {}
+        for i, update in enumerate(updates):
+            model = update.model
+            if update.name is None:
+                state = model._state
+                struct_changes[i] = state.pending_changes or []
+                state.dirty = False
+                state.pending_changes = None
+                nodes.append(model._node)
+                variant = ua.Variant(
+                    to_ua_struct(model), ua.VariantType.ExtensionObject
+                )
+            else:
+                info = type(model).model_fields[update.name]
+                nodes.append(model.field_node(update.name))
+                variant = ua.Variant(opcua_value(update.value), ua_variant_type(info))
+            values.append(ua.DataValue(variant))
 
-    async def update_self(self, model: BaseModel) -> None:
+        errors = []
+        results = await write_ua_values(nodes, values)
+        for i, (update, result) in enumerate(zip(updates, results)):
+            model, name = update.model, update.name
+            if not result.is_good():
+                errors.append(ua.UaStatusCodeError(result.value))
+            elif name is None:
+                await model.__publish(struct_changes[i])
+            elif is_changed(model.__dict__[name], update.value):
+                model.__dict__[name] = update.value
+                await model.__publish([(model.__field_path(name), update.value)])
+        return errors
+
+    def __updates(self, model: BaseModel) -> list[UpdateTask]:
+        """Writes updating this model to the values of ``model``."""
         if not isinstance(self, type(model)):
             raise ValueError(f"Cannot update {self} by {model}")
+        struct_root = self._state.struct_root
+        if struct_root is not None:
+            struct_root.__add_changes(self.__assign(model.model_dump()))
+            return [UpdateTask(struct_root, None)]
+
+        updates = []
         for name in type(self).model_fields:
             value = model.__dict__[name]
-
             if isinstance(value, BaseModel):
-                child = self.__dict__[name]
-                await child.update_self(value)
+                updates += self.__dict__[name].__updates(value)
             else:
-                await self.__update_variable(name, value)
+                updates.append(self.__update_variable(name, value))
+        return updates
+
+    def __update_variable(self, name: str, value: Any) -> UpdateTask:
+        if value is None:
+            raise ValueError(f"Cannot set None to {type(self).__name__}.{name}")
+        return UpdateTask(self, name, value)
+
+    async def update_self(self, model: BaseModel) -> None:
+        errors = await self.write_updates(self.__updates(model))
+        if errors:
+            raise errors[0]
 
     def __setattr__(self, key: str, value: Any) -> None:
         if not is_field(self, key):
             super().__setattr__(key, value)
             return
 
+        struct_root = self._state.struct_root
+        if struct_root is not None:
+            if value is None:
+                raise ValueError(f"Cannot set None to {type(self).__name__}.{key}")
+            if isinstance(value, BaseModel):
+                value = value.model_dump()
+            struct_root.__add_changes(self.__assign({key: value}))
+            struct_root.__mark_dirty()
+            return
+
         if isinstance(value, BaseModel):
-            model = self.__dict__[key]
-            task = model.update_self(value)
+            updates = self.__dict__[key].__updates(value)
         else:
-            task = self.__update_variable(key, value)
-
-        self._tasks.put_nowait(task)
+            updates = [self.__update_variable(key, value)]
+        for update in updates:
+            self._state.context.tasks.put_nowait(update)
 
     # TODO: how about model == enhanced?
     def __eq__(self, other: Any) -> bool:
@@ -104,6 +315,13 @@ def is_field(model: EnhancedModel, name: str) -> bool:
     return name in type(model).model_fields
 
 
+def mark_refreshed(model: EnhancedModel, refreshed_at: float) -> None:
+    model._state.refreshed_at = refreshed_at
+    for value in model.__dict__.values():
+        if isinstance(value, EnhancedModel):
+            mark_refreshed(value, refreshed_at)
+
+
 def enhanced_model_class(cls: type[TBaseModel]) -> type[EnhancedModel]:
     if cls in EnhancedModel.classes:
         return EnhancedModel.classes[cls]
@@ -116,11 +334,21 @@ def enhanced_model_class(cls: type[TBaseModel]) -> type[EnhancedModel]:
         {"__module__": EnhancedModel.__module__},
     )
     new_cls.origin = cls
+    new_cls.columns = {}
+    new_cls.ring_buffers = {}
     EnhancedModel.classes[cls] = new_cls
 
     for field_name, field_info in cls.model_fields.items():
         field_cls = parse_field_class(field_name, field_info)
 
-        if issubclass(field_cls, BaseModel):
+        if is_model_class(field_cls):
             enhanced_model_class(field_cls)
+        else:
+            new_cls.columns[field_name] = len(new_cls.columns) + 1
+
+        for metadata in field_info.metadata:
+            if isinstance(metadata, RingBuffer):
+                if field_cls not in (int, float, bool):
+                    raise ValueError(f"RingBuffer field {field_name} must be numeric")
+                new_cls.ring_buffers[field_name] = metadata.size
     return new_cls
@@ -1,20 +1,296 @@
+import asyncio
+from array import array
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from typing import Any, TypeVar
+from weakref import WeakKeyDictionary
 
 from asyncua import Node, ua
+from pydantic.fields import FieldInfo
 
-from opcuax.values import opcua_value, python_value
+from opcuax.values import opcua_value, python_field_value
 
 T = TypeVar("T")
+R = TypeVar("R")
 
 
-async def read_ua_variable(node: Node, cls: type[T]) -> T:
-    ua_value = await node.read_value()
-    value = python_value(cls, ua_value)
-    return value  # type: ignore
+@dataclass
+class OperationLimits:
+    """How bulk reads and writes of a session are split into requests."""
 
+    # server OperationLimits, 0 means no limit
+    max_nodes_per_read: int = 0
+    max_nodes_per_write: int = 0
+    # nodes per request below the server limits, 0 means only the server limits,
+    # see benchmark/chunking.py
+    chunk_size: int = 250
+    # requests of one bulk operation in flight at once
+    max_concurrency: int = 4
 
-async def write_ua_variable(node: Node, value: Any) -> None:
+    def nodes_per_request(self, server_limit: int) -> int:
+        sizes = [size for size in (server_limit, self.chunk_size) if size > 0]
+        return min(sizes, default=0)
+
+
+# OperationLimits of each session, see Opcuax.load_operation_limits()
+operation_limits: "WeakKeyDictionary[Any, OperationLimits]" = WeakKeyDictionary()
+
+
+async def send_in_chunks(
+    items: list[T],
+    size: int,
+    concurrency: int,
+    send: Callable[[list[T]], Awaitable[list[R]]],
+) -> list[R]:
+    """Send ``items`` in chunks of at most ``size``, results in the same order."""
+    if size <= 0 or len(items) <= size:
+        return await send(items)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send_chunk(chunk: list[T]) -> list[R]:
+        async with semaphore:
+            return await send(chunk)
+
+    chunks = await asyncio.gather(
+        *[send_chunk(items[i : i + size]) for i in range(0, len(items), size)]
+    )
+    return [result for chunk in chunks for result in chunk]
+
+
+async def read_ua_values(
+    nodes: list[Node],
+    max_age: float = 0,
+    attribute: ua.AttributeIds = ua.AttributeIds.Value,
+) -> list[ua.DataValue]:
+    """Read an attribute (value by default) of many nodes, the server may
+    return values cached for at most ``max_age`` seconds.
+
+    Nodes are split into requests within the OperationLimits of the session.
+    """
+
+    async def read(chunk: list[Node]) -> list[ua.DataValue]:
+        params = ua.ReadParameters()
+        for node in chunk:
+            rv = ua.ReadValueId()
+            rv.NodeId = node.nodeid
+            rv.AttributeId = attribute
+            params.NodesToRead.append(rv)
+        params.MaxAge = max_age * 1000
+        results: list[ua.DataValue] = await chunk[0].read_params(params)
+        return results
+
+    limits = operation_limits.get(nodes[0].session) or OperationLimits()
+    size = limits.nodes_per_request(limits.max_nodes_per_read)
+    return await send_in_chunks(nodes, size, limits.max_concurrency, read)
+
+
+async def write_ua_values(
+    nodes: list[Node], values: list[ua.DataValue]
+) -> list[ua.StatusCode]:
+    """Write value attributes of many nodes, split like ``read_ua_values``."""
+
+    async def write(chunk: list[tuple[Node, ua.DataValue]]) -> list[ua.StatusCode]:
+        params = ua.WriteParameters()
+        for node, value in chunk:
+            wv = ua.WriteValue()
+            wv.NodeId = node.nodeid
+            wv.AttributeId = ua.AttributeIds.Value
+            wv.Value = value
+            params.NodesToWrite.append(wv)
+        results: list[ua.StatusCode] = await chunk[0][0].write_params(params)
+        return results
+
+    limits = operation_limits.get(nodes[0].session) or OperationLimits()
+    size = limits.nodes_per_request(limits.max_nodes_per_write)
+    return await send_in_chunks(
+        list(zip(nodes, values)), size, limits.max_concurrency, write
+    )
+
+
+# bytes per request of read_ua_bytes and write_ua_bytes, see benchmark/blob.py
+blob_chunk_size = 2**20
+
+
+def ranged_read(node: Node, first: int, last: int) -> ua.ReadValueId:
+    rv = ua.ReadValueId()
+    rv.NodeId = node.nodeid
+    rv.AttributeId = ua.AttributeIds.Value
+    rv.IndexRange = f"{first}:{last}"
+    return rv
+
+
+async def read_ua_bytes(node: Node, chunk_size: int = blob_chunk_size) -> bytes:
+    """Read a ByteString value in IndexRanges of ``chunk_size`` bytes.
+
+    The first request also reads the byte after the first chunk: a server
+    ignoring IndexRange returns the whole value for both, which is returned.
+    """
+    if chunk_size < 2:
+        raise ValueError("chunk_size must be at least 2 bytes")
+    chunks = []
+    start = 0
+    while True:
+        params = ua.ReadParameters()
+        params.NodesToRead.append(ranged_read(node, start, start + chunk_size - 1))
+        if not start:
+            params.NodesToRead.append(ranged_read(node, chunk_size, chunk_size))
+        result, *probe = await node.read_params(params)
+        if result.StatusCode.value == ua.StatusCodes.BadIndexRangeNoData:
+            break
+        result.StatusCode.check()
+
+        chunk = result.Value.Value or b""
+        if probe and probe[0].StatusCode.is_good():
+            next_byte = probe[0].Value.Value or b""
+            # a server honouring IndexRange returned one full chunk and one byte
+            if len(next_byte) != 1 or len(chunk) != chunk_size:
+                return bytes(chunk)
+        chunks.append(chunk)
+        if len(chunk) < chunk_size or (
+            probe and probe[0].StatusCode.value == ua.StatusCodes.BadIndexRangeNoData
+        ):
+            break
+        start += chunk_size
+    return b"".join(chunks)
+
+
+# status of a ByteString value while its chunks are uploaded, not a Bad one
+# which would drop the value the next chunks extend
+uploading = ua.StatusCode(ua.StatusCodes.UncertainDataSubNormal)
+
+
+async def write_ua_bytes(
+    node: Node, data: bytes | bytearray | memoryview, chunk_size: int = blob_chunk_size
+) -> None:
+    """Write a ByteString value in IndexRanges of ``chunk_size`` bytes.
+
+    The first chunk replaces the value and the next ones extend it, which needs
+    a server that can extend values by IndexRange like ``OpcuaServer``.
+    Until the last chunk, the value has the ``uploading`` status so readers
+    never take a partial value for the new one. Servers ignoring IndexRange
+    are detected by reading the last byte back, then the whole value is
+    written in one request.
+    Chunks are views of ``data``, copied only when requests are encoded.
+    """
+    view = memoryview(data).cast("B")
+    if len(view) <= chunk_size:
+        await write_ua_variable(node, view, ua.VariantType.ByteString)
+        return
+
+    starts = range(0, len(view), chunk_size)
+    for start in starts:
+        chunk = view[start : start + chunk_size]
+        status = ua.StatusCode() if start == starts[-1] else uploading
+        wv = ua.WriteValue()
+        wv.NodeId = node.nodeid
+        wv.AttributeId = ua.AttributeIds.Value
+        if start:
+            wv.IndexRange = f"{start}:{start + len(chunk) - 1}"
+        wv.Value = ua.DataValue(
+            ua.Variant(chunk, ua.VariantType.ByteString), StatusCode_=status
+        )
+        params = ua.WriteParameters()
+        params.NodesToWrite.append(wv)
+        (result,) = await node.write_params(params)
+        result.check()
+
+    params = ua.ReadParameters()
+    params.NodesToRead.append(ranged_read(node, len(view) - 1, len(view) - 1))
+    (result,) = await node.read_params(params)
+    if not result.StatusCode.is_good() or result.Value.Value != view[-1:]:
+        # the chunks replaced the whole value instead of their range
+        await write_ua_variable(node, view, ua.VariantType.ByteString)
+
+
+async def read_ua_value(node: Node, max_age: float = 0) -> Any:
+    (result,) = await read_ua_values([node], max_age)
+    result.StatusCode.check()
+    return result.Value.Value
+
+
+async def read_ua_variable(node: Node, field: FieldInfo, max_age: float = 0) -> Any:
+    ua_value = await read_ua_value(node, max_age)
+    return python_field_value(field, ua_value)
+
+
+async def write_ua_variable(
+    node: Node, value: Any, variant_type: ua.VariantType
+) -> None:
     value = opcua_value(value)
-    var_type = await node.read_data_type_as_variant_type()
-    ua_value = ua.DataValue(ua.Variant(value, var_type))
+    ua_value = ua.DataValue(ua.Variant(value, variant_type))
     await node.write_value(ua_value)
+
+
+async def write_ua_struct(node: Node, value: Any) -> None:
+    ua_value = ua.DataValue(ua.Variant(value, ua.VariantType.ExtensionObject))
+    await node.write_value(ua_value)
+
+
+def path_node_id(ns: int, name: str, path: str = "") -> ua.NodeId:
+    """String NodeId of the object ``name`` or of its field at ``path``,
+    e.g. ``ns=2;s=Printer1.bed.actual``."""
+    return ua.NodeId(f"{name}.{path}" if path else name, ns)
+
+
+__numeric = (ua.NodeIdType.TwoByte, ua.NodeIdType.FourByte, ua.NodeIdType.Numeric)
+
+
+def is_numeric(nodeid: ua.NodeId, ns: int | None) -> bool:
+    return (
+        nodeid.NodeIdType in __numeric
+        and nodeid.NamespaceIndex == ns
+        and 0 <= nodeid.Identifier < 2**64
+    )
+
+
+class NodeTable:
+    """NodeIds of many models of one class, a row per model.
+
+    Numeric NodeIds of one namespace, which servers usually assign, are stored
+    as integers in one array per column instead of ``Node`` and ``NodeId``
+    objects per model, other rows are kept as NodeIds.
+    Freed rows are reused by the next ``append``.
+    """
+
+    ns: int | None
+    # allocated rows, including free ones
+    rows: int
+
+    def __init__(self, columns: int) -> None:
+        self.ns = None
+        self.rows = 0
+        self.columns = [array("Q") for _ in range(columns)]
+        self.others: dict[int, list[ua.NodeId]] = {}
+        self.free_rows: list[int] = []
+
+    def __len__(self) -> int:
+        return self.rows - len(self.free_rows)
+
+    def append(self, nodeids: list[ua.NodeId]) -> int:
+        if self.ns is None:
+            self.ns = nodeids[0].NamespaceIndex
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = self.rows
+            self.rows += 1
+            for column in self.columns:
+                column.append(0)
+
+        if all(is_numeric(nodeid, self.ns) for nodeid in nodeids):
+            for column, nodeid in zip(self.columns, nodeids):
+                column[row] = nodeid.Identifier
+        else:
+            self.others[row] = nodeids
+        return row
+
+    def free(self, row: int) -> None:
+        self.others.pop(row, None)
+        self.free_rows.append(row)
+
+    def get(self, row: int, column: int) -> ua.NodeId:
+        if row in self.others:
+            return self.others[row][column]
+        assert self.ns is not None
+        return ua.NodeId(self.columns[column][row], self.ns)
@@ -0,0 +1,273 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import BaseModel
+
+from .core import Opcuax, ReadTarget, read_targets, receive_ua_values
+from .model import EnhancedModel, mark_refreshed
+from .node import read_ua_values
+
+
+class PollGroup:
+    """Models polled at one interval, returned by ``OpcuaClient.poll``.
+
+    When a tick comes while the previous read of a model is still running,
+    the tick is skipped and counted in ``missed``, and ``interval`` is doubled
+    (at most ``max_interval``). It shrinks back to ``base_interval`` while reads
+    finish within half of the interval.
+    Reads of a model which returned no value, e.g. when its object was deleted,
+    are counted in ``failed``.
+    """
+
+    base_interval: float
+    interval: float
+    max_interval: float
+    paths: set[str] | None
+    # batched reads of models in this group
+    polls: int
+    # models read
+    reads: int
+    # ticks skipped because the previous read was still running
+    missed: int
+    # reads of a model whose variables all returned Bad status codes
+    failed: int
+    cancelled: bool
+    on_cancel: Callable[[], None] | None
+
+    def __init__(
+        self, interval: float, paths: Iterable[str] | None, max_interval: float
+    ) -> None:
+        self.base_interval = interval
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.paths = set(paths) if paths is not None else None
+        self.polls = 0
+        self.reads = 0
+        self.missed = 0
+        self.failed = 0
+        self.cancelled = False
+        self.on_cancel = None
+
+    def cancel(self) -> None:
+        """Stop polling models of this group."""
+        if not self.cancelled and self.on_cancel is not None:
+            self.on_cancel()
+        self.cancelled = True
+
+    def on_missed(self) -> None:
+        self.missed += 1
+        self.interval = min(self.interval * 2, self.max_interval)
+
+    def on_read(self, duration: float, reads: int) -> None:
+        self.polls += 1
+        self.reads += reads
+        if duration < self.interval / 2:
+            self.interval = max(self.interval * 0.9, self.base_interval)
+
+
+def descendant(model: Any, path: str) -> Any:
+    """The nested model at a field path, e.g. ``"bed"``, or None."""
+    for name in path.split(".") if path else []:
+        model = getattr(model, "__dict__", {}).get(name)
+    return model
+
+
+@dataclass(slots=True)
+class PollEntry:
+    group: PollGroup
+    model: EnhancedModel
+    # class of the object of the model, to browse it again after it is dropped
+    object_class: type[Any] | None
+    # Opcuax.generation of the targets
+    generation: int
+    targets: list[ReadTarget] | None = None
+    reading: bool = False
+    failing: bool = False
+
+
+@dataclass(order=True, slots=True)
+class _Due:
+    at: float
+    seq: int
+    entry: PollEntry = field(compare=False)
+
+
+class PollScheduler:
+    """One timer for all polled models.
+
+    Models due within ``tick`` seconds of each other are read in one request.
+    When the client drops its objects, e.g. because a restarted server gave
+    their NodeIds to other nodes, polled objects are browsed again and their
+    values are still received by the polled models.
+    """
+
+    def __init__(self, opcuax: Opcuax, tick: float = 0.01) -> None:
+        self.opcuax = opcuax
+        self.logger = opcuax.logger
+        self.tick = tick
+        self.queue: list[_Due] = []
+        self.seq = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+        self.reads: set[asyncio.Task[None]] = set()
+
+    def add(self, group: PollGroup, models: Iterable[BaseModel]) -> None:
+        now = time.monotonic()
+        for model in models:
+            if not isinstance(model, EnhancedModel):
+                raise ValueError("models must be objects returned from get_object()")
+            # spread first reads over one interval
+            at = now + random.uniform(0, group.interval)
+            entry = PollEntry(
+                group, model, self.__object_class(model), self.opcuax.generation
+            )
+            heapq.heappush(self.queue, _Due(at, next(self.seq), entry))
+
+        if self.task is None:
+            self.task = asyncio.create_task(self.__run())
+        self.wakeup.set()
+
+    async def close(self) -> None:
+        tasks = [*self.reads, *([self.task] if self.task else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.task = None
+
+    async def __run(self) -> None:
+        while True:
+            self.wakeup.clear()
+            if not self.queue:
+                await self.wakeup.wait()
+                continue
+
+            delay = self.queue[0].at - time.monotonic()
+            if delay > 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self.wakeup.wait(), delay)
+                continue
+
+            batch = self.__take_due()
+            if batch:
+                task = asyncio.create_task(self.__read(batch))
+                self.reads.add(task)
+                task.add_done_callback(self.reads.discard)
+
+    def __take_due(self) -> list[PollEntry]:
+        now = time.monotonic()
+        batch = []
+
+        while self.queue and self.queue[0].at <= now + self.tick:
+            due = heapq.heappop(self.queue)
+            entry, group = due.entry, due.entry.group
+            if group.cancelled:
+                continue
+
+            if entry.reading:
+                group.on_missed()
+            else:
+                entry.reading = True
+                batch.append(entry)
+            # keep the phase, unless this tick is already late
+            due.at = max(due.at + group.interval, now)
+            due.seq = next(self.seq)
+            heapq.heappush(self.queue, due)
+
+        return batch
+
+    def __object_class(self, model: EnhancedModel) -> type[Any] | None:
+        state = model._state
+        if not state.path:
+            return type(model).origin
+        for (cls, name), obj in self.opcuax.objects.items():
+            if name == state.name and descendant(obj, state.path) is model:
+                return cls
+        return None
+
+    async def __read(self, batch: list[PollEntry]) -> None:
+        started_at = time.monotonic()
+        try:
+            targets: list[ReadTarget] = []
+            counts = []
+            for entry in batch:
+                if entry.targets is None or entry.generation != self.opcuax.generation:
+                    entry.targets = await self.__targets(entry)
+                targets += entry.targets
+                counts.append(len(entry.targets))
+
+            if targets:
+                results = await read_ua_values([node for *_, node in targets])
+                await receive_ua_values(targets, results)
+                start = 0
+                for entry, count in zip(batch, counts):
+                    entry_results = results[start : start + count]
+                    start += count
+                    self.__check(entry, entry_results)
+            for entry in batch:
+                mark_refreshed(entry.model, started_at)
+        except Exception:
+            self.logger.exception("failed to poll %d objects", len(batch))
+        finally:
+            duration = time.monotonic() - started_at
+            for entry in batch:
+                entry.reading = False
+            reads = Counter(entry.group for entry in batch)
+            for group, n in reads.items():
+                group.on_read(duration, n)
+
+    def __check(self, entry: PollEntry, results: list[Any]) -> None:
+        failing = bool(results) and not any(r.StatusCode.is_good() for r in results)
+        if failing:
+            entry.group.failed += 1
+            if not entry.failing:
+                state = entry.model._state
+                self.logger.warning(
+                    "no values of %s %s, its nodes are missing", state.name, state.path
+                )
+        entry.failing = failing
+
+    async def __targets(self, entry: PollEntry) -> list[ReadTarget]:
+        model, generation = entry.model, self.opcuax.generation
+        source = model
+        if entry.generation != generation:
+            if entry.object_class is None:
+                raise ValueError(f"object of {model._state.name} is unknown")
+            # the object was dropped, its NodeIds may belong to other nodes
+            obj = await self.opcuax.get_object(entry.object_class, model._state.name)
+            source = descendant(obj, model._state.path)
+            entry.generation = generation
+
+        prefix = source._state.path
+        targets = []
+        for target, name, node in await read_targets(source):
+            if name is None:
+                target = model._state.struct_root or model
+            else:
+                path = target._state.path
+                if prefix:
+                    path = path.removeprefix(prefix).removeprefix(".")
+                target = descendant(model, path)
+            targets.append((target, name, node))
+
+        paths = entry.group.paths
+        if paths is None or not targets or targets[0][1] is None:
+            return targets
+
+        # paths are relative to the polled model
+        selected = []
+        for target, name, node in targets:
+            path = target._state.path
+            if prefix:
+                path = path.removeprefix(prefix).removeprefix(".")
+            path = f"{path}.{name}" if path else str(name)
+            if path in paths:
+                selected.append((target, name, node))
+        return selected
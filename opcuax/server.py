@@ -1,14 +1,45 @@
 import asyncio
+import math
+import time
+from collections.abc import Awaitable, Callable
 from types import TracebackType
+from typing import Any
 
 from asyncua import Node, Server, ua
+from asyncua.common.callback import CallbackType, ServerItemCallback
+from asyncua.common.connection import TransportLimits
+from asyncua.common.structures104 import new_struct, new_struct_field
 from pydantic import BaseModel
-from pydantic.fields import FieldInfo
+from pydantic.fields import ComputedFieldInfo, FieldInfo
 
+from .aggregate import Aggregate, AggregateKind, field_target
+from .base import TOpcuaModel
+from .computation import ComputedVariable
 from .core import Opcuax
-from .model import TOpcuaModel
-from .settings import EnvOpcuaServerSettings, OpcuaServerSettings
-from .values import ua_variant
+from .helper import computed_field_info, computed_ttl, field_class, is_model_class
+from .index_range import IndexRangeAttributeService
+from .loopback import is_loopback, start_server
+from .model import EnhancedModel, ModelState, enhanced_model_class, mark_refreshed
+from .node import path_node_id, write_ua_values
+from .settings import (
+    EnvOpcuaServerSettings,
+    OpcuaServerSettings,
+    SecurityPolicy,
+    default_security_policies,
+)
+from .structure import (
+    data_type_name,
+    default_ua_struct,
+    load_ua_struct,
+    to_ua_struct,
+)
+from .subscription import MinimumIntervalSubscriptionService
+from .thread import ServerThread
+from .values import opcua_value, ua_variant
+
+# called with the PostWrite event and its name
+WriteListener = Callable[[ServerItemCallback, Any], Awaitable[None]]
+writable = ua.AccessLevel.CurrentRead.mask | ua.AccessLevel.CurrentWrite.mask
 
 
 class OpcuaServer(Opcuax):
@@ -16,24 +47,63 @@ class OpcuaServer(Opcuax):
     server: Server
     ua_object_type_node: Node
     object_type_nodes: dict[type[BaseModel], Node]
+    data_type_nodes: dict[type[BaseModel], Node]
+    # value callbacks of computed fields by NodeId
+    computed_variables: dict[ua.NodeId, ComputedVariable]
+    aggregates: dict[str, Aggregate]
+    aggregates_node: Node | None
 
     def __init__(
-        self, endpoint: str, name: str, namespace: str, interval: float = 1
+        self,
+        endpoint: str,
+        name: str,
+        namespace: str,
+        interval: float = 1,
+        string_node_ids: bool = False,
+        security_policies: list[SecurityPolicy] = default_security_policies,
+        max_message_size: int = 100 * 2**20,
+        max_chunk_size: int = 2**16 - 1,
+        min_sampling_interval: float = 0,
+        min_publishing_interval: float = 0,
     ) -> None:
-        super().__init__(endpoint, namespace)
+        super().__init__(endpoint, namespace, string_node_ids=string_node_ids)
         self.interval = interval
+        self.min_sampling_interval = min_sampling_interval
         self.object_type_nodes = {}
+        self.data_type_nodes = {}
+        self.computed_variables = {}
+        self.aggregates = {}
+        self.aggregates_node = None
+        # NodeId written -> aggregates of the field and the object name
+        self.aggregate_nodes: dict[ua.NodeId, list[tuple[Aggregate, str, Any]]] = {}
+        self.aggregate_task: asyncio.Task[None] | None = None
+        self.aggregate_listener = self.__on_write
+        # asyncua keeps one PostWrite listener per priority, features register
+        # with add_write_listener instead
+        self.write_listeners: list[WriteListener] = []
+        # the same bound method is needed to unsubscribe
+        self.write_dispatcher = self.__dispatch_writes
 
         self.server = Server()
         self.server.set_endpoint(endpoint)
         self.server.set_server_name(name)
         self.server.set_security_policy(
-            [
-                ua.SecurityPolicyType.NoSecurity,
-                ua.SecurityPolicyType.Basic256Sha256_SignAndEncrypt,
-                ua.SecurityPolicyType.Basic256Sha256_Sign,
-            ]
+            [getattr(ua.SecurityPolicyType, policy) for policy in security_policies]
         )
+        self.server.limits = TransportLimits(
+            max_recv_buffer=max_chunk_size,
+            max_send_buffer=max_chunk_size,
+            max_chunk_count=math.ceil(max_message_size / max_chunk_size),
+            max_message_size=max_message_size,
+        )
+        if min_publishing_interval or min_sampling_interval:
+            iserver = self.server.iserver
+            service = MinimumIntervalSubscriptionService(
+                iserver.aspace, min_publishing_interval, min_sampling_interval
+            )
+            iserver.subscription_service = (
+                iserver.isession.subscription_service
+            ) = service
 
     @staticmethod
     def from_settings(settings: OpcuaServerSettings) -> "OpcuaServer":
@@ -42,6 +112,12 @@ class OpcuaServer(Opcuax):
             name=settings.opcua_server_name,
             namespace=str(settings.opcua_server_namespace),
             interval=settings.opcua_server_interval,
+            string_node_ids=settings.opcua_string_node_ids,
+            security_policies=settings.opcua_security_policies,
+            max_message_size=settings.opcua_max_message_size,
+            max_chunk_size=settings.opcua_max_chunk_size,
+            min_sampling_interval=settings.opcua_min_sampling_interval,
+            min_publishing_interval=settings.opcua_min_publishing_interval,
         )
 
     @staticmethod
@@ -49,16 +125,29 @@ class OpcuaServer(Opcuax):
         settings = EnvOpcuaServerSettings(_env_file=env_file)
         return OpcuaServer.from_settings(settings)
 
+    def start_in_thread(self) -> ServerThread:
+        """Start the server on its own thread and event loop.
+
+        Use the returned facade instead of ``async with server``.
+        """
+        return ServerThread(self).start()
+
     async def loop(self) -> None:
         while True:
             await asyncio.sleep(self.interval)
 
-    async def __add_variable(self, parent: Node, name: str, field: FieldInfo) -> Node:
-        variant_type, value = ua_variant(field)
+    async def __add_variable(
+        self, parent: Node, name: str, field: FieldInfo, writable: bool = True
+    ) -> Node:
+        variant_type, value, dimensions = ua_variant(field)
 
         var = await parent.add_variable(self.namespace, name, value, variant_type)
+        if dimensions is not None:
+            await var.write_value_rank(len(dimensions))
+            await var.write_array_dimensions(dimensions)
         await var.set_modelling_rule(True)
-        await var.set_writable(True)
+        if writable:
+            await var.set_writable(True)
         return var
 
     async def __add_object(self, parent: Node, name: str) -> Node:
@@ -66,9 +155,40 @@ class OpcuaServer(Opcuax):
         await node.set_modelling_rule(True)
         return node
 
+    async def create_ua_data_type(self, model_cls: type[BaseModel]) -> Node:
+        if model_cls in self.data_type_nodes:
+            return self.data_type_nodes[model_cls]
+
+        fields = []
+        for name, field in model_cls.model_fields.items():
+            field_cls = field_class(field)
+
+            if is_model_class(field_cls):
+                data_type = await self.create_ua_data_type(field_cls)
+                fields.append(new_struct_field(name, data_type))
+            else:
+                variant_type, _, dimensions = ua_variant(field)
+                field_type = new_struct_field(
+                    name, variant_type, dimensions is not None
+                )
+                fields.append(field_type)
+
+        data_type, _ = await new_struct(
+            self.server, self.namespace, data_type_name(model_cls), fields
+        )
+        await load_ua_struct(model_cls, data_type)
+
+        self.data_type_nodes[model_cls] = data_type
+        return data_type
+
     async def create_ua_object_type(self, model_cls: type[TOpcuaModel]) -> Node:
         if model_cls in self.object_type_nodes:
             return self.object_type_nodes[model_cls]
+        if model_cls.opcua_struct:
+            # struct objects are variables of a structured DataType
+            type_node = await self.create_ua_data_type(model_cls)
+            self.object_type_nodes[model_cls] = type_node
+            return type_node
 
         async def dfs(cls: type[BaseModel], parent: Node) -> None:
             for name, field in cls.model_fields.items():
@@ -77,13 +197,17 @@ class OpcuaServer(Opcuax):
                 field_cls = field.annotation
                 assert field_cls is not None
 
-                if issubclass(field_cls, BaseModel):
+                if is_model_class(field_cls):
                     # nested types are not supported
                     node = await self.__add_object(parent, name)
                     await dfs(field_cls, node)
                 else:
                     await self.__add_variable(parent, name, field)
 
+            for name, info in cls.model_computed_fields.items():
+                field = computed_field_info(info)
+                await self.__add_variable(parent, name, field, writable=False)
+
         type_node = await self.ua_object_type_node.add_object_type(
             self.namespace, model_cls.__name__
         )
@@ -96,20 +220,367 @@ class OpcuaServer(Opcuax):
         if cls not in self.object_type_nodes:
             await self.create_ua_object_type(cls)
 
+        if cls.opcua_struct:
+            ua_value = ua.Variant(
+                default_ua_struct(cls), ua.VariantType.ExtensionObject
+            )
+            var = await self.ua_objects_node.add_variable(
+                self.namespace,
+                name,
+                ua_value,
+                datatype=self.object_type_nodes[cls].nodeid,
+            )
+            await var.set_writable(True)
+            return var
+
         return await self.ua_objects_node.add_object(
             self.namespace, name, objecttype=self.object_type_nodes[cls].nodeid
         )
 
     async def create(self, name: str, model: TOpcuaModel) -> TOpcuaModel:
-        await self.create_ua_object(type(model), name=name)
-        return await self.update(name, model)
+        """Add an object with the values of ``model``.
+
+        Nodes are added with their initial values, one AddNodes request per
+        level of nested models, and the returned model is built from the
+        added NodeIds without reading them back.
+        With ``string_node_ids``, NodeIds are derived from ``name`` and
+        field paths, and all nodes are added in one request.
+        """
+        if self.string_node_ids and "." in name:
+            raise ValueError(f"object name {name} contains '.'")
+        cls = type(model)
+        if cls not in self.object_type_nodes:
+            await self.create_ua_object_type(cls)
+
+        if cls.opcua_struct:
+            enhanced = await self.__add_struct_object(name, model)
+        else:
+            enhanced = await self.__add_plain_object(name, model)
+        mark_refreshed(enhanced, time.monotonic())
+        self.objects.put(cls, name, enhanced)
+        for aggregate in self.aggregates.values():
+            if aggregate.model_class is cls:
+                self.__watch(aggregate, name, enhanced)
+        if any(aggregate.dirty for aggregate in self.aggregates.values()):
+            self.__publish_aggregates_soon()
+
+        assert isinstance(enhanced, cls)
+        return enhanced
+
+    async def __add_ua_nodes(self, items: list[ua.AddNodesItem]) -> list[ua.NodeId]:
+        results = await self.ua_objects_node.session.add_nodes(items)
+        for result in results:
+            result.StatusCode.check()
+        return [result.AddedNodeId for result in results]
+
+    def __node_item(
+        self,
+        parent: ua.NodeId,
+        name: str,
+        node_class: ua.NodeClass,
+        attrs: ua.ObjectAttributes | ua.VariableAttributes,
+        reference_type: int = ua.ObjectIds.HasComponent,
+        type_definition: ua.NodeId | None = None,
+        nodeid: ua.NodeId | None = None,
+    ) -> ua.AddNodesItem:
+        attrs.DisplayName = ua.LocalizedText(name)
+        attrs.Description = ua.LocalizedText(name)
+        item = ua.AddNodesItem()
+        # a null NodeId lets the server assign a numeric one
+        item.RequestedNewNodeId = (
+            ua.NodeId(0, self.namespace) if nodeid is None else nodeid
+        )
+        item.BrowseName = ua.QualifiedName(name, self.namespace)
+        item.NodeClass = node_class
+        item.ParentNodeId = parent
+        item.ReferenceTypeId = ua.NodeId(reference_type)
+        if type_definition is not None:
+            item.TypeDefinition = type_definition
+        item.NodeAttributes = attrs
+        return item
+
+    def __variable_item(
+        self,
+        parent: ua.NodeId,
+        name: str,
+        field: FieldInfo,
+        value: Any,
+        access_level: int = writable,
+        nodeid: ua.NodeId | None = None,
+    ) -> ua.AddNodesItem:
+        variant_type, _, dimensions = ua_variant(field)
+        attrs = ua.VariableAttributes()
+        attrs.DataType = ua.NodeId(getattr(ua.ObjectIds, variant_type.name))
+        attrs.Value = ua.Variant(opcua_value(value), variant_type)
+        if dimensions is None:
+            attrs.ValueRank = ua.ValueRank.Scalar
+        else:
+            attrs.ValueRank = len(dimensions)
+            attrs.ArrayDimensions = dimensions
+        attrs.AccessLevel = attrs.UserAccessLevel = access_level
+        attrs.MinimumSamplingInterval = self.min_sampling_interval * 1000
+        return self.__node_item(
+            parent,
+            name,
+            ua.NodeClass.Variable,
+            attrs,
+            type_definition=ua.NodeId(ua.ObjectIds.BaseDataVariableType),
+            nodeid=nodeid,
+        )
+
+    def __requested_node_id(self, name: str, path: str = "") -> ua.NodeId | None:
+        if not self.string_node_ids:
+            return None
+        return path_node_id(self.namespace, name, path)
+
+    async def __add_plain_object(self, name: str, model: BaseModel) -> EnhancedModel:
+        type_node = self.object_type_nodes[type(model)]
+        root_item = self.__node_item(
+            self.ua_objects_node.nodeid,
+            name,
+            ua.NodeClass.Object,
+            ua.ObjectAttributes(),
+            ua.ObjectIds.Organizes,
+            type_node.nodeid,
+            self.__requested_node_id(name),
+        )
+        # NodeId by field path, "" is the object itself
+        nodeids: dict[str, ua.NodeId] = {}
+        # string NodeIds are known before adding the nodes, parents are
+        # added before their children in one request
+        pending = [root_item]
+        if self.string_node_ids:
+            nodeids[""] = root_item.RequestedNewNodeId
+        else:
+            (nodeids[""],) = await self.__add_ua_nodes(pending)
+            pending = []
+
+        level: list[tuple[str, BaseModel]] = [("", model)]
+        while level:
+            items, paths, next_level = [], [], []
+            for path, obj in level:
+                for field_name, field_info in type(obj).model_fields.items():
+                    value = obj.__dict__[field_name]
+                    field_path = f"{path}.{field_name}" if path else field_name
+                    if is_model_class(field_class(field_info)):
+                        item = self.__node_item(
+                            nodeids[path],
+                            field_name,
+                            ua.NodeClass.Object,
+                            ua.ObjectAttributes(),
+                            type_definition=ua.NodeId(ua.ObjectIds.BaseObjectType),
+                            nodeid=self.__requested_node_id(name, field_path),
+                        )
+                        next_level.append((field_path, value))
+                    else:
+                        item = self.__variable_item(
+                            nodeids[path],
+                            field_name,
+                            field_info,
+                            value,
+                            nodeid=self.__requested_node_id(name, field_path),
+                        )
+                    items.append(item)
+                    paths.append(field_path)
+
+                for field_name, info in type(obj).model_computed_fields.items():
+                    field = computed_field_info(info)
+                    field_path = f"{path}.{field_name}" if path else field_name
+                    item = self.__variable_item(
+                        nodeids[path],
+                        field_name,
+                        field,
+                        ua_variant(field).default,
+                        ua.AccessLevel.CurrentRead.mask,
+                        self.__requested_node_id(name, field_path),
+                    )
+                    items.append(item)
+                    paths.append(field_path)
+            if self.string_node_ids:
+                pending.extend(items)
+                for field_path, item in zip(paths, items):
+                    nodeids[field_path] = item.RequestedNewNodeId
+            elif items:
+                nodeids.update(zip(paths, await self.__add_ua_nodes(items)))
+            level = next_level
+        if pending:
+            await self.__add_ua_nodes(pending)
+
+        def build(obj: BaseModel, path: str) -> EnhancedModel:
+            cls = type(obj)
+            fields = {}
+            row = [nodeids[path]]
+            for field_name, field_info in cls.model_fields.items():
+                value = obj.__dict__[field_name]
+                field_path = f"{path}.{field_name}" if path else field_name
+                if is_model_class(field_class(field_info)):
+                    fields[field_name] = build(value, field_path)
+                else:
+                    fields[field_name] = value
+                    row.append(nodeids[field_path])
+
+            enhanced = enhanced_model_class(cls)(**fields)
+            table = self.node_table(cls)
+            enhanced._state = ModelState(
+                self.model_context(), table, table.append(row), name, path
+            )
+
+            for field_name, info in cls.model_computed_fields.items():
+                field_path = f"{path}.{field_name}" if path else field_name
+                self.__serve_computed(nodeids[field_path], enhanced, field_name, info)
+            return enhanced
+
+        return build(model, "")
+
+    def __serve_computed(
+        self,
+        nodeid: ua.NodeId,
+        model: EnhancedModel,
+        name: str,
+        info: ComputedFieldInfo,
+    ) -> None:
+        variable = ComputedVariable(
+            model,
+            name,
+            ua_variant(computed_field_info(info)).variant_type,
+            computed_ttl(info),
+            self.logger,
+            self.server.iserver.aspace,
+        )
+        self.computed_variables[nodeid] = variable
+        self.server.set_attribute_value_callback(nodeid, variable)
+
+    async def __add_struct_object(self, name: str, model: BaseModel) -> EnhancedModel:
+        ua_value = to_ua_struct(model)
+        attrs = ua.VariableAttributes()
+        attrs.DataType = self.object_type_nodes[type(model)].nodeid
+        attrs.Value = ua.Variant(ua_value, ua.VariantType.ExtensionObject)
+        attrs.ValueRank = ua.ValueRank.Scalar
+        attrs.AccessLevel = attrs.UserAccessLevel = writable
+        item = self.__node_item(
+            self.ua_objects_node.nodeid,
+            name,
+            ua.NodeClass.Variable,
+            attrs,
+            type_definition=ua.NodeId(ua.ObjectIds.BaseDataVariableType),
+            nodeid=self.__requested_node_id(name),
+        )
+        (nodeid,) = await self.__add_ua_nodes([item])
+        return self.struct_object(type(model), name, nodeid, ua_value)
+
+    async def aggregate(
+        self,
+        name: str,
+        model_class: type[TOpcuaModel],
+        path: str,
+        kind: AggregateKind,
+    ) -> Aggregate:
+        """Maintain an aggregate of a field over all objects of a class.
+
+        The aggregate is the variable ``Aggregates/name``, updated as values
+        are written without reading the objects again.
+
+        ```python
+        await server.aggregate("nozzle_mean", Printer, "nozzle.actual", "mean")
+        await server.aggregate("states", Printer, "state", "counts")
+        ```
+        """
+        if name in self.aggregates:
+            raise ValueError(f"aggregate {name} exists")
+        aggregate = Aggregate(name, model_class, path, kind)
+
+        if self.aggregates_node is None:
+            self.aggregates_node = await self.ua_objects_node.add_object(
+                self.namespace, "Aggregates"
+            )
+            self.add_write_listener(self.aggregate_listener)
+        var = await self.aggregates_node.add_variable(
+            self.namespace,
+            name,
+            ua.Variant(aggregate.value(), aggregate.variant_type),
+        )
+        aggregate.nodeid = var.nodeid
+        self.aggregates[name] = aggregate
+
+        # objects created before, once
+        for model in list(self.objects.values()):
+            if model.origin is model_class:
+                self.__watch(aggregate, model._state.name, model)
+        await self.__publish_aggregates()
+        return aggregate
+
+    def __watch(self, aggregate: Aggregate, name: str, model: EnhancedModel) -> None:
+        nodeid, value, extract = field_target(model, aggregate.path)
+        self.aggregate_nodes.setdefault(nodeid, []).append((aggregate, name, extract))
+        aggregate.set(name, value)
+
+    def add_write_listener(self, listener: WriteListener) -> None:
+        """Call ``listener`` after each Write request handled by the server."""
+        if not self.write_listeners:
+            self.server.subscribe_server_callback(
+                CallbackType.PostWrite, self.write_dispatcher
+            )
+        self.write_listeners.append(listener)
+
+    def remove_write_listener(self, listener: WriteListener) -> None:
+        self.write_listeners.remove(listener)
+        if not self.write_listeners:
+            self.server.unsubscribe_server_callback(
+                CallbackType.PostWrite, self.write_dispatcher
+            )
+
+    async def __dispatch_writes(self, event: ServerItemCallback, name: Any) -> None:
+        for listener in list(self.write_listeners):
+            try:
+                await listener(event, name)
+            except Exception:
+                self.logger.exception("write listener %s failed", listener)
+
+    async def __on_write(self, event: ServerItemCallback, _: Any) -> None:
+        changed = False
+        for wv, result in zip(event.request_params.NodesToWrite, event.response_params):
+            targets = self.aggregate_nodes.get(wv.NodeId)
+            if (
+                targets is None
+                or wv.AttributeId != ua.AttributeIds.Value
+                or not result.is_good()
+            ):
+                continue
+            for aggregate, name, extract in targets:
+                aggregate.set(name, extract(wv.Value.Value.Value))
+            changed = True
+        if changed:
+            self.__publish_aggregates_soon()
+
+    def __publish_aggregates_soon(self) -> None:
+        if self.aggregate_task is None or self.aggregate_task.done():
+            self.aggregate_task = asyncio.create_task(self.__publish_aggregates())
+
+    async def __publish_aggregates(self) -> None:
+        # let concurrent writes, e.g. of one commit, update aggregates first
+        await asyncio.sleep(0)
+        while dirty := [a for a in self.aggregates.values() if a.dirty]:
+            values = []
+            for aggregate in dirty:
+                aggregate.dirty = False
+                variant = ua.Variant(aggregate.value(), aggregate.variant_type)
+                values.append(ua.DataValue(variant))
+            nodes = [self.server.get_node(a.nodeid) for a in dirty]
+            await write_ua_values(nodes, values)
 
     async def __aenter__(self) -> "OpcuaServer":
         await self.server.init()
+        iserver = self.server.iserver
+        iserver.attribute_service = IndexRangeAttributeService(iserver.aspace)
         self.namespace = await self.server.register_namespace(self.namespace_uri)
         self.ua_objects_node = self.server.nodes.objects
         self.ua_object_type_node = self.server.nodes.base_object_type
-        await self.server.__aenter__()
+        self.ua_structure_type_node = self.server.nodes.base_structure_type
+        if is_loopback(self.endpoint):
+            await start_server(self.server, self.endpoint)
+        else:
+            await self.server.__aenter__()
+        await self.load_operation_limits()
         return self
 
     async def __aexit__(
@@ -118,4 +589,8 @@ class OpcuaServer(Opcuax):
         exc_val: BaseException | None,
         exc_tb: TracebackType | None,
     ) -> None:
+        if self.aggregate_task is not None:
+            self.aggregate_task.cancel()
+        if self.aggregates_node is not None:
+            self.remove_write_listener(self.aggregate_listener)
         await self.server.__aexit__(exc_type, exc_val, exc_tb)
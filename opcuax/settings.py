@@ -1,23 +1,65 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from pydantic import AnyUrl, HttpUrl, PositiveFloat, UrlConstraints
+from pydantic import (
+    AnyUrl,
+    HttpUrl,
+    NonNegativeFloat,
+    NonNegativeInt,
+    PositiveFloat,
+    PositiveInt,
+    UrlConstraints,
+)
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-OpcuaUrl = Annotated[AnyUrl, UrlConstraints(allowed_schemes=["opc.tcp"])]
+OpcuaUrl = Annotated[
+    AnyUrl, UrlConstraints(allowed_schemes=["opc.tcp", "opc.loopback"])
+]
+# names of asyncua.ua.SecurityPolicyType
+SecurityPolicy = Literal[
+    "NoSecurity",
+    "Basic128Rsa15_Sign",
+    "Basic128Rsa15_SignAndEncrypt",
+    "Basic256_Sign",
+    "Basic256_SignAndEncrypt",
+    "Basic256Sha256_Sign",
+    "Basic256Sha256_SignAndEncrypt",
+    "Aes128Sha256RsaOaep_Sign",
+    "Aes128Sha256RsaOaep_SignAndEncrypt",
+    "Aes256Sha256RsaPss_Sign",
+    "Aes256Sha256RsaPss_SignAndEncrypt",
+]
+default_security_policies: list[SecurityPolicy] = [
+    "NoSecurity",
+    "Basic256Sha256_SignAndEncrypt",
+    "Basic256Sha256_Sign",
+]
 
 
 class Settings(BaseSettings):
     opcua_server_url: OpcuaUrl
     opcua_server_namespace: HttpUrl
+    # NodeIds derived from object names and field paths, see OpcuaServer.create
+    opcua_string_node_ids: bool = False
 
 
 class OpcuaServerSettings(Settings):
     opcua_server_name: str = "OPC UA Server"
     opcua_server_interval: PositiveFloat = 0.1
+    # see benchmark/protocol.py for their effect on bulk reads
+    opcua_security_policies: list[SecurityPolicy] = default_security_policies
+    # bytes, 0 means no limit
+    opcua_max_message_size: NonNegativeInt = 100 * 2**20
+    opcua_max_chunk_size: PositiveInt = 2**16 - 1
+    # seconds, faster subscriptions are revised to them
+    opcua_min_sampling_interval: NonNegativeFloat = 0
+    opcua_min_publishing_interval: NonNegativeFloat = 0
 
 
 class OpcuaClientSettings(Settings):
-    pass
+    # seconds to wait for each response
+    opcua_request_timeout: PositiveFloat = 4
+    # bytes, 0 means the limit of the server
+    opcua_max_message_size: NonNegativeInt = 0
 
 
 class EnvOpcuaServerSettings(OpcuaServerSettings):
@@ -0,0 +1,214 @@
+import asyncio
+import struct
+from collections.abc import Callable
+from datetime import date, datetime
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Generic, NamedTuple
+
+from asyncua.ua import VariantType
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+from .base import TOpcuaModel
+from .core import Opcuax
+from .helper import field_class, is_model_class
+from .values import is_changed, opcua_value, python_field_value, ua_variant
+
+# every slot starts with a sequence counter, odd while a producer is writing
+_seq = struct.Struct("<Q")
+
+__int_formats = {
+    VariantType.SByte: "b",
+    VariantType.Byte: "B",
+    VariantType.Int16: "h",
+    VariantType.UInt16: "H",
+    VariantType.Int32: "i",
+    VariantType.UInt32: "I",
+    VariantType.Int64: "q",
+    VariantType.UInt64: "Q",
+}
+
+
+class _Leaf(NamedTuple):
+    # attribute names from the object to the field, e.g. ("bed", "actual")
+    path: tuple[str, ...]
+    format: str
+    encode: Callable[[Any], Any]
+    decode: Callable[[Any], Any]
+
+
+def encode_str(size: int) -> Callable[[Any], bytes]:
+    def encode(value: Any) -> bytes:
+        data = str(opcua_value(value)).encode()
+        if len(data) > size:
+            raise ValueError(f"{value!r} is longer than {size} bytes")
+        return data
+
+    return encode
+
+
+def leaf_codec(field: FieldInfo, str_size: int) -> tuple[str, Any, Any]:
+    variant_type, _, dimensions = ua_variant(field)
+    cls = field_class(field)
+
+    def decode(value: Any) -> Any:
+        return python_field_value(field, value)
+
+    if dimensions is not None:
+        raise ValueError(f"array field {field} cannot be stored in shared memory")
+    elif variant_type == VariantType.Boolean:
+        return "?", bool, bool
+    elif variant_type in __int_formats:
+        return __int_formats[variant_type], int, int
+    elif variant_type in (VariantType.Float, VariantType.Double):
+        return "d", float, float
+    elif variant_type == VariantType.DateTime and cls is date:
+        return "q", date.toordinal, date.fromordinal
+    elif variant_type == VariantType.DateTime:
+        return "d", datetime.timestamp, datetime.fromtimestamp
+    elif variant_type == VariantType.String:
+        return (
+            f"{str_size}s",
+            encode_str(str_size),
+            lambda v: decode(v.rstrip(b"\0").decode()),
+        )
+
+    raise ValueError(f"{variant_type} cannot be stored in shared memory")
+
+
+def leaves(cls: type[BaseModel], str_size: int) -> list[_Leaf]:
+    result = []
+    for name, info in cls.model_fields.items():
+        field_cls = field_class(info)
+        if is_model_class(field_cls):
+            result += [
+                leaf._replace(path=(name, *leaf.path))
+                for leaf in leaves(field_cls, str_size)
+            ]
+        else:
+            result.append(_Leaf((name,), *leaf_codec(info, str_size)))
+    return result
+
+
+class SharedTable(Generic[TOpcuaModel]):
+    """Latest values of a fixed set of objects in shared memory.
+
+    The table has one slot per object, a slot is a sequence counter followed by
+    the leaf fields packed with ``struct``. Producer processes call ``write``
+    without any IPC, the process owning the server calls ``sync`` to commit the
+    objects whose counter moved since the last scan. Pass the table to a
+    ``multiprocessing.Process`` to attach to the same memory, each object must be
+    written by one process at a time.
+    """
+
+    model_class: type[TOpcuaModel]
+    names: list[str]
+    str_size: int
+    committed: int
+
+    def __init__(
+        self,
+        model_class: type[TOpcuaModel],
+        names: list[str],
+        str_size: int = 64,
+        memory_name: str | None = None,
+    ) -> None:
+        self.model_class = model_class
+        self.names = names
+        self.str_size = str_size
+        self.committed = 0
+        self.indexes = {name: i for i, name in enumerate(names)}
+        self.leaves = leaves(model_class, str_size)
+        self.values = struct.Struct("<" + "".join(leaf.format for leaf in self.leaves))
+        # keep sequence counters 8-byte aligned
+        self.slot_size = -(-(_seq.size + self.values.size) // 8) * 8
+        self.owner = memory_name is None
+        self.memory = SharedMemory(
+            memory_name, create=self.owner, size=self.slot_size * len(names)
+        )
+        self.seen = [0] * len(names)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            "model_class": self.model_class,
+            "names": self.names,
+            "str_size": self.str_size,
+            "memory_name": self.memory.name,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc]
+
+    def __enter__(self) -> "SharedTable[TOpcuaModel]":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Detach from the memory, the creating process also frees it."""
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def write(self, name: str, model: TOpcuaModel) -> None:
+        buf = self.memory.buf
+        assert buf is not None
+        offset = self.indexes[name] * self.slot_size
+        (seq,) = _seq.unpack_from(buf, offset)
+        values = []
+        for leaf in self.leaves:
+            value: Any = model
+            for attr in leaf.path:
+                value = value.__dict__[attr]
+            values.append(leaf.encode(value))
+
+        _seq.pack_into(buf, offset, seq + 1)
+        self.values.pack_into(buf, offset + _seq.size, *values)
+        _seq.pack_into(buf, offset, seq + 2)
+
+    def scan(self) -> list[tuple[str, list[Any]]]:
+        """Leaf values of objects written since the last scan.
+
+        A slot being written or changed while it is read is left to the next scan.
+        """
+        buf = self.memory.buf
+        assert buf is not None
+        dirty = []
+        for i, name in enumerate(self.names):
+            offset = i * self.slot_size
+            (seq,) = _seq.unpack_from(buf, offset)
+            if seq == self.seen[i] or seq % 2 == 1:
+                continue
+
+            values = self.values.unpack_from(buf, offset + _seq.size)
+            if _seq.unpack_from(buf, offset)[0] != seq:
+                continue
+
+            self.seen[i] = seq
+            dirty.append(
+                (name, [leaf.decode(v) for leaf, v in zip(self.leaves, values)])
+            )
+        return dirty
+
+    async def sync(self, server: Opcuax) -> int:
+        """Commit the changed fields of all dirty objects in one batch."""
+        dirty = self.scan()
+        for name, values in dirty:
+            model: Any = await server.get_object(self.model_class, name)
+            for leaf, value in zip(self.leaves, values):
+                parent = model
+                for attr in leaf.path[:-1]:
+                    parent = parent.__dict__[attr]
+                key = leaf.path[-1]
+                if is_changed(parent.__dict__[key], value):
+                    setattr(parent, key, value)
+
+        await server.commit()
+        self.committed += len(dirty)
+        return len(dirty)
+
+    async def run(self, server: Opcuax, interval: float = 0.1) -> None:
+        while True:
+            await self.sync(server)
+            await asyncio.sleep(interval)
@@ -0,0 +1,86 @@
+from typing import Any
+
+from asyncua import Node
+from asyncua.common.structures104 import load_custom_struct
+from pydantic import BaseModel
+
+from .helper import field_class, is_model_class
+from .values import opcua_value, python_field_value, ua_variant
+
+# generated structure classes are registered globally in asyncua.ua as well
+ua_struct_classes: dict[type[BaseModel], type[Any]] = {}
+
+
+def data_type_name(cls: type[BaseModel]) -> str:
+    return cls.__name__ + "DataType"
+
+
+def origin_class(model: BaseModel) -> type[BaseModel]:
+    cls = type(model)
+    return getattr(cls, "origin", cls)
+
+
+def struct_classes(cls: type[BaseModel]) -> list[type[BaseModel]]:
+    """Model classes used by a structure, nested classes come first."""
+    classes: list[type[BaseModel]] = []
+
+    def dfs(_cls: type[BaseModel]) -> None:
+        for info in _cls.model_fields.values():
+            field_cls = field_class(info)
+            if is_model_class(field_cls):
+                dfs(field_cls)
+        if _cls not in classes:
+            classes.append(_cls)
+
+    dfs(cls)
+    return classes
+
+
+async def load_ua_struct(cls: type[BaseModel], data_type_node: Node) -> type[Any]:
+    if cls not in ua_struct_classes:
+        ua_struct_classes[cls] = await load_custom_struct(data_type_node)
+    return ua_struct_classes[cls]
+
+
+def to_ua_struct(model: BaseModel) -> Any:
+    cls = origin_class(model)
+    values = {}
+
+    for name in cls.model_fields:
+        value = model.__dict__[name]
+
+        if isinstance(value, BaseModel):
+            values[name] = to_ua_struct(value)
+        else:
+            values[name] = opcua_value(value)
+
+    return ua_struct_classes[cls](**values)
+
+
+def default_ua_struct(cls: type[BaseModel]) -> Any:
+    values = {}
+
+    for name, info in cls.model_fields.items():
+        field_cls = field_class(info)
+
+        if is_model_class(field_cls):
+            values[name] = default_ua_struct(field_cls)
+        else:
+            values[name] = opcua_value(ua_variant(info).default)
+
+    return ua_struct_classes[cls](**values)
+
+
+def from_ua_struct(cls: type[BaseModel], ua_value: Any) -> dict[str, Any]:
+    fields: dict[str, Any] = {}
+
+    for name, info in cls.model_fields.items():
+        field_cls = field_class(info)
+        value = getattr(ua_value, name)
+
+        if is_model_class(field_cls):
+            fields[name] = from_ua_struct(field_cls, value)
+        else:
+            fields[name] = python_field_value(info, value)
+
+    return fields
@@ -0,0 +1,64 @@
+from typing import Any
+
+from asyncua import ua
+from asyncua.server.address_space import AddressSpace
+from asyncua.server.subscription_service import SubscriptionService
+
+
+class MinimumIntervalSubscriptionService(SubscriptionService):  # type: ignore[misc]
+    """Subscription service revising publishing intervals up to a minimum.
+
+    The asyncua server accepts any requested interval, a client asking for
+    0 ms makes the server publish on every event loop iteration.
+    Monitored items are sampled at the publishing interval of their
+    subscription, so ``min_sampling_interval`` (seconds) is a minimum too,
+    and it is the least sampling interval reported to clients.
+    """
+
+    def __init__(
+        self,
+        aspace: AddressSpace,
+        min_publishing_interval: float,
+        min_sampling_interval: float = 0,
+    ) -> None:
+        super().__init__(aspace)
+        self.min_interval = max(min_publishing_interval, min_sampling_interval)
+        self.min_sampling_interval = min_sampling_interval
+
+    async def create_subscription(
+        self, params: ua.CreateSubscriptionParameters, *args: Any, **kwargs: Any
+    ) -> ua.CreateSubscriptionResult:
+        interval = max(params.RequestedPublishingInterval, self.min_interval * 1000)
+        params.RequestedPublishingInterval = interval
+        return await super().create_subscription(params, *args, **kwargs)
+
+    def modify_subscription(
+        self, params: ua.ModifySubscriptionParameters
+    ) -> ua.ModifySubscriptionResult:
+        interval = max(params.RequestedPublishingInterval, self.min_interval * 1000)
+        params.RequestedPublishingInterval = interval
+        return super().modify_subscription(params)
+
+    async def create_monitored_items(
+        self, params: ua.CreateMonitoredItemsParameters
+    ) -> list[ua.MonitoredItemCreateResult]:
+        results: list[ua.MonitoredItemCreateResult]
+        results = await super().create_monitored_items(params)
+        for result in results:
+            result.RevisedSamplingInterval = max(
+                result.RevisedSamplingInterval, self.min_sampling_interval * 1000
+            )
+        return results
+
+    def modify_monitored_items(
+        self, params: ua.ModifyMonitoredItemsParameters
+    ) -> list[ua.MonitoredItemModifyResult]:
+        # the requested sampling interval is echoed as the revised one
+        for item in params.ItemsToModify:
+            item.RequestedParameters.SamplingInterval = max(
+                item.RequestedParameters.SamplingInterval,
+                self.min_sampling_interval * 1000,
+            )
+        results: list[ua.MonitoredItemModifyResult]
+        results = super().modify_monitored_items(params)
+        return results
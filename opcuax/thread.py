@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from types import TracebackType
+from typing import TYPE_CHECKING, Any
+
+from .base import OpcuaModel, TOpcuaModel
+
+if TYPE_CHECKING:
+    from .server import OpcuaServer
+
+
+class ServerThread:
+    """Run an ``OpcuaServer`` and its event loop on a dedicated thread.
+
+    Methods can be called from any thread and never wait for the server,
+    they return a ``concurrent.futures.Future`` which can be waited by
+    ``future.result()`` or awaited by ``asyncio.wrap_future(future)``.
+    ``update`` only records the latest model of each object, all updates made
+    before the server thread wakes up are written in one batch.
+    Failed updates are raised by the future of the next ``commit``.
+    """
+
+    server: "OpcuaServer"
+    loop: asyncio.AbstractEventLoop
+    thread: threading.Thread
+
+    def __init__(self, server: "OpcuaServer") -> None:
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name=f"opcuax-{server.endpoint}", daemon=True
+        )
+        self.lock = threading.Lock()
+        self.pending: dict[str, OpcuaModel] = {}
+        self.flush_scheduled = False
+        self.flush_tasks: set[asyncio.Task[None]] = set()
+        # failures of updates, raised by the next commit
+        self.errors: list[Exception] = []
+
+    def start(self) -> "ServerThread":
+        self.thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self.server.__aenter__(), self.loop
+            ).result()
+        except BaseException:
+            # e.g. the port is in use, __exit__ is never called
+            self.__stop_loop()
+            raise
+        return self
+
+    def stop(self) -> None:
+        """Write pending updates, stop the server and join the thread."""
+        if not self.thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.__stop(), self.loop).result()
+        finally:
+            self.__stop_loop()
+
+    def __stop_loop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def __enter__(self) -> "ServerThread":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def create(self, name: str, model: TOpcuaModel) -> "Future[None]":
+        return asyncio.run_coroutine_threadsafe(self.__create(name, model), self.loop)
+
+    def update(self, name: str, model: OpcuaModel) -> None:
+        with self.lock:
+            self.pending[name] = model
+            if self.flush_scheduled:
+                return
+            self.flush_scheduled = True
+        self.loop.call_soon_threadsafe(self.__schedule_flush)
+
+    def commit(self) -> "Future[None]":
+        """Write all updates made so far."""
+        return asyncio.run_coroutine_threadsafe(self.__commit(), self.loop)
+
+    def get_object(
+        self, model_class: type[TOpcuaModel], name: str
+    ) -> "Future[TOpcuaModel]":
+        """Latest values of an object, as a plain model owned by the caller."""
+        return asyncio.run_coroutine_threadsafe(
+            self.__get_object(model_class, name), self.loop
+        )
+
+    def __schedule_flush(self) -> None:
+        task = self.loop.create_task(self.__flush_later())
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.flush_tasks.discard)
+
+    async def __flush(self) -> None:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.flush_scheduled = False
+
+        async with asyncio.TaskGroup() as tg:
+            for name, model in pending.items():
+                tg.create_task(self.server.update(name, model))
+
+    async def __flush_later(self) -> None:
+        try:
+            await self.__flush()
+        except Exception as e:
+            self.server.logger.exception("failed to update objects")
+            self.errors.append(e)
+
+    async def __create(self, name: str, model: OpcuaModel) -> None:
+        await self.server.create(name, model)
+
+    async def __commit(self) -> None:
+        await self.__flush_later()
+        await asyncio.gather(*self.flush_tasks)
+        await self.server.commit()
+        errors, self.errors = self.errors, []
+        if errors:
+            raise ExceptionGroup("failed to update objects", errors)
+
+    async def __get_object(
+        self, model_class: type[TOpcuaModel], name: str
+    ) -> TOpcuaModel:
+        enhanced: Any = await self.server.get_object(model_class, name)
+        await self.server.refresh(enhanced)
+        return model_class.model_validate(enhanced.model_dump())
+
+    async def __stop(self) -> None:
+        try:
+            await self.__commit()
+        finally:
+            await self.server.__aexit__(None, None, None)
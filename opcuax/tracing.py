@@ -0,0 +1,157 @@
+import contextlib
+import os
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from asyncua.client.ua_client import UaClient
+from asyncua.server.internal_session import InternalSession
+from asyncua.ua.ua_binary import struct_to_binary
+
+if TYPE_CHECKING:
+    from .core import Opcuax
+
+# session method -> service name and the request field listing its nodes
+services = {
+    "browse": ("Browse", "NodesToBrowse"),
+    "browse_next": ("BrowseNext", "ContinuationPoints"),
+    "read": ("Read", "NodesToRead"),
+    "write": ("Write", "NodesToWrite"),
+    "translate_browsepaths_to_nodeids": ("TranslateBrowsePaths", "BrowsePaths"),
+    "add_nodes": ("AddNodes", "NodesToAdd"),
+}
+
+package_dir = os.path.dirname(__file__)
+
+
+@dataclass(slots=True)
+class ServiceCall:
+    service: str
+    nodes: int
+    # binary encoded size of request parameters and results
+    request_bytes: int
+    response_bytes: int
+    elapsed: float
+    # opcuax functions which made the call, outermost first
+    origin: str
+
+
+class RequestTrace:
+    """Service calls recorded by ``trace_requests``."""
+
+    calls: list[ServiceCall]
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def count(self, service: str | None = None) -> int:
+        return sum(1 for call in self.calls if service in (None, call.service))
+
+    def nodes(self, service: str | None = None) -> int:
+        return sum(call.nodes for call in self.calls if service in (None, call.service))
+
+    def profile(self) -> Counter[tuple[str, str]]:
+        """Number of calls by (origin, service)."""
+        return Counter((call.origin, call.service) for call in self.calls)
+
+    def summary(self) -> str:
+        lines = []
+        stats: dict[str, list[float]] = {}
+        for call in self.calls:
+            total = stats.setdefault(call.service, [0, 0, 0, 0])
+            total[0] += 1
+            total[1] += call.nodes
+            total[2] += call.request_bytes + call.response_bytes
+            total[3] += call.elapsed
+        for service, (calls, nodes, size, elapsed) in sorted(stats.items()):
+            lines.append(
+                f"{service}: {calls:.0f} calls {nodes:.0f} nodes "
+                f"{size:.0f} bytes {elapsed * 1000:.1f} ms"
+            )
+        for (origin, service), calls in self.profile().most_common():
+            lines.append(f"  {calls} {service} from {origin}")
+        return "\n".join(lines)
+
+
+def _size(value: Any) -> int:
+    try:
+        if isinstance(value, list):
+            return sum(len(struct_to_binary(item)) for item in value)
+        return len(struct_to_binary(value))
+    except Exception:
+        return 0
+
+
+def _origin() -> str:
+    """opcuax functions on the stack, from the API called by user code down."""
+    path = []
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(package_dir) and filename != __file__:
+            module = os.path.splitext(os.path.basename(filename))[0]
+            path.append(f"{module}.{frame.f_code.co_qualname}")
+        frame = frame.f_back  # type: ignore[assignment]
+    return " > ".join(reversed(path)) or "<user code>"
+
+
+def _traced(trace: RequestTrace, method: Any, service: str, field: str) -> Any:
+    async def call(*args: Any) -> Any:
+        # bound to a session instance, or called on the class with self first
+        params = args[-1]
+        origin = _origin()
+        started_at = time.perf_counter()
+        results = await method(*args)
+        elapsed = time.perf_counter() - started_at
+
+        nodes = params if isinstance(params, list) else getattr(params, field)
+        trace.calls.append(
+            ServiceCall(
+                service,
+                len(nodes),
+                _size(params),
+                _size(results),
+                elapsed,
+                origin,
+            )
+        )
+        return results
+
+    return call
+
+
+@contextlib.contextmanager
+def trace_requests(*targets: "Opcuax") -> Iterator[RequestTrace]:
+    """Record Browse, Read, Write, TranslateBrowsePaths and AddNodes calls.
+
+    Only calls of the sessions of ``targets`` are recorded if given, otherwise
+    calls of all clients and servers.
+
+    ```python
+    with trace_requests(client) as trace:
+        await client.refresh(printer)
+    assert trace.count("Read") == 1
+    ```
+    """
+    trace = RequestTrace()
+    patched: list[tuple[Any, str, Any]] = []
+    owners: list[Any] = [target.ua_objects_node.session for target in targets]
+    if not owners:
+        owners = [UaClient, InternalSession]
+
+    for owner in owners:
+        for name, (service, field) in services.items():
+            method = getattr(owner, name)
+            patched.append((owner, name, owner.__dict__.get(name)))
+            setattr(owner, name, _traced(trace, method, service, field))
+    try:
+        yield trace
+    finally:
+        for owner, name, original in reversed(patched):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
@@ -1,14 +1,19 @@
+import sys
+from dataclasses import dataclass
 from datetime import date, datetime
 from ipaddress import IPv4Address, IPv6Address
 from pathlib import Path
-from typing import Any, NamedTuple
+from typing import Annotated, Any, NamedTuple, get_args, get_origin
 from uuid import UUID
 
+from annotated_types import Ge, GroupedMetadata, Gt, Le, Lt
 from asyncua.ua import VariantType
 from pydantic import (
     AnyUrl,
+    Field,
     FutureDate,
     FutureDatetime,
+    GetCoreSchemaHandler,
     IPvAnyAddress,
     Json,
     PastDate,
@@ -17,18 +22,86 @@ from pydantic import (
 )
 from pydantic.fields import FieldInfo
 from pydantic.types import PathType
-from pydantic_core import PydanticUndefined
+from pydantic_core import PydanticUndefined, core_schema
+
+from .helper import field_class
 
 
 class _UaVariant(NamedTuple):
     variant_type: VariantType
     default: Any
+    # ArrayDimensions of array variables, 0 means the length is not fixed
+    dimensions: list[int] | None = None
+
+
+@dataclass(frozen=True)
+class UaType:
+    """Annotated marker overriding the VariantType of a field."""
+
+    variant_type: VariantType
+
+
+Int8 = Annotated[int, Field(ge=-(2**7), le=2**7 - 1), UaType(VariantType.SByte)]
+UInt8 = Annotated[int, Field(ge=0, le=2**8 - 1), UaType(VariantType.Byte)]
+Int16 = Annotated[int, Field(ge=-(2**15), le=2**15 - 1), UaType(VariantType.Int16)]
+UInt16 = Annotated[int, Field(ge=0, le=2**16 - 1), UaType(VariantType.UInt16)]
+Int32 = Annotated[int, Field(ge=-(2**31), le=2**31 - 1), UaType(VariantType.Int32)]
+UInt32 = Annotated[int, Field(ge=0, le=2**32 - 1), UaType(VariantType.UInt32)]
+Int64 = Annotated[int, Field(ge=-(2**63), le=2**63 - 1), UaType(VariantType.Int64)]
+UInt64 = Annotated[int, Field(ge=0, le=2**64 - 1), UaType(VariantType.UInt64)]
+Float = Annotated[float, UaType(VariantType.Float)]
+Double = Annotated[float, UaType(VariantType.Double)]
+
+
+@dataclass(frozen=True)
+class NDArray:
+    """Annotated marker for numpy.ndarray fields.
+
+    ``Annotated[np.ndarray, NDArray("float64", (1000,))]`` is mapped to an
+    OPC UA array of Double with ArrayDimensions ``[1000]``,
+    the shape is not checked if it is None.
+    """
+
+    dtype: Any
+    shape: tuple[int, ...] | None = None
+
+    def __get_pydantic_core_schema__(
+        self, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            self.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda array: array.tolist(), when_used="json"
+            ),
+        )
+
+    def validate(self, value: Any) -> Any:
+        import numpy as np
+
+        # no copy if value is already an array of the right dtype
+        array = np.asarray(value, dtype=self.dtype)
+        if self.shape is not None and array.shape != self.shape:
+            raise ValueError(f"expected shape {self.shape}, got {array.shape}")
+        return array
+
+    @property
+    def variant_type(self) -> VariantType:
+        return numpy_variant_type(self.dtype)
+
+    @property
+    def dimensions(self) -> list[int]:
+        return list(self.shape) if self.shape is not None else [0]
+
+    def zeros(self) -> list[Any]:
+        import numpy as np
+
+        return np.zeros(self.shape or (0,), dtype=self.dtype).tolist()  # type: ignore
 
 
 __mapping = {
     str: _UaVariant(VariantType.String, ""),
     int: _UaVariant(VariantType.Int64, 0),
-    float: _UaVariant(VariantType.Float, 0),
+    float: _UaVariant(VariantType.Double, 0),
     bool: _UaVariant(VariantType.Boolean, False),
     # ISO 8601:2004 is required https://reference.opcfoundation.org/Core/Part6/v104/docs/5.4.2.6
     date: _UaVariant(VariantType.DateTime, date.min),
@@ -44,9 +117,81 @@ __mapping = {
     Path: _UaVariant(VariantType.String, "/dev/null"),
     UUID: _UaVariant(VariantType.String, ""),
     Json: _UaVariant(VariantType.String, "{}"),
+    # bytearray and memoryview fields need arbitrary_types_allowed
+    bytes: _UaVariant(VariantType.ByteString, b""),
+    bytearray: _UaVariant(VariantType.ByteString, b""),
+    memoryview: _UaVariant(VariantType.ByteString, b""),
+}
+
+__numpy_mapping = {
+    "bool": VariantType.Boolean,
+    "int8": VariantType.SByte,
+    "uint8": VariantType.Byte,
+    "int16": VariantType.Int16,
+    "uint16": VariantType.UInt16,
+    "int32": VariantType.Int32,
+    "uint32": VariantType.UInt32,
+    "int64": VariantType.Int64,
+    "uint64": VariantType.UInt64,
+    "float32": VariantType.Float,
+    "float64": VariantType.Double,
 }
 
 
+# smallest types first
+__int_ranges = [
+    (VariantType.Byte, 0, 2**8 - 1),
+    (VariantType.SByte, -(2**7), 2**7 - 1),
+    (VariantType.UInt16, 0, 2**16 - 1),
+    (VariantType.Int16, -(2**15), 2**15 - 1),
+    (VariantType.UInt32, 0, 2**32 - 1),
+    (VariantType.Int32, -(2**31), 2**31 - 1),
+    (VariantType.UInt64, 0, 2**64 - 1),
+    (VariantType.Int64, -(2**63), 2**63 - 1),
+]
+
+
+def int_variant_type(field: FieldInfo) -> VariantType:
+    """Infer the smallest integer type from constraints like ``ge`` and ``le``."""
+    lower: int | None = None
+    upper: int | None = None
+    constraints: list[Any] = []
+
+    for metadata in field.metadata:
+        # conint() keeps an Interval instead of separate constraints
+        if isinstance(metadata, GroupedMetadata):
+            constraints.extend(metadata)
+        else:
+            constraints.append(metadata)
+
+    for metadata in constraints:
+        if isinstance(metadata, Ge):
+            lower = int(metadata.ge)  # type: ignore
+        elif isinstance(metadata, Gt):
+            lower = int(metadata.gt) + 1  # type: ignore
+        elif isinstance(metadata, Le):
+            upper = int(metadata.le)  # type: ignore
+        elif isinstance(metadata, Lt):
+            upper = int(metadata.lt) - 1  # type: ignore
+
+    if lower is None or upper is None:
+        return VariantType.Int64
+
+    for variant_type, _lower, _upper in __int_ranges:
+        if _lower <= lower and upper <= _upper:
+            return variant_type
+    return VariantType.Int64
+
+
+def numpy_variant_type(dtype: Any) -> VariantType:
+    import numpy as np
+
+    name = np.dtype(dtype).name
+    if name not in __numpy_mapping:
+        raise ValueError(f"cannot map numpy dtype {name} to ua.VariantType")
+    return __numpy_mapping[name]
+
+
 def default_url(constraint: UrlConstraints) -> str:
     url = ""
 
@@ -65,12 +210,47 @@ def default_url(constraint: UrlConstraints) -> str:
     return url
 
 
-def ua_variant(field: FieldInfo) -> _UaVariant:
+def ndarray_metadata(field: FieldInfo) -> NDArray | None:
+    for metadata in field.metadata:
+        if isinstance(metadata, NDArray):
+            return metadata
+    return None
+
+
+def __array_variant(field: FieldInfo) -> _UaVariant | None:
+    cls = field.annotation
+    array = ndarray_metadata(field)
+
+    if array is not None:
+        return _UaVariant(array.variant_type, array.zeros(), array.dimensions)
+    elif get_origin(cls) is list:
+        (item_cls,) = get_args(cls)
+        if item_cls not in __mapping:
+            raise ValueError(f"cannot map {cls} to ua.VariantType")
+        return _UaVariant(__mapping[item_cls].variant_type, [], [0])
+
+    return None
+
+
+def __field_variant(field: FieldInfo) -> _UaVariant:
+    variant = __array_variant(field) or __scalar_variant(field)
+
+    for metadata in field.metadata:
+        if isinstance(metadata, UaType):
+            return variant._replace(variant_type=metadata.variant_type)
+
+    return variant
+
+
+def __scalar_variant(field: FieldInfo) -> _UaVariant:
     cls = field.annotation
     if cls is None or cls not in __mapping:
         raise ValueError(f"cannot map {cls} to ua.VariantType")
 
-    variant_type, default = __mapping[cls]
+    variant_type, default, _ = __mapping[cls]
+
+    if cls is int:
+        variant_type = int_variant_type(field)
 
     if len(field.metadata) > 0:
         metadata = field.metadata[0]
@@ -80,27 +260,67 @@ def ua_variant(field: FieldInfo) -> _UaVariant:
         if isinstance(metadata, UrlConstraints):
             default = default_url(metadata)
         elif isinstance(metadata, (FutureDate, PastDate, FutureDatetime, PastDatetime)):
-            variant_type, default = __mapping[type(metadata)]
+            variant_type, default, _ = __mapping[type(metadata)]
         elif isinstance(metadata, PathType):
             if metadata.path_type == "dir":
                 default = "./"
 
+    return _UaVariant(variant_type, default)
+
+
+def ua_variant_type(field: FieldInfo) -> VariantType:
+    return __field_variant(field).variant_type
+
+
+def ua_variant(field: FieldInfo) -> _UaVariant:
+    variant_type, default, dimensions = __field_variant(field)
+
     if field.default != PydanticUndefined:
         default = field.default
     elif field.default_factory is not None:
         default = field.default_factory()
 
-    return _UaVariant(variant_type, default)
+    if dimensions is not None:
+        default = opcua_value(default)
+
+    return _UaVariant(variant_type, default, dimensions)
+
+
+def is_ndarray(value: Any) -> bool:
+    # avoid importing numpy if it is not used
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def is_changed(old: Any, new: Any) -> bool:
+    if is_ndarray(old) or is_ndarray(new):
+        numpy = sys.modules["numpy"]
+        return not numpy.array_equal(old, new)
+    return bool(old != new)
 
 
 def opcua_value(value: Any) -> Any:
-    if isinstance(value, (str, int, float, bool, date, datetime)):
+    if isinstance(value, (str, int, float, bool, date, datetime, bytes, bytearray)):
         return value
+    elif isinstance(value, memoryview):
+        # buffers are encoded without a copy, by bytes rather than items
+        return value.cast("B")
+    elif isinstance(value, list):
+        return [opcua_value(item) for item in value]
+    elif is_ndarray(value):
+        return value.tolist()
     return str(value)
 
 
 def python_value(cls: type[Any], ua_value: Any) -> Any:
-    if cls is date or cls is datetime:
+    if cls is date or cls is datetime or cls is bytes:
         return ua_value
     else:
         return cls(ua_value)
+
+
+def python_field_value(field: FieldInfo, ua_value: Any) -> Any:
+    array = ndarray_metadata(field)
+    if array is not None:
+        return array.validate(ua_value)
+    return python_value(field_class(field), ua_value)
@@ -9,6 +9,13 @@ from .models import Dog
 
 @pytest.fixture
 def endpoint() -> str:
+    # in-memory connections, see opcuax/loopback.py
+    return "opc.loopback://unittest"
+
+
+@pytest.fixture
+def tcp_endpoint() -> str:
+    # for servers in other threads or processes
     return "opc.tcp://localhost:44840"
 
 
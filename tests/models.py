@@ -1,3 +1,5 @@
+from typing import ClassVar
+
 from opcuax import OpcuaModel
 
 
@@ -12,3 +14,7 @@ class Home(OpcuaModel):
     address: str
 
     dog: Dog
+
+
+class StructHome(Home):
+    opcua_struct: ClassVar[bool] = True
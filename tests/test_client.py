@@ -1,11 +1,16 @@
+import asyncio
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Any
 
-from opcuax import OpcuaModel, OpcuaServer
+import numpy as np
+import pytest
+from asyncua import ua
+from opcuax import OpcuaModel, OpcuaServer, RingBuffer, trace_requests
 from opcuax.client import OpcuaClient
-from pydantic import Field, PastDatetime
+from opcuax.values import NDArray
+from pydantic import BaseModel, Field, PastDatetime
 
-from .models import Dog
+from .models import Dog, Home, StructHome
 
 
 async def test_read_snoopy(client: OpcuaClient, snoopy: Dog) -> None:
@@ -25,3 +30,339 @@ async def test_datetime(server: OpcuaServer, client: OpcuaClient) -> None:
     model = await server.create("model", Model())
 
     assert model.val < datetime.now()
+
+
+async def test_ndarray(server: OpcuaServer, client: OpcuaClient) -> None:
+    class Model(OpcuaModel):
+        val: Annotated[np.ndarray[Any, Any], NDArray("int16", (1000,))]
+
+    array = np.arange(1000, dtype="int16")
+    await server.create("model", Model(val=array))
+    model = await client.get_object(Model, "model")
+
+    assert model.val.dtype == np.int16
+    assert np.array_equal(model.val, array)
+
+
+async def test_reconnect(endpoint: str, namespace: str, snoopy: Dog) -> None:
+    home = StructHome(name="home", address="street", dog=snoopy)
+
+    async with OpcuaServer(endpoint, "server", namespace) as server:
+        await server.create("Snoopy", snoopy)
+        await server.create("Home", home)
+        client = await OpcuaClient(endpoint, namespace).__aenter__()
+        dog = await client.get_object(Dog, "Snoopy")
+        struct_home = await client.get_object(StructHome, "Home")
+
+    async with OpcuaServer(endpoint, "restarted server", namespace) as server:
+        await server.create("Snoopy", snoopy.model_copy(update={"age": 99}))
+        await server.create("Home", home.model_copy(update={"name": "new home"}))
+        await client.reconnect(base_delay=0.01)
+
+        assert dog.age == 99
+        assert struct_home.name == "new home"
+        assert client.node_tables[Dog].rows == 1
+        assert client.reconnects == 1
+        await client.__aexit__(None, None, None)
+
+
+async def test_auto_reconnect(endpoint: str, namespace: str, snoopy: Dog) -> None:
+    client = OpcuaClient(endpoint, namespace, auto_reconnect=True, check_interval=0.1)
+
+    async with OpcuaServer(endpoint, "server", namespace) as server:
+        await server.create("Snoopy", snoopy)
+        await client.__aenter__()
+        dog = await client.get_object(Dog, "Snoopy")
+
+    async with OpcuaServer(endpoint, "restarted server", namespace) as server:
+        await server.create("Snoopy", snoopy.model_copy(update={"age": 99}))
+        async with asyncio.timeout(10):
+            while client.reconnects == 0:
+                await asyncio.sleep(0.1)
+
+        assert dog.age == 99
+        await client.__aexit__(None, None, None)
+
+
+async def test_auto_reconnect_failure(
+    endpoint: str, namespace: str, snoopy: Dog
+) -> None:
+    client = OpcuaClient(endpoint, namespace, auto_reconnect=True, check_interval=0.05)
+    resync = client.resync
+    resyncs = 0
+
+    async def failing_resync() -> int:
+        nonlocal resyncs
+        resyncs += 1
+        if resyncs == 1:
+            raise RuntimeError("resync failed")
+        return await resync()
+
+    client.resync = failing_resync  # type: ignore[method-assign]
+
+    async with OpcuaServer(endpoint, "server", namespace) as server:
+        await server.create("Snoopy", snoopy)
+        await client.__aenter__()
+        dog = await client.get_object(Dog, "Snoopy")
+
+    async with OpcuaServer(endpoint, "restarted server", namespace) as server:
+        await server.create("Snoopy", snoopy.model_copy(update={"age": 99}))
+        async with asyncio.timeout(10):
+            while client.reconnects == 0:
+                await asyncio.sleep(0.1)
+
+        assert resyncs == 2
+        assert dog.age == 99
+        await client.__aexit__(None, None, None)
+
+
+async def test_reconnect_reused_node_ids(
+    endpoint: str, namespace: str, snoopy: Dog
+) -> None:
+    odie = snoopy.model_copy(update={"name": "odie", "age": 1})
+
+    async with OpcuaServer(endpoint, "server", namespace) as server:
+        await server.create("Snoopy", snoopy)
+        await server.create("Odie", odie)
+        client = await OpcuaClient(endpoint, namespace).__aenter__()
+        dog = await client.get_object(Dog, "Snoopy")
+
+    # the same NodeIds are given to other objects
+    async with OpcuaServer(endpoint, "restarted server", namespace) as server:
+        await server.create("Odie", odie)
+        await server.create("Snoopy", snoopy)
+        await client.reconnect(base_delay=0.01)
+
+        assert dog.name == "snoopy"
+        assert len(client.objects) == 0
+        remote = await client.get_object(Dog, "Snoopy")
+        assert remote.model_dump() == snoopy.model_dump()
+        await client.__aexit__(None, None, None)
+
+
+async def test_poll(pet_server: OpcuaServer, client: OpcuaClient, snoopy: Dog) -> None:
+    dog = await client.get_object(Dog, "Snoopy")
+    group = client.poll([dog], 0.05, paths=["age"])
+
+    await pet_server.update("Snoopy", snoopy.model_copy(update={"age": 1, "weight": 1}))
+    await asyncio.sleep(0.2)
+    group.cancel()
+
+    assert dog.age == 1
+    assert dog.weight == snoopy.weight
+    assert group.polls > 0
+
+
+async def test_poll_after_restart(endpoint: str, namespace: str, snoopy: Dog) -> None:
+    odie = snoopy.model_copy(update={"name": "odie", "age": 1})
+
+    async with OpcuaServer(endpoint, "server", namespace) as server:
+        await server.create("Snoopy", snoopy)
+        await server.create("Odie", odie)
+        client = await OpcuaClient(endpoint, namespace).__aenter__()
+        dog = await client.get_object(Dog, "Snoopy")
+        group = client.poll([dog], 0.05)
+
+    # the NodeIds of Snoopy are given to Odie
+    async with OpcuaServer(endpoint, "restarted server", namespace) as server:
+        await server.create("Odie", odie)
+        await server.create("Snoopy", snoopy.model_copy(update={"age": 99}))
+        await client.reconnect(base_delay=0.01)
+        async with asyncio.timeout(5):
+            while dog.age != 99:
+                await asyncio.sleep(0.05)
+        await asyncio.sleep(0.2)
+
+        assert dog.name == "snoopy"
+        assert group.failed == 0
+        group.cancel()
+        await client.__aexit__(None, None, None)
+
+
+async def test_poll_deleted_object(
+    pet_server: OpcuaServer, client: OpcuaClient
+) -> None:
+    dog = await client.get_object(Dog, "Snoopy")
+    group = client.poll([dog], 0.05)
+    node = await pet_server.ua_objects_node.get_child(f"{pet_server.namespace}:Snoopy")
+    await pet_server.server.delete_nodes([node], recursive=True)
+
+    async with asyncio.timeout(5):
+        while group.failed == 0:
+            await asyncio.sleep(0.05)
+    group.cancel()
+
+
+async def test_object_cache(pet_server: OpcuaServer, snoopy: Dog) -> None:
+    await pet_server.create("Odie", snoopy.model_copy(update={"name": "odie"}))
+    endpoint, namespace = pet_server.endpoint, pet_server.namespace_uri
+
+    async with OpcuaClient(endpoint, namespace, max_objects=1) as client:
+        await client.get_object(Dog, "Snoopy")
+        client.objects.pin(Dog, "Snoopy")
+        odie = await client.get_object(Dog, "Odie")
+        assert odie.name == "odie"
+        assert await client.get_object(Dog, "Odie") is odie
+
+        client.objects.unpin(Dog, "Snoopy")
+        assert client.objects.evictions == 1
+        # rows of an evicted model are freed when it is not referenced anymore
+        assert len(client.node_tables[Dog]) == 2
+        await client.refresh(odie)
+        del odie
+        assert len(client.node_tables[Dog]) == 1
+
+        odie = await client.get_object(Dog, "Odie")
+        await client.refresh(odie)
+        assert odie.name == "odie"
+        assert client.node_tables[Dog].rows == 2
+        assert (client.objects.hits, client.objects.misses) == (1, 3)
+
+
+async def test_commit_evicted_object(pet_server: OpcuaServer, snoopy: Dog) -> None:
+    await pet_server.create("Odie", snoopy.model_copy(update={"name": "odie"}))
+    endpoint, namespace = pet_server.endpoint, pet_server.namespace_uri
+
+    async with OpcuaClient(endpoint, namespace, max_objects=1) as client:
+        dog = await client.get_object(Dog, "Snoopy")
+        dog.age = 1
+        await client.get_object(Dog, "Odie")
+        assert client.objects.evictions == 1
+
+        await client.commit()
+        await client.refresh(dog)
+        assert dog.age == 1
+        snoopy = await pet_server.get_object(Dog, "Snoopy")
+        await pet_server.refresh(snoopy)
+        assert snoopy.age == 1
+
+
+async def test_iter_objects(pet_server: OpcuaServer, snoopy: Dog) -> None:
+    await pet_server.create("Odie", snoopy.model_copy(update={"name": "odie"}))
+    home = StructHome(name="home", address="street", dog=snoopy)
+    await pet_server.create("Home", home)
+    endpoint, namespace = pet_server.endpoint, pet_server.namespace_uri
+
+    async with OpcuaClient(endpoint, namespace) as client:
+        dogs = {name: dog async for name, dog in client.iter_objects(Dog, 1)}
+        homes = [name async for name, _ in client.iter_objects(StructHome)]
+
+        assert sorted(dogs) == ["Odie", "Snoopy"]
+        assert dogs["Odie"].name == "odie"
+        assert dogs["Snoopy"] is await client.get_object(Dog, "Snoopy")
+        assert homes == ["Home"]
+
+
+async def test_iter_objects_max_objects(server: OpcuaServer, snoopy: Dog) -> None:
+    for i in range(5):
+        await server.create(f"d{i}", snoopy.model_copy(update={"age": i}))
+
+    async with OpcuaClient(server.endpoint, server.namespace_uri, max_objects=2) as c:
+        async for name, dog in c.iter_objects(Dog, batch_size=5):
+            await c.refresh(dog)
+            assert name == f"d{dog.age}"
+        assert len(c.objects) == 2
+        assert c.objects.evictions == 3
+
+
+async def test_operation_limits(
+    pet_server: OpcuaServer, client: OpcuaClient, snoopy: Dog
+) -> None:
+    assert client.operation_limits.max_nodes_per_read > 0
+    assert pet_server.operation_limits.max_nodes_per_write > 0
+
+    dog = await client.get_object(Dog, "Snoopy")
+    await pet_server.update("Snoopy", snoopy.model_copy(update={"age": 1}))
+    client.operation_limits.chunk_size = 2
+    with trace_requests(client) as trace:
+        await client.refresh(dog)
+
+    assert trace.count("Read") == 2
+    assert dog.age == 1 and dog.weight == snoopy.weight
+
+
+async def test_commit_operation_limits(
+    pet_server: OpcuaServer, client: OpcuaClient, snoopy: Dog
+) -> None:
+    await pet_server.create("Odie", snoopy.model_copy(update={"name": "odie"}))
+    dogs = [await client.get_object(Dog, name) for name in ("Snoopy", "Odie")]
+    for dog in dogs:
+        dog.name, dog.age, dog.weight = "dog", 1, 2
+
+    client.operation_limits.chunk_size = 4
+    with trace_requests(client) as trace:
+        await client.commit()
+
+    # 6 variables in one batch of 4 and one of 2
+    assert trace.count("Write") == 2 and trace.nodes("Write") == 6
+    for dog in dogs:
+        await client.refresh(dog)
+        assert (dog.name, dog.age, dog.weight) == ("dog", 1, 2)
+
+
+async def test_ring_buffer(server: OpcuaServer, client: OpcuaClient) -> None:
+    class Sensor(BaseModel):
+        value: Annotated[float, RingBuffer(3)] = 0
+
+    class Station(OpcuaModel):
+        name: str = ""
+        sensor: Sensor = Sensor()
+
+    station = await server.create("Station", Station())
+    remote = await client.get_object(Station, "Station")
+    history = client.history(remote.sensor, "value")
+    assert len(history) == 0
+
+    for value in range(1, 6):
+        station.sensor.value = value
+        await server.commit()
+        await client.refresh(remote)
+
+    # only the last 3 samples are kept
+    assert len(history) == 3 and history.count == 5
+    assert [value for _, value in history.samples()] == [3, 4, 5]
+    assert (history.min(), history.max(), history.mean(), history.last()) == (
+        3,
+        5,
+        4,
+        5,
+    )
+    assert history.rate() > 0
+    timestamps, values = history.to_numpy()
+    assert values.tolist() == [3, 4, 5]
+    assert list(timestamps) == sorted(timestamps)
+
+    with pytest.raises(ValueError):
+        client.history(remote, "name")
+
+
+async def test_string_node_ids(endpoint: str, namespace: str, snoopy: Dog) -> None:
+    home = Home(name="home", address="street", dog=snoopy)
+    struct_home = StructHome(name="home", address="street", dog=snoopy)
+
+    async with OpcuaServer(
+        endpoint, "server", namespace, string_node_ids=True
+    ) as server:
+        await server.create_ua_object_type(Home)
+        with trace_requests(server) as trace:
+            await server.create("Home", home)
+        assert trace.count() == 1
+        await server.create("StructHome", struct_home)
+        with pytest.raises(ValueError):
+            await server.create("Home.dog", snoopy)
+
+        async with OpcuaClient(endpoint, namespace, string_node_ids=True) as client:
+            with trace_requests(client) as trace:
+                remote = await client.get_object(Home, "Home")
+            assert trace.count() == 1 and trace.nodes("Read") == 5
+            assert remote.model_dump() == home.model_dump()
+            node = remote.dog.field_node("age")  # type: ignore[attr-defined]
+            assert node.nodeid == ua.NodeId("Home.dog.age", server.namespace)
+
+            remote_struct = await client.get_object(StructHome, "StructHome")
+            assert remote_struct.model_dump() == struct_home.model_dump()
+
+            remote.dog.age = 1
+            await client.commit()
+            await client.refresh(remote)
+            assert remote.dog.age == 1
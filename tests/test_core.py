@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import AsyncGenerator
 
 import pytest
@@ -107,3 +108,29 @@ async def test_update_fields_of_same_model_type(server: OpcuaServer) -> None:
     assert model.mike.name == "mike"
     assert model.bob.name == "bob"
     assert model.carl.name == "carl"
+
+
+async def test_refresh_max_age(server: OpcuaServer) -> None:
+    _home = await server.get_object(Home, "SnoopyHome")
+    _home.__dict__["name"] = "cached"
+
+    await server.refresh(_home, max_age=60)
+    assert _home.name == "cached"
+    await server.refresh(_home.dog, max_age=60)
+    assert server.read_cache_stats.hits == 2
+
+    await server.refresh(_home, max_age=0)
+    assert _home.name == "town house"
+    assert server.read_cache_stats.misses == 1
+
+
+async def test_refresh_single_flight(server: OpcuaServer) -> None:
+    _home = await server.get_object(Home, "SnoopyHome")
+
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(5):
+            tg.create_task(server.refresh(_home, max_age=0))
+
+    stats = server.read_cache_stats
+    assert stats.misses == 1
+    assert stats.shared == 4
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from opcuax import OpcuaServer
+from opcuax.changes import Change
+from opcuax.export import Exporter, JsonLinesWriter, ParquetWriter
+
+from tests.models import Dog
+
+
+async def changes(n: int) -> AsyncGenerator[Change, None]:
+    for i in range(n):
+        yield Change(float(i), "Snoopy", "age", i)
+
+
+def test_json_lines_rotation(tmp_path: Path) -> None:
+    writer = JsonLinesWriter(tmp_path, max_records=4)
+    writer.write([Change(0, "Snoopy", "age", i) for i in range(10)])
+
+    files = sorted(tmp_path.iterdir())
+    assert [len(file.read_text().splitlines()) for file in files] == [4, 4, 2]
+
+
+async def test_exporter(tmp_path: Path) -> None:
+    exporter = Exporter(JsonLinesWriter(tmp_path), batch_size=3)
+    await exporter.run(changes(10))
+
+    (file,) = tmp_path.iterdir()
+    lines = [json.loads(line) for line in file.read_text().splitlines()]
+    assert [line["value"] for line in lines] == list(range(10))
+    assert exporter.written == 10
+    assert exporter.lag == 0
+
+
+async def test_exporter_flush_interval(tmp_path: Path) -> None:
+    done = asyncio.Event()
+
+    async def quiet_changes() -> AsyncGenerator[Change, None]:
+        yield Change(0, "Snoopy", "age", 1)
+        await done.wait()
+
+    exporter = Exporter(JsonLinesWriter(tmp_path), flush_interval=0.1)
+    task = asyncio.create_task(exporter.run(quiet_changes()))
+    # written without any further change
+    async with asyncio.timeout(5):
+        while exporter.written == 0:
+            await asyncio.sleep(0.05)
+    done.set()
+    await task
+
+    (file,) = tmp_path.iterdir()
+    assert len(file.read_text().splitlines()) == 1
+
+
+async def test_parquet(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    await Exporter(ParquetWriter(tmp_path), batch_size=3).run(changes(10))
+
+    (file,) = tmp_path.iterdir()
+    table = pq.read_table(file)
+    assert table.column("value").to_pylist() == [str(i) for i in range(10)]
+
+
+async def test_server_changes(pet_server: OpcuaServer) -> None:
+    feed = pet_server.changes()
+    dog = await pet_server.get_object(Dog, "Snoopy")
+
+    dog.age = 75
+    dog.name = dog.name
+    await pet_server.commit()
+    await pet_server.update("Snoopy", Dog(name="snoopy", age=75, weight=11))
+
+    first = await anext(feed)
+    second = await anext(feed)
+    assert (first.object, first.path, first.value) == ("Snoopy", "age", 75)
+    assert (second.object, second.path, second.value) == ("Snoopy", "weight", 11)
+    await feed.aclose()
+    assert not pet_server.change_feed.queues
+
+
+async def test_dropped_changes_subscriber(pet_server: OpcuaServer) -> None:
+    feed = pet_server.changes(maxsize=1)
+    assert pet_server.change_feed.queues
+    del feed
+    assert not pet_server.change_feed.queues
+
+    dog = await pet_server.get_object(Dog, "Snoopy")
+    async with asyncio.timeout(5):
+        for age in range(3):
+            dog.age = age
+            await pet_server.commit()
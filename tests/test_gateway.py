@@ -0,0 +1,96 @@
+import asyncio
+
+from opcuax import OpcuaClient, OpcuaGateway, OpcuaServer
+
+from .models import Dog, StructHome
+
+
+async def test_gateway(pet_server: OpcuaServer, namespace: str, snoopy: Dog) -> None:
+    home = StructHome(name="home", address="street", dog=snoopy)
+    await pet_server.create("Home", home)
+    endpoint = "opc.loopback://gateway"
+
+    async with (
+        OpcuaServer(endpoint, "gateway", namespace) as server,
+        OpcuaGateway(server, 0.05, 0.05) as gateway,
+    ):
+        await gateway.follow(pet_server.endpoint, namespace, Dog, ["Snoopy"], "Cell1")
+        await gateway.follow(pet_server.endpoint, namespace, StructHome, ["Home"])
+        assert len(gateway.upstreams) == 1
+
+        async with OpcuaClient(endpoint, namespace) as client:
+            dog = await client.get_object(Dog, "Cell1Snoopy")
+            mirrored_home = await client.get_object(StructHome, "Home")
+            assert dog.name == snoopy.name
+            assert mirrored_home.address == home.address
+
+            # upstream changes are mirrored
+            await pet_server.update("Snoopy", snoopy.model_copy(update={"age": 1}))
+            await pet_server.update("Home", home.model_copy(update={"name": "new"}))
+            await asyncio.sleep(0.5)
+            await client.refresh(dog)
+            await client.refresh(mirrored_home)
+            assert dog.age == 1
+            assert mirrored_home.name == "new"
+
+            # writes of downstream clients are forwarded upstream
+            dog.weight = 5
+            await client.commit()
+            await asyncio.sleep(0.5)
+
+        upstream = await pet_server.get_object(Dog, "Snoopy")
+        await pet_server.refresh(upstream)
+        assert upstream.weight == 5
+        assert gateway.forwarded_writes == 1
+
+
+async def test_gateway_with_aggregate(
+    pet_server: OpcuaServer, namespace: str, snoopy: Dog
+) -> None:
+    endpoint = "opc.loopback://gateway"
+
+    async with (
+        OpcuaServer(endpoint, "gateway", namespace) as server,
+        OpcuaGateway(server, 0.05, 0.05) as gateway,
+    ):
+        await gateway.follow(pet_server.endpoint, namespace, Dog, ["Snoopy"], "Cell1")
+        await server.aggregate("max_weight", Dog, "weight", "max")
+
+        async with OpcuaClient(endpoint, namespace) as client:
+            dog = await client.get_object(Dog, "Cell1Snoopy")
+            dog.weight = 50
+            await client.commit()
+            await asyncio.sleep(0.5)
+
+            # both PostWrite listeners saw the write
+            assert (await client.read_aggregates())["max_weight"] == 50
+            assert gateway.forwarded_writes == 1
+
+
+async def test_gateway_upstream_restart(namespace: str, snoopy: Dog) -> None:
+    upstream_endpoint = "opc.loopback://upstream"
+    odie = snoopy.model_copy(update={"name": "odie", "age": 1})
+
+    async with (
+        OpcuaServer("opc.loopback://gateway", "gateway", namespace) as server,
+        OpcuaGateway(server, 0.05, 0.05, check_interval=0.05) as gateway,
+    ):
+        async with OpcuaServer(upstream_endpoint, "upstream", namespace) as upstream:
+            await upstream.create("Snoopy", snoopy)
+            await upstream.create("Odie", odie)
+            await gateway.follow(upstream_endpoint, namespace, Dog, ["Snoopy"])
+        dog = await server.get_object(Dog, "Snoopy")
+
+        # the NodeIds of Snoopy are given to Odie
+        async with OpcuaServer(upstream_endpoint, "restarted", namespace) as upstream:
+            await upstream.create("Odie", odie)
+            await upstream.create("Snoopy", snoopy.model_copy(update={"age": 99}))
+            async with asyncio.timeout(10):
+                while dog.age != 99:
+                    await asyncio.sleep(0.05)
+
+                # the new subscription delivers changes
+                await upstream.update("Snoopy", snoopy.model_copy(update={"age": 5}))
+                while dog.age != 5:
+                    await asyncio.sleep(0.05)
+            assert dog.name == "snoopy"
@@ -0,0 +1,21 @@
+import pytest
+from opcuax import OpcuaServer
+from opcuax.load import LoadObject, Workload, run_load, run_step
+
+
+async def test_load(tcp_endpoint: str, namespace: str) -> None:
+    workload = Workload(reads=5, writes=5, subscriptions=1, duration=1)
+    results = await run_load(tcp_endpoint, namespace, 2, [2], 1, workload)
+
+    assert len(results) == 1
+    assert results[0].achieved > 0
+    assert results[0].notifications > 0
+
+
+async def test_load_worker_failure(tcp_endpoint: str, namespace: str) -> None:
+    workload = Workload(duration=1)
+    async with OpcuaServer(tcp_endpoint, "server", namespace) as server:
+        await server.create("Object1", LoadObject())
+        # sessions fail to browse a missing object
+        with pytest.raises(RuntimeError, match="exited with code"):
+            await run_step(server, ["Object1", "Missing"], 1, 1, workload)
@@ -0,0 +1,40 @@
+import pytest
+from opcuax import OpcuaClient, OpcuaServer
+from opcuax.loopback import servers
+
+from .models import Dog
+
+
+async def test_loopback(pet_server: OpcuaServer, client: OpcuaClient) -> None:
+    (server,) = servers.values()
+    assert server.endpoint == "opc.loopback://unittest"
+
+    snoopy = await pet_server.get_object(Dog, "Snoopy")
+    snoopy.age = 1
+    await pet_server.commit()
+
+    dog = await client.get_object(Dog, "Snoopy")
+    assert dog.age == 1
+    transport = client.client.uaclient.protocol.transport
+    assert transport.bytes_written > 0
+
+
+async def test_loopback_endpoint_in_use(pet_server: OpcuaServer) -> None:
+    with pytest.raises(OSError):
+        async with OpcuaServer(pet_server.endpoint, "server", pet_server.namespace_uri):
+            pass
+
+    assert servers
+
+
+async def test_loopback_no_server(namespace: str) -> None:
+    with pytest.raises(ConnectionRefusedError):
+        async with OpcuaClient("opc.loopback://nowhere", namespace):
+            pass
+
+
+async def test_loopback_server_stopped(endpoint: str, namespace: str) -> None:
+    async with OpcuaServer(endpoint, "server", namespace):
+        assert endpoint in servers
+
+    assert not servers
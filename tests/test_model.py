@@ -1,3 +1,7 @@
+import subprocess
+import sys
+
+from opcuax import OpcuaModel
 from opcuax.model import EnhancedModel, enhanced_model_class
 
 from tests.models import Dog
@@ -8,3 +12,16 @@ async def test_enhancement() -> None:
     dog = cls(name="dog", age=11, weight=23)
     assert isinstance(dog, Dog)
     assert isinstance(dog, EnhancedModel)
+
+
+def test_enhance_on_first_use() -> None:
+    class Cat(OpcuaModel):
+        name: str
+
+    assert Cat not in EnhancedModel.classes
+    assert issubclass(enhanced_model_class(Cat), Cat)
+
+
+def test_lazy_import() -> None:
+    code = "import sys, tests.models; assert 'asyncua' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
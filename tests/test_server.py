@@ -1,6 +1,23 @@
-from opcuax import OpcuaServer
+import asyncio
+import json
+import math
+import random
 
-from .models import Home
+import pytest
+from asyncua import ua
+from opcuax import (
+    OpcuaClient,
+    OpcuaClientSettings,
+    OpcuaModel,
+    OpcuaServer,
+    OpcuaServerSettings,
+    computed,
+    trace_requests,
+)
+from opcuax.aggregate import Aggregate
+from pydantic import computed_field
+
+from .models import Dog, Home, StructHome
 
 
 async def test_create_object_type(server: OpcuaServer) -> None:
@@ -11,3 +28,184 @@ async def test_create_object_type(server: OpcuaServer) -> None:
     dog_name = await type_node.get_child("2:dog/2:name")
 
     assert all([name, owner, dog_name])
+
+
+async def test_create(server: OpcuaServer, client: OpcuaClient) -> None:
+    home = Home(name="home", address="street", dog=Dog(name="snoopy", age=1, weight=2))
+    await server.create_ua_object_type(Home)
+    with trace_requests(server) as trace:
+        created = await server.create("Home", home)
+
+    # one AddNodes request per level of nested models, nothing read back
+    assert trace.count() == trace.count("AddNodes") == 3
+    assert created == home
+    assert await server.get_object(Home, "Home") is created
+
+    remote = await client.get_object(Home, "Home")
+    assert remote == home
+
+    created.dog.age = 2
+    await server.commit()
+    await client.refresh(remote)
+    assert remote.dog.age == 2
+
+
+async def test_create_struct(server: OpcuaServer, client: OpcuaClient) -> None:
+    home = StructHome(
+        name="home", address="street", dog=Dog(name="snoopy", age=1, weight=2)
+    )
+    await server.create_ua_object_type(StructHome)
+    with trace_requests(server) as trace:
+        created = await server.create("StructHome", home)
+
+    assert trace.count() == trace.count("AddNodes") == 1
+    assert created == home
+    assert await client.get_object(StructHome, "StructHome") == home
+
+
+class Job(OpcuaModel):
+    time_left: float
+
+    @computed(ttl=60)
+    def time_left_approx(self) -> float:
+        return round(self.time_left, -1)
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def done(self) -> bool:
+        return self.time_left == 0
+
+
+async def test_computed_fields(server: OpcuaServer, client: OpcuaClient) -> None:
+    job = await server.create("Job", Job(time_left=14))
+    approx = server.computed_variables[
+        (await server.ua_objects_node.get_child("2:Job/2:time_left_approx")).nodeid
+    ]
+    assert approx.computations == 0
+
+    node = await client.ua_objects_node.get_child("2:Job/2:time_left_approx")
+    done = await client.ua_objects_node.get_child("2:Job/2:done")
+    assert await node.read_value() == 10
+    assert await done.read_value() is False
+
+    # cached within the ttl
+    job.time_left = 0
+    await server.commit()
+    assert await node.read_value() == 10
+    assert await done.read_value() is True
+    assert approx.computations == 1
+
+    with pytest.raises(ua.UaStatusCodeError):
+        await node.write_value(1.0)
+
+    remote = await client.get_object(Job, "Job")
+    assert remote.done
+
+    # computed from the values written by clients
+    remote.time_left = 5
+    await client.commit()
+    assert job.time_left == 0
+    assert await done.read_value() is False
+
+
+async def test_aggregates(server: OpcuaServer, client: OpcuaClient) -> None:
+    # pet_server created Snoopy
+    odie = await server.create("Odie", Dog(name="odie", age=2, weight=20))
+    await server.aggregate("mean_age", Dog, "age", "mean")
+    await server.aggregate("max_weight", Dog, "weight", "max")
+    await server.aggregate("names", Dog, "name", "counts")
+    await server.create("Lassie", Dog(name="lassie", age=6, weight=30))
+
+    odie.age = 4
+    odie.weight = 5
+    await server.commit()
+    snoopy = await client.get_object(Dog, "Snoopy")
+    snoopy.name = "lassie"
+    await client.commit()
+    await asyncio.sleep(0.1)
+
+    aggregates = await client.read_aggregates()
+    assert aggregates["mean_age"] == pytest.approx((74 + 4 + 6) / 3)
+    assert aggregates["max_weight"] == 30
+    assert json.loads(aggregates["names"]) == {"odie": 1, "lassie": 2}
+
+    # fields are checked when the aggregate is created
+    with pytest.raises(ValueError):
+        await server.aggregate("mean_name", Dog, "name", "mean")
+    with pytest.raises(ValueError):
+        await server.aggregate("max_height", Dog, "height", "max")
+    with pytest.raises(ValueError):
+        await server.aggregate("dog_age", Dog, "age.dog", "counts")
+
+
+def test_aggregate_rounding() -> None:
+    total = Aggregate("total_weight", Dog, "weight", "sum")
+    ages = Aggregate("total_age", Dog, "age", "sum")
+    rng = random.Random(0)
+    for i in range(100000):
+        total.set(str(i % 10), rng.uniform(0, 1) * 10 ** rng.randint(-3, 9))
+        ages.set(str(i % 10), rng.randint(0, 2**60))
+
+    # a running float sum drifts by about 1e-14
+    exact = math.fsum(total.values.values())
+    assert total.value() == pytest.approx(exact, rel=1e-15, abs=0)
+    assert ages.int_total == sum(ages.values.values())
+
+
+async def test_protocol_settings(endpoint: str, namespace: str, snoopy: Dog) -> None:
+    server_settings = OpcuaServerSettings(
+        opcua_server_url=endpoint,
+        opcua_server_namespace=namespace,
+        opcua_security_policies=["NoSecurity"],
+        opcua_max_chunk_size=8192,
+        opcua_min_sampling_interval=0.2,
+        opcua_min_publishing_interval=0.5,
+    )
+    client_settings = OpcuaClientSettings(
+        opcua_server_url=endpoint,
+        opcua_server_namespace=namespace,
+        opcua_request_timeout=1,
+    )
+
+    async with OpcuaServer.from_settings(server_settings) as server:
+        await server.create("Snoopy", snoopy)
+        (policy,) = {e.SecurityPolicyUri for e in server.server.iserver.endpoints}
+        assert policy == ua.SecurityPolicy.URI
+
+        async with OpcuaClient.from_settings(client_settings) as client:
+            assert client.client.uaclient.protocol.timeout == 1
+            dog = await client.get_object(Dog, "Snoopy")
+            node = dog.field_node("age")  # type: ignore[attr-defined]
+            assert await node.read_attribute(
+                ua.AttributeIds.MinimumSamplingInterval
+            ) == ua.DataValue(ua.Variant(200.0, ua.VariantType.Double))
+
+            subscription = await client.client.create_subscription(0, None)
+            assert subscription.parameters.RequestedPublishingInterval == 500
+            params = ua.ModifySubscriptionParameters()
+            params.SubscriptionId = subscription.subscription_id
+            result = await client.client.uaclient.modify_subscription(params)
+            assert result.RevisedPublishingInterval == 500
+
+            item = ua.MonitoredItemCreateRequest()
+            item.ItemToMonitor.NodeId = node.nodeid
+            item.ItemToMonitor.AttributeId = ua.AttributeIds.Value
+            item.MonitoringMode = ua.MonitoringMode.Reporting
+            item.RequestedParameters.SamplingInterval = 0
+            create = ua.CreateMonitoredItemsParameters()
+            create.SubscriptionId = subscription.subscription_id
+            create.ItemsToCreate = [item]
+            (created,) = await client.client.uaclient.create_monitored_items(create)
+            assert created.RevisedSamplingInterval >= 200
+
+            modify = ua.MonitoredItemModifyRequest()
+            modify.MonitoredItemId = created.MonitoredItemId
+            modify.RequestedParameters.SamplingInterval = 0
+            modify_params = ua.ModifyMonitoredItemsParameters()
+            modify_params.SubscriptionId = subscription.subscription_id
+            modify_params.ItemsToModify = [modify]
+            (modified,) = await client.client.uaclient.modify_monitored_items(
+                modify_params
+            )
+            assert modified.RevisedSamplingInterval == 200
+            await subscription.delete()
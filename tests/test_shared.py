@@ -0,0 +1,48 @@
+import multiprocessing
+import pickle
+
+import pytest
+from opcuax import OpcuaServer
+from opcuax.shared import SharedTable
+
+from tests.models import Dog, Home
+
+
+def produce(table: SharedTable[Dog]) -> None:
+    with table:
+        table.write("Snoopy", Dog(name="snoopy", age=80, weight=12))
+
+
+def test_scan() -> None:
+    home = Home(name="home", address="street", dog=Dog(name="a", age=1, weight=2))
+
+    with SharedTable(Home, ["Home1", "Home2"], str_size=16) as table:
+        with pickle.loads(pickle.dumps(table)) as producer:
+            producer.write("Home2", home)
+            producer.write("Home2", home)
+
+        assert table.scan() == [("Home2", ["home", "street", "a", 1, 2.0])]
+        assert table.scan() == []
+
+        with pytest.raises(ValueError):
+            table.write("Home1", home.model_copy(update={"address": "x" * 17}))
+
+
+async def test_sync(pet_server: OpcuaServer) -> None:
+    feed = pet_server.changes()
+
+    with SharedTable(Dog, ["Snoopy"]) as table:
+        process = multiprocessing.get_context("spawn").Process(
+            target=produce, args=(table,)
+        )
+        process.start()
+        process.join()
+
+        assert await table.sync(pet_server) == 1
+        assert await table.sync(pet_server) == 0
+
+    dog = await pet_server.get_object(Dog, "Snoopy")
+    await pet_server.refresh(dog)
+    assert dog == Dog(name="snoopy", age=80, weight=12)
+    assert {(await anext(feed)).path for _ in range(2)} == {"age", "weight"}
+    await feed.aclose()
@@ -0,0 +1,76 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from opcuax import OpcuaClient, OpcuaServer
+
+from tests.models import Dog, StructHome
+
+
+@pytest.fixture
+def home(snoopy: Dog) -> StructHome:
+    return StructHome(name="town house", address="Greens Road", dog=snoopy)
+
+
+@pytest_asyncio.fixture
+async def server(
+    pet_server: OpcuaServer, home: StructHome
+) -> AsyncGenerator[OpcuaServer, None]:
+    await pet_server.create("StructHome", home)
+    yield pet_server
+
+
+async def test_one_variable(server: OpcuaServer) -> None:
+    node = await server.ua_objects_node.get_child(f"{server.namespace}:StructHome")
+    assert await node.get_children() == []
+
+
+async def test_get_object(server: OpcuaServer, home: StructHome) -> None:
+    _home = await server.get_object(StructHome, "StructHome")
+    assert isinstance(_home, StructHome)
+    assert _home.model_dump() == home.model_dump()
+
+
+async def test_refresh_part(server: OpcuaServer, home: StructHome) -> None:
+    _home = await server.get_object(StructHome, "StructHome")
+    _dog = _home.dog
+    _home.__dict__["name"] = "wrong"
+    _dog.__dict__["age"] = 999
+
+    await server.refresh(_dog)
+    assert _home.model_dump() == home.model_dump()
+
+
+async def test_update_nested_variable(server: OpcuaServer) -> None:
+    _home = await server.get_object(StructHome, "StructHome")
+    _home.name = "foo"
+    _home.dog.name = "bar"
+    _home.dog.age = 3
+
+    assert server.update_tasks.qsize() == 1
+    await server.commit()
+    _home.__dict__["name"] = "wrong"
+    await server.refresh(_home)
+    assert _home.name == "foo"
+    assert _home.dog.name == "bar"
+    assert _home.dog.age == 3
+
+
+async def test_update(server: OpcuaServer) -> None:
+    home = StructHome(
+        name="new", address="addr", dog=Dog(name="foo", age=33, weight=999)
+    )
+
+    _home = await server.update("StructHome", home)
+    await server.refresh(_home)
+    assert _home.model_dump() == home.model_dump()
+
+
+async def test_client(server: OpcuaServer, client: OpcuaClient) -> None:
+    _home = await client.get_object(StructHome, "StructHome")
+    _home.dog.age = 5
+    await client.commit()
+
+    home = await server.get_object(StructHome, "StructHome")
+    await server.refresh(home)
+    assert home.dog.age == 5
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import pytest
+from opcuax import OpcuaClient, OpcuaServer
+
+from tests.models import Dog
+
+
+def test_start_in_thread(tcp_endpoint: str, namespace: str, snoopy: Dog) -> None:
+    server = OpcuaServer(tcp_endpoint, "thread server", namespace)
+
+    with server.start_in_thread() as thread:
+        thread.create("Snoopy", snoopy).result()
+        for age in range(75, 80):
+            thread.update("Snoopy", snoopy.model_copy(update={"age": age}))
+        thread.commit().result()
+
+        dog = thread.get_object(Dog, "Snoopy").result()
+        assert type(dog) is Dog
+        assert dog.age == 79
+
+    assert not thread.thread.is_alive()
+
+
+async def test_await_from_other_loop(
+    tcp_endpoint: str, namespace: str, snoopy: Dog
+) -> None:
+    server = OpcuaServer(tcp_endpoint, "thread server", namespace)
+
+    with server.start_in_thread() as thread:
+        await asyncio.wrap_future(thread.create("Snoopy", snoopy))
+        thread.update("Snoopy", snoopy.model_copy(update={"name": "woodstock"}))
+        await asyncio.wrap_future(thread.commit())
+
+        async with OpcuaClient(tcp_endpoint, namespace) as client:
+            dog = await client.get_object(Dog, "Snoopy")
+            assert dog.name == "woodstock"
+
+
+def test_failed_update(tcp_endpoint: str, namespace: str, snoopy: Dog) -> None:
+    server = OpcuaServer(tcp_endpoint, "thread server", namespace)
+
+    with server.start_in_thread() as thread:
+        thread.create("Snoopy", snoopy).result()
+        thread.update("Nobody", snoopy)
+        with pytest.raises(ExceptionGroup):
+            thread.commit().result()
+
+        # the error is raised once
+        thread.update("Snoopy", snoopy.model_copy(update={"age": 1}))
+        thread.commit().result()
+        assert thread.get_object(Dog, "Snoopy").result().age == 1
+
+
+def test_start_failure(tcp_endpoint: str, namespace: str) -> None:
+    def server_threads() -> int:
+        names = [thread.name for thread in threading.enumerate()]
+        return names.count(f"opcuax-{tcp_endpoint}")
+
+    with OpcuaServer(tcp_endpoint, "thread server", namespace).start_in_thread():
+        # the port is in use
+        server = OpcuaServer(tcp_endpoint, "second server", namespace)
+        with pytest.raises(OSError):
+            server.start_in_thread()
+        assert server_threads() == 1
+    assert server_threads() == 0
@@ -0,0 +1,30 @@
+from opcuax import OpcuaClient, OpcuaServer, trace_requests
+
+from .models import Dog
+
+
+async def test_trace_requests(pet_server: OpcuaServer, client: OpcuaClient) -> None:
+    with trace_requests(client) as trace:
+        dog = await client.get_object(Dog, "Snoopy")
+        assert trace.count("TranslateBrowsePaths") == 4
+        assert trace.count("Read") == 3
+
+    with trace_requests(client) as trace:
+        await client.refresh(dog)
+        await pet_server.refresh(await pet_server.get_object(Dog, "Snoopy"))
+
+    assert trace.count() == 1
+    assert trace.nodes("Read") == 3
+    (call,) = trace.calls
+    assert call.request_bytes > 0 and call.response_bytes > 0
+    assert call.origin.startswith("core.Opcuax.refresh > ")
+    assert " > model.EnhancedModel.refresh > node.read_ua_values" in call.origin
+    assert trace.profile() == {(call.origin, "Read"): 1}
+
+
+async def test_trace_all_requests(pet_server: OpcuaServer) -> None:
+    with trace_requests() as trace:
+        await pet_server.create("Odie", Dog(name="odie", age=1, weight=1))
+
+    assert trace.count("AddNodes") > 0
+    assert "AddNodes" in trace.summary()
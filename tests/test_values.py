@@ -1,11 +1,18 @@
+import asyncio
 from datetime import date, datetime
 from ipaddress import IPv4Address, IPv6Address
 from pathlib import Path
-from typing import Annotated
-
-from opcuax import OpcuaModel, OpcuaServer
+from typing import Annotated, Any
+
+import numpy as np
+from asyncua import ua
+from asyncua.server.address_space import AttributeService
+from opcuax import OpcuaClient, OpcuaModel, OpcuaServer
+from opcuax.node import read_ua_values
+from opcuax.values import Float, Int16, NDArray, UInt8
 from pydantic import (
     AnyUrl,
+    ConfigDict,
     DirectoryPath,
     Field,
     FutureDate,
@@ -15,6 +22,7 @@ from pydantic import (
     PastDatetime,
     RedisDsn,
     UrlConstraints,
+    conint,
 )
 
 
@@ -189,3 +197,209 @@ async def test_dir_path(server: OpcuaServer) -> None:
     model = await server.create("model", Model(val=path))
 
     assert model.val == path
+
+
+async def test_list(server: OpcuaServer) -> None:
+    class Model(OpcuaModel):
+        floats: list[float] = [1.5, 2.5]
+        names: list[str] = []
+
+    model = await server.create("model", Model(names=["a", "b"]))
+    await server.refresh(model)
+
+    assert model.floats == [1.5, 2.5]
+    assert model.names == ["a", "b"]
+
+
+async def test_list_array_dimensions(server: OpcuaServer) -> None:
+    class Model(OpcuaModel):
+        val: list[int]
+
+    type_node = await server.create_ua_object_type(Model)
+    node = await type_node.get_child(f"{server.namespace}:val")
+
+    assert await node.read_value_rank() == 1
+    assert await node.read_array_dimensions() == [0]
+
+
+async def test_ndarray(server: OpcuaServer) -> None:
+    class Model(OpcuaModel):
+        val: Annotated[np.ndarray[Any, Any], NDArray("float32", (2, 3))]
+
+    type_node = await server.create_ua_object_type(Model)
+    node = await type_node.get_child(f"{server.namespace}:val")
+    assert await node.read_array_dimensions() == [2, 3]
+
+    array = np.arange(6, dtype="float32").reshape((2, 3))
+    model = await server.create("model", Model(val=array))
+    model.val = array * 2
+    await server.commit()
+    await server.refresh(model)
+
+    assert model.val.dtype == np.float32
+    assert np.array_equal(model.val, array * 2)
+
+
+async def test_compact_int(server: OpcuaServer) -> None:
+    class Model(OpcuaModel):
+        byte: conint(ge=0, le=255) = 0  # type: ignore
+        uint8: UInt8 = 0
+        int16: Int16 = 0
+        int64: int = 0
+
+    type_node = await server.create_ua_object_type(Model)
+
+    async def variant_type(name: str) -> ua.VariantType:
+        node = await type_node.get_child(f"{server.namespace}:{name}")
+        return await node.read_data_type_as_variant_type()
+
+    assert await variant_type("byte") == ua.VariantType.Byte
+    assert await variant_type("uint8") == ua.VariantType.Byte
+    assert await variant_type("int16") == ua.VariantType.Int16
+    assert await variant_type("int64") == ua.VariantType.Int64
+
+    model = await server.create("model", Model(uint8=255, int16=-300))
+    model.byte = 7
+    await server.commit()
+    await server.refresh(model)
+
+    assert (model.byte, model.uint8, model.int16) == (7, 255, -300)
+
+
+async def test_float_precision(server: OpcuaServer, client: OpcuaClient) -> None:
+    class Model(OpcuaModel):
+        double: float = 0
+        single: Float = 0
+
+    await server.create("model", Model(double=0.1, single=0.5))
+    model = await client.get_object(Model, "model")
+
+    assert model.double == 0.1
+    assert model.single == 0.5
+
+
+async def test_bytes(server: OpcuaServer, client: OpcuaClient) -> None:
+    class Model(OpcuaModel):
+        model_config = ConfigDict(arbitrary_types_allowed=True)
+
+        data: bytes
+        buffer: bytearray
+        view: memoryview
+
+    await server.create(
+        "model",
+        Model(data=b"\x00\xff", buffer=bytearray(b"buffer"), view=memoryview(b"view")),
+    )
+    model = await client.get_object(Model, "model")
+
+    assert model.data == b"\x00\xff"
+    assert model.buffer == bytearray(b"buffer")
+    assert model.view == b"view"
+
+
+async def test_bytes_in_chunks(server: OpcuaServer, client: OpcuaClient) -> None:
+    class Blob(OpcuaModel):
+        data: bytes = b""
+
+    data = bytes(range(256)) * 40
+    await server.create("blob", Blob(data=b"previous value"))
+    blob = await client.get_object(Blob, "blob")
+
+    await client.write_bytes(blob, "data", data, chunk_size=1000)
+    assert blob.data == data
+    await client.refresh(blob)
+    assert blob.data == data
+
+    assert await client.read_bytes(blob, "data", chunk_size=999) == data
+    assert await client.read_bytes(blob, "data", chunk_size=len(data)) == data
+
+    await client.write_bytes(blob, "data", b"", chunk_size=1000)
+    assert await client.read_bytes(blob, "data", chunk_size=1000) == b""
+
+
+async def test_bytes_partial_upload(server: OpcuaServer, client: OpcuaClient) -> None:
+    class Blob(OpcuaModel):
+        data: bytes = b""
+
+    old, new = b"previous value", bytes(range(256)) * 40
+    await server.create("blob", Blob(data=old))
+    blob = await client.get_object(Blob, "blob")
+    node = blob.field_node("data")  # type: ignore[attr-defined]
+    seen = []
+
+    async def read_while_uploading(upload: asyncio.Task[None]) -> None:
+        while not upload.done():
+            (result,) = await read_ua_values([node])
+            if result.StatusCode.is_good():
+                seen.append(bytes(result.Value.Value))
+
+    upload = asyncio.create_task(client.write_bytes(blob, "data", new, chunk_size=500))
+    await read_while_uploading(upload)
+    await upload
+
+    # readers never got a half-uploaded value
+    assert seen and set(seen) <= {old, new}
+    assert await client.read_bytes(blob, "data") == new
+
+
+async def test_bytes_range_write(server: OpcuaServer, client: OpcuaClient) -> None:
+    class Blob(OpcuaModel):
+        data: bytes = b""
+
+    await server.create("blob", Blob(data=b"abc"))
+    blob = await client.get_object(Blob, "blob")
+    node = blob.field_node("data")  # type: ignore[attr-defined]
+    received = []
+
+    class Handler:
+        def datachange_notification(self, node: Any, val: Any, data: Any) -> None:
+            received.append(bytes(val))
+
+    async def write_range(index_range: str, chunk: bytes) -> ua.StatusCode:
+        wv = ua.WriteValue()
+        wv.NodeId = node.nodeid
+        wv.AttributeId = ua.AttributeIds.Value
+        wv.IndexRange = index_range
+        wv.Value = ua.DataValue(ua.Variant(chunk, ua.VariantType.ByteString))
+        params = ua.WriteParameters()
+        params.NodesToWrite.append(wv)
+        (result,) = await node.write_params(params)
+        return result
+
+    subscription = await client.client.create_subscription(10, Handler())
+    await subscription.subscribe_data_change(node)
+    assert (await write_range("3:5", b"def")).is_good()
+    assert (await write_range("6:8", b"ghi")).is_good()
+    async with asyncio.timeout(5):
+        while b"abcdefghi" not in received:
+            await asyncio.sleep(0.01)
+    await subscription.delete()
+
+    await server.server.get_node(node.nodeid).set_writable(False)
+    assert not (await write_range("0:2", b"xyz")).is_good()
+    assert await client.read_bytes(blob, "data") == b"abcdefghi"
+
+
+async def test_bytes_without_index_range(
+    server: OpcuaServer, client: OpcuaClient
+) -> None:
+    class Blob(OpcuaModel):
+        data: bytes = b""
+
+    # a stock asyncua server ignores IndexRange on Write
+    iserver = server.server.iserver
+    iserver.attribute_service = AttributeService(iserver.aspace)
+    data = bytes(range(256)) * 40
+    await server.create("blob", Blob())
+    blob = await client.get_object(Blob, "blob")
+
+    await client.write_bytes(blob, "data", data, chunk_size=1000)
+    await client.refresh(blob)
+    assert blob.data == data
+
+    # whole values are returned for ranges, even of exactly one chunk
+    async with asyncio.timeout(5):
+        for chunk_size in (1000, len(data), len(data) + 1):
+            assert await client.read_bytes(blob, "data", chunk_size) == data
+        await client.write_bytes(blob, "data", b"", chunk_size=1000)
+        assert await client.read_bytes(blob, "data", chunk_size=1000) == b""